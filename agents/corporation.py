@@ -1,15 +1,18 @@
 from typing import TYPE_CHECKING, Set, Union
-from banking.bank_interface import BankInterface
+from banking.bank_interface import BankInterface, batch_deposit
 from dataclasses import dataclass, field
-from base_agent import BaseAgent, BaseStats
+from base_agent import AgentIds, BaseAgent, BaseStats
+from event_log import EventKind
 import math
 import numpy as np
 
 if TYPE_CHECKING:
     from .person import Person
+    from .workforce import Workforce
     from banking.agents.bank import Bank
     from banking.bank_interface import BankInterface
     from banking.bank_accounting import Loan
+    from event_log import EventLog
 
 
 class CorpStats(BaseStats):
@@ -48,15 +51,54 @@ class CorpStats(BaseStats):
         return (second_half - first_half) / first_half
 
 
-@dataclass
+@dataclass(slots=True)
 class Good:
     price: float
 
 
+@dataclass(slots=True)
+class FinancialSnapshot:
+    """Financial indicators of a corporation, computed once per tick."""
+
+    tick: int
+    runway: float
+    burn: float
+    net_margin: float
+    revenue_trend: float
+    sales_trend: float
+    overstock_trend: float
+
+
 class Corporation(BaseAgent):
 
-    def __init__(self, bank: Union["Bank", None] = None) -> None:
-        super().__init__("Corp")  # Initialize BaseAgent with Corp prefix
+    __slots__ = (
+        "employees",
+        "bank_interface",
+        "stats",
+        "goods",
+        "salary",
+        "latest_sales",
+        "latest_demand",
+        "current_price",
+        "latest_revenue",
+        "latest_costs",
+        "hiring",
+        "ppe",
+        "alive",
+        "loans",
+        "snapshot",
+        "snapshot_hits",
+        "snapshot_misses",
+        "event_log",
+        "workforce",
+        "headcount",
+        "sector",
+    )
+
+    def __init__(
+        self, bank: Union["Bank", None] = None, ids: AgentIds | None = None
+    ) -> None:
+        super().__init__("Corp", ids)  # Initialize BaseAgent with Corp prefix
         self.employees: Set["Person"] = set()
         self.bank_interface = BankInterface(bank, self) if bank else None
         self.stats = CorpStats()
@@ -71,36 +113,72 @@ class Corporation(BaseAgent):
         self.ppe: int = 0
         self.alive = True
         self.loans: list[Loan] = []
+        self.snapshot: FinancialSnapshot | None = None
+        self.snapshot_hits: int = 0
+        self.snapshot_misses: int = 0
+        self.event_log: "EventLog | None" = None
+        self.workforce: "Workforce | None" = None
+        # People employed, counting each employee's cohort weight
+        self.headcount: int = 0
+        # Row and column of the corporation's good in the input-output matrix
+        self.sector: int = 0
 
     def add_employee(self, employee: "Person") -> None:
-        employee.employed = True
-        employee.salary = self.salary
-        self.employees.add(employee)
+        self.add_employees([employee])
+
+    def add_employees(self, employees: list["Person"]) -> None:
+        for employee in employees:
+            employee.employed = True
+            employee.employer = self
+            employee.salary = self.salary
+            self.headcount += employee.weight
+            if self.event_log is not None:
+                self.event_log.write(EventKind.HIRE, employee, self)
+        self.employees.update(employees)
         self.reivew_hiring()
 
     def pay_salaries(self) -> None:
+        if self.bank_interface.check_balance() < self.salary * self.headcount:
+            self.go_bankrupt()
+            return
         for employee in self.employees:
             self.pay_salary(employee)
 
+    def go_bankrupt(self) -> None:
+        """Release all employees and have the bank write off our loans."""
+        self._log("Bankrupt, cannot pay salaries", level="warning")
+        self.alive = False
+        self.hiring = False
+        self.release_employees(list(self.employees), severance=False)
+        self.bank_interface.bank.write_off_loans(self.bank_interface)
+        for loan in self.loans:
+            loan.written_off = True
+        self.loans = []
+        if self.event_log is not None:
+            self.event_log.write(EventKind.BANKRUPTCY, self)
+
     def pay_salary(self, employee: "Person") -> None:
 
-        if self.bank_interface.check_balance() < self.salary:
+        amount = self.salary * employee.weight
+        if self.bank_interface.check_balance() < amount:
             raise Exception(f"Failing to pay salary on tick {self.tick}")
 
-        wtid, dtid = self.bank_interface.transfer(
-            self.salary, to=employee.bank_interface
-        )
-        self.latest_costs += self.salary
+        wtid, dtid = self.bank_interface.transfer(amount, to=employee.bank_interface)
+        self.latest_costs += amount
         self.stats.record(self.tick, costs=self.latest_costs)
 
+        employee.salary = self.salary
         employee.latest_salary_id = dtid
+        employee.latest_income = amount
         return wtid, dtid
 
     def change_salary(self, pct: float) -> float:
         old_salary = self.salary
         self.salary = self.salary * (1 + pct)
         self.stats.record(self.tick, salary=self.salary)
-        return len(self.employees) * (old_salary - self.salary)
+        if self.event_log is not None:
+            self.event_log.write(EventKind.SALARY, self, amount=self.salary)
+        return self.headcount * (old_salary - self.salary)
 
     def revenue_trend(self) -> float:
         return self.stats.trend("revenue")
@@ -114,10 +192,37 @@ class Corporation(BaseAgent):
     def pay_interest(self) -> None:
         pass
 
+    def financial_snapshot(self) -> FinancialSnapshot:
+        """
+        Return the financial indicators for the current tick.
+        Shared by finance_recommendation and the bank's credit check,
+        recomputed only when the tick changes.
+        """
+        if self.snapshot is not None and self.snapshot.tick == self.tick:
+            self.snapshot_hits += 1
+            return self.snapshot
+
+        self.snapshot_misses += 1
+        runway, burn, net_margin = self.forecast()
+        self.snapshot = FinancialSnapshot(
+            tick=self.tick,
+            runway=runway,
+            burn=burn,
+            net_margin=net_margin,
+            revenue_trend=self.revenue_trend(),
+            sales_trend=self.sales_trend(),
+            overstock_trend=self.overstock_trend(),
+        )
+        return self.snapshot
+
     def finance_action(self, allow_borrow: bool = True) -> tuple[str, float]:
-        recommendation = self.finance_recommendation(allow_borrow)
-        action, amount = recommendation
-        self._log(f"action: {action}, amount: {amount}", level="warning")
+        action, amount = self.finance_recommendation(allow_borrow)
+        return self.apply_finance_action(action, amount, allow_borrow)
+
+    def apply_finance_action(
+        self, action: str, amount: float, allow_borrow: bool = True
+    ) -> tuple[str, float]:
+        self._log("action: %s, amount: %s", action, amount)
         if action == "borrow_funds" and allow_borrow:
             loan = self.bank_interface.borrow_funds(amount)
             if loan:
@@ -130,15 +235,21 @@ class Corporation(BaseAgent):
             self.change_salary(-0.05)
         elif action == "decrease_price":
             self.hiring = False
-            self.current_price *= 0.95
+            self.set_price(self.current_price * 0.95)
         elif action == "increase_price":
             self.hiring = True
-            self.current_price *= 1.05
+            self.set_price(self.current_price * 1.05)
         elif action == "ok":
             pass
 
         return action, amount
 
+    def set_price(self, price: float) -> float:
+        self.current_price = price
+        if self.event_log is not None:
+            self.event_log.write(EventKind.PRICE, self, amount=price)
+        return price
+
     def finance_recommendation(self, allow_borrow: bool = True) -> tuple[str, float]:
         # We need atleast 4 months of data to review finance
         if self.tick < 4:
@@ -146,18 +257,20 @@ class Corporation(BaseAgent):
         # Burn = costs - revenue (how money we are losing or making)
         # Runway = balance / burn (how many months we can survive)
         # Trend = if revenue is increasing or decreasing
-        runway, burn, net_margin = self.forecast()
-        revenue_trend = self.revenue_trend()
-        sales_trend = self.sales_trend()
-        overstock_trend = self.overstock_trend()
+        snapshot = self.financial_snapshot()
+        runway, burn, net_margin = snapshot.runway, snapshot.burn, snapshot.net_margin
+        revenue_trend = snapshot.revenue_trend
         # We want to atleast have 6 months of runway
         target_runway = 6
         monthly_burn = burn / 4 if burn > 0 else 0
         missing = (target_runway - runway) * monthly_burn
         # We are losing money
         self._log(
-            f"Runway: {runway}, Burn: {burn}, Net margin: {net_margin}, monthly burn: {monthly_burn}",
-            level="warning",
+            "Runway: %s, Burn: %s, Net margin: %s, monthly burn: %s",
+            runway,
+            burn,
+            net_margin,
+            monthly_burn,
         )
         if missing > 0:
             # Is the trend positive?
@@ -210,15 +323,46 @@ class Corporation(BaseAgent):
     def remove_employees(self, save):
         num_to_fire = math.ceil(save / self.salary)
         self._log(f"Firing {num_to_fire} employees to save {save}", level="warning")
-        saved = 0
-        for _ in range(num_to_fire):
+        fired = []
+        split = []
+        while num_to_fire > 0 and self.employees:
             employee = self.employees.pop()
+            if employee.weight > num_to_fire:
+                # Only part of the cohort is fired, it splits off
+                self.employees.add(employee)
+                employee = employee.split(num_to_fire)
+                split.append(employee)
+            fired.append(employee)
+            num_to_fire -= employee.weight
+
+        if split and self.workforce is not None:
+            self.workforce.register(split)
+        self.release_employees(fired)
+        return self.salary * sum(employee.weight for employee in fired)
+
+    def release_employees(
+        self, fired: list["Person"], severance: bool = True
+    ) -> None:
+        """Fire people in bulk, paying one salary of severance per bank batch."""
+        for employee in fired:
             employee.employed = False
-            tid = employee.bank_interface.deposit(employee.salary)
-            employee.latest_salary_id = tid
-            saved += self.salary
-
-        return saved
+            employee.employer = None
+            self.headcount -= employee.weight
+            if self.event_log is not None:
+                self.event_log.write(EventKind.FIRE, employee, self)
+        self.employees.difference_update(fired)
+
+        if severance:
+            amounts = [employee.salary * employee.weight for employee in fired]
+            tids = batch_deposit(
+                [employee.bank_interface for employee in fired], amounts
+            )
+            for employee, tid, amount in zip(fired, tids, amounts):
+                employee.latest_salary_id = tid
+                employee.latest_income = amount
+
+        if self.workforce is not None:
+            self.workforce.add_unemployed(fired)
 
     def check_inventory(self) -> bool:
         return len(self.goods) > 0
@@ -240,6 +384,22 @@ class Corporation(BaseAgent):
         else:
             return False
 
+    def sell_goods(self, bank_interface: "BankInterface", count: int) -> list[Good]:
+        """Sell up to count goods in a single transfer."""
+        count = min(count, len(self.goods))
+        if count == 0:
+            return []
+
+        revenue = self.current_price * count
+        bank_interface.transfer(revenue, to=self.bank_interface)
+        goods = self.goods[:count]
+        del self.goods[:count]
+        self.latest_sales += count
+        self.latest_revenue += revenue
+        self.stats.record(self.tick, sales=self.latest_sales)
+        self.stats.record(self.tick, revenue=self.latest_revenue)
+        return goods
+
     def adjust_price(self):
         # Take all sales except last one
         sales = list(self.stats.sales.values())[:-1][-4:]
@@ -250,10 +410,10 @@ class Corporation(BaseAgent):
 
         if sum_demand == 0:
             # Nobody wanted to buy → price too high
-            self.current_price *= 0.9  # lower 10%
+            self.set_price(self.current_price * 0.9)  # lower 10%
         elif sum_sales < sum_demand:
             # More demand than sales → stock-out
-            self.current_price *= 1.05  # raise 5%
+            self.set_price(self.current_price * 1.05)  # raise 5%
         else:
             # sales == demand → balanced
             pass
@@ -261,7 +421,7 @@ class Corporation(BaseAgent):
         return self.current_price
 
     def reivew_hiring(self) -> None:
-        employees = len(self.employees)
+        employees = self.headcount
         # Calculate maximum production
         max_production = employees * self.ppe
         # Check if max production is greater than demand
@@ -270,15 +430,16 @@ class Corporation(BaseAgent):
         else:
             self.hiring = True
 
-    def produce_goods(self) -> None:
-
-        # TODO: production should cost money!
-        # but for now lets just use salary!
-
+    def planned_production(self) -> int:
         fulfill = self.latest_demand - len(self.goods)
-        capacity = self.ppe * len(self.employees)
+        capacity = self.ppe * self.headcount
+        return max(0, math.ceil(min(fulfill, capacity)))
 
-        actual_produce = math.ceil(min(fulfill, capacity))
+    def produce_goods(self, limit: int | None = None) -> None:
+        """Produce for demand, at most limit goods (e.g. inputs bought)."""
+        actual_produce = self.planned_production()
+        if limit is not None:
+            actual_produce = min(actual_produce, limit)
 
         produced = 0
         for _ in range(actual_produce):
@@ -289,15 +450,19 @@ class Corporation(BaseAgent):
         self.latest_demand = 0
         self.stats.record(self.tick, production=produced)
 
-    def one_tick(self, tick: int):
+    def one_tick(self, tick: int, finance: bool = True):
 
         self.set_tick(tick)
         self.initialize_tick_stats()
         self.produce_goods()
         self.pay_salaries()
-        if self.tick > 4:
+        # The simulation decides for all corporations at once instead
+        if finance and self.reviews_finance():
             self.finance_action()
 
+    def reviews_finance(self) -> bool:
+        return self.tick > 4 and self.alive
+
     def clean_up(self) -> None:
         self.stats.record(self.tick, profit=self.latest_revenue - self.latest_costs)
         self.latest_sales = 0
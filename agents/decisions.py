@@ -0,0 +1,157 @@
+"""
+Batched finance decisions for all live corporations.
+
+Corporation.finance_recommendation works on one corporation at a time and
+builds small lists and NumPy calls per indicator. finance_recommendations
+gathers the 4 tick windows of every corporation into (n, 4) arrays and
+evaluates forecast, trends and the recommendation rules once for all of them.
+The rules are the same as in finance_recommendation, decisions match it
+exactly.
+"""
+
+from itertools import islice
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from agents.corporation import FinancialSnapshot
+
+if TYPE_CHECKING:
+    from agents.corporation import Corporation
+
+LOOKBACK = 4
+TARGET_RUNWAY = 6
+
+# Index into ACTIONS, as returned by finance_recommendations
+ACTIONS = (
+    "borrow_funds",
+    "fire_employees",
+    "lower_salary",
+    "increase_price",
+    "decrease_price",
+)
+BORROW, FIRE, LOWER_SALARY, INCREASE_PRICE, DECREASE_PRICE = range(len(ACTIONS))
+
+
+def window(stat: dict[int, float]) -> list[float]:
+    """The LOOKBACK values before the current tick, oldest first."""
+    values = list(islice(reversed(stat.values()), 1, LOOKBACK + 1))
+    values.reverse()
+    return values
+
+
+def trends(values: np.ndarray) -> np.ndarray:
+    """CorpStats.trend for every row of an (n, LOOKBACK) array."""
+    first_half = np.mean(values[:, : LOOKBACK // 2], axis=1)
+    second_half = np.mean(values[:, LOOKBACK // 2 :], axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        trend = (second_half - first_half) / first_half
+    return np.where(first_half == 0, 0.0, trend)
+
+
+def snapshots(corps: list["Corporation"]) -> list[FinancialSnapshot]:
+    """
+    Financial snapshots of all corporations, from stacked windows. Every
+    corporation needs more than LOOKBACK ticks of stats.
+    """
+    n = len(corps)
+    costs = np.empty((n, LOOKBACK))
+    revenue = np.empty((n, LOOKBACK))
+    sales = np.empty((n, LOOKBACK))
+    overstock = np.empty((n, LOOKBACK))
+    balance = np.empty(n)
+    for i, corp in enumerate(corps):
+        stats = corp.stats
+        costs[i] = window(stats.costs)
+        revenue[i] = window(stats.revenue)
+        sales[i] = window(stats.sales)
+        overstock[i] = window(stats.overstock)
+        balance[i] = corp.bank_interface.check_balance()
+
+    # Summed left to right, like the builtin sum in forecast
+    total_costs = costs[:, 0] + costs[:, 1] + costs[:, 2] + costs[:, 3]
+    total_revenue = (
+        revenue[:, 0] + revenue[:, 1] + revenue[:, 2] + revenue[:, 3]
+    )
+    net_margin = total_revenue - total_costs
+    burn = np.maximum(0, total_costs - total_revenue)
+    with np.errstate(divide="ignore"):
+        runway = np.where(burn > 0, balance / burn, np.inf)
+
+    columns = (
+        runway.tolist(),
+        burn.tolist(),
+        net_margin.tolist(),
+        trends(revenue).tolist(),
+        trends(sales).tolist(),
+        trends(overstock).tolist(),
+    )
+    return [
+        FinancialSnapshot(corp.tick, *row) for corp, row in zip(corps, zip(*columns))
+    ]
+
+
+def finance_recommendations(
+    corps: list["Corporation"], allow_borrow: bool = True
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Actions (indices into ACTIONS) and amounts for every corporation, the
+    same as calling finance_recommendation on each. The snapshots are cached
+    on the corporations, so the bank's credit check reuses them.
+    """
+    if not corps:
+        return np.zeros(0, dtype=np.int64), np.zeros(0)
+
+    for corp in corps:
+        if corp.tick < LOOKBACK:
+            raise Exception(
+                f"Not enough data to review finance on tick {corp.tick}"
+            )
+
+    # Corporations with a snapshot of this tick keep it, those with a
+    # shorter history than the window fall back to their own computation
+    fresh = []
+    for corp in corps:
+        if corp.snapshot is not None and corp.snapshot.tick == corp.tick:
+            continue
+        if len(corp.stats.costs) > LOOKBACK:
+            fresh.append(corp)
+        else:
+            corp.financial_snapshot()
+    if fresh:
+        for corp, snapshot in zip(fresh, snapshots(fresh)):
+            corp.snapshot = snapshot
+            corp.snapshot_misses += 1
+
+    runway = np.array([corp.snapshot.runway for corp in corps])
+    burn = np.array([corp.snapshot.burn for corp in corps])
+    revenue_trend = np.array([corp.snapshot.revenue_trend for corp in corps])
+
+    monthly_burn = np.where(burn > 0, burn / 4, 0)
+    with np.errstate(invalid="ignore"):
+        # inf runway with no burn gives nan, which is never > 0
+        missing = (TARGET_RUNWAY - runway) * monthly_burn
+    losing = missing > 0
+    growing = revenue_trend >= 0
+
+    actions = np.select(
+        [
+            losing & growing & allow_borrow,
+            losing & (runway < 3),
+            losing,
+            growing,
+        ],
+        [BORROW, FIRE, LOWER_SALARY, INCREASE_PRICE],
+        DECREASE_PRICE,
+    )
+    amounts = np.where((actions == BORROW) | (actions == FIRE), missing, 0)
+    return actions, amounts
+
+
+def finance_actions(corps: list["Corporation"]) -> list[tuple[str, float]]:
+    """Decide for all corporations at once, then apply each decision."""
+    actions, amounts = finance_recommendations(corps)
+    return [
+        corp.apply_finance_action(ACTIONS[action], amount)
+        for corp, action, amount in zip(corps, actions.tolist(), amounts.tolist())
+    ]
@@ -0,0 +1,112 @@
+from typing import TYPE_CHECKING, Iterable
+from banking.bank_interface import batch_deposit
+import numpy as np
+
+if TYPE_CHECKING:
+    from .person import Person
+    from settings import SimulationSettings
+
+
+class Government:
+    """
+    Unemployment benefits. Claims are kept as array columns indexed by the
+    person's row, so each tick's payout is computed for everyone at once and
+    paid with one batched deposit per bank. Every payment is the previous
+    one times the replacement rate, starting from the last salary.
+    """
+
+    def __init__(self, sim_settings: "SimulationSettings") -> None:
+        self.sim_settings = sim_settings
+        self.tick: int = 0
+        self.people: list["Person | None"] = []
+        self.rows: dict["Person", int] = {}
+        # Rows of released people, filled again by register
+        self.free_rows: list[int] = []
+        self.last_salary = np.zeros(0)
+        self.claim_start = np.zeros(0, dtype=np.int64)
+        self.claiming = np.zeros(0, dtype=bool)
+        # Payments made on the current claim
+        self.payments = np.zeros(0, dtype=np.int64)
+        self.total_paid: float = 0
+
+    def set_tick(self, tick: int) -> None:
+        self.tick = tick
+
+    def register(self, people: list["Person"]) -> None:
+        reused = min(len(people), len(self.free_rows))
+        for person in people[:reused]:
+            row = self.free_rows.pop()
+            self.people[row] = person
+            self.rows[person] = row
+        people = people[reused:]
+
+        start = len(self.people)
+        self.rows.update(zip(people, range(start, start + len(people))))
+        self.people.extend(people)
+
+        n = len(self.people) - len(self.last_salary)
+        self.last_salary = np.concatenate([self.last_salary, np.zeros(n)])
+        self.claim_start = np.concatenate(
+            [self.claim_start, np.zeros(n, dtype=np.int64)]
+        )
+        self.claiming = np.concatenate([self.claiming, np.zeros(n, dtype=bool)])
+        self.payments = np.concatenate([self.payments, np.zeros(n, dtype=np.int64)])
+
+    def release(self, people: Iterable["Person"]) -> None:
+        """Free the rows of people who left the economy, e.g. merged cohorts."""
+        rows = self._rows(self._registered(people))
+        self.claiming[rows] = False
+        for row in rows.tolist():
+            del self.rows[self.people[row]]
+            self.people[row] = None
+        self.free_rows.extend(rows.tolist())
+
+    def _registered(self, people: Iterable["Person"]) -> list["Person"]:
+        return [person for person in people if person in self.rows]
+
+    def _rows(self, people: list["Person"]) -> np.ndarray:
+        return np.asarray([self.rows[person] for person in people], dtype=np.int64)
+
+    def enroll(self, people: Iterable["Person"]) -> None:
+        """Start a claim, based on the last salary, for people losing their job."""
+        people = self._registered(people)
+        rows = self._rows(people)
+        self.last_salary[rows] = [person.salary for person in people]
+        self.claim_start[rows] = self.tick
+        self.claiming[rows] = True
+        self.payments[rows] = 0
+
+    def withdraw(self, people: Iterable["Person"]) -> None:
+        self.claiming[self._rows(self._registered(people))] = False
+
+    def benefits(self) -> tuple[np.ndarray, np.ndarray]:
+        """Rows and amounts of all claims paid out this tick."""
+        active = self.claiming
+        if self.sim_settings.benefit_duration > 0:
+            active = active & (
+                self.tick - self.claim_start < self.sim_settings.benefit_duration
+            )
+        rows = np.flatnonzero(active)
+
+        # People who never had a salary get the flat benefit
+        base = self.last_salary[rows]
+        base = np.where(base > 0, base, self.sim_settings.benefit)
+        rate = self.sim_settings.benefit_replacement_rate
+        return rows, base * rate ** (self.payments[rows] + 1)
+
+    def pay_benefits(self) -> float:
+        rows, amounts = self.benefits()
+        self.payments[rows] += 1
+        people = [self.people[row] for row in rows]
+        # A cohort claims once for every person it represents
+        amounts = amounts * np.array([person.weight for person in people])
+        tids = batch_deposit(
+            [person.bank_interface for person in people], amounts.tolist()
+        )
+        for person, tid, amount in zip(people, tids, amounts.tolist()):
+            person.latest_salary_id = tid
+            person.latest_income = amount
+
+        paid = float(amounts.sum())
+        self.total_paid += paid
+        return paid
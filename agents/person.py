@@ -2,40 +2,101 @@ from banking.bank_interface import BankInterface
 from banking.agents.bank import Bank
 from typing import Union
 from agents.corporation import Corporation, Good
-from base_agent import BaseAgent
+from base_agent import AgentIds, BaseAgent
+from itertools import accumulate
+import numpy as np
 import random
 
 
 class Person(BaseAgent):
 
-    def __init__(self, bank: Union[Bank, None] = None) -> None:
-        super().__init__("Person")  # Initialize BaseAgent with Person prefix
-        self.bank_interface = BankInterface(bank, self) if bank else None
+    __slots__ = (
+        "bank_interface",
+        "bought_goods",
+        "mpc",
+        "latest_spending",
+        "latest_budget",
+        "employed",
+        "employer",
+        "salary",
+        "latest_salary_id",
+        "latest_income",
+        "latest_queue_size",
+        "weight",
+    )
+
+    def __init__(
+        self,
+        bank: Union[Bank, None] = None,
+        account_id: int | None = None,
+        ids: AgentIds | None = None,
+    ) -> None:
+        super().__init__("Person", ids)  # Initialize BaseAgent with Person prefix
+        self.bank_interface = BankInterface(bank, self, account_id) if bank else None
         self.bought_goods: list[Good] = []
         self.mpc: float = 0.5
         self.latest_spending: int = 0
         self.latest_budget: int = 0
         self.employed: bool = False
+        self.employer: Union[Corporation, None] = None
+        self.salary: float = 0
         self.latest_salary_id: str = None
+        # Amount of the latest salary, severance or benefit deposit
+        self.latest_income: float = 0
         self.latest_queue_size: int = 0
+        # Number of identical people this agent represents (a cohort)
+        self.weight: int = 1
+
+    def split(self, weight: int) -> "Person":
+        """
+        Split off a cohort of `weight` people with the same state and a
+        proportional share of balance and income.
+        """
+        if not 0 < weight < self.weight:
+            raise ValueError(
+                f"Cannot split {weight} people off a cohort of {self.weight}"
+            )
+
+        share = weight / self.weight
+        cohort = Person(bank=self.bank_interface.bank, ids=self.ids)
+        cohort.mpc = self.mpc
+        cohort.employed = self.employed
+        cohort.employer = self.employer
+        cohort.salary = self.salary
+        cohort.weight = weight
+        cohort.latest_income = self.latest_income * share
+        self.latest_income -= cohort.latest_income
+        self.weight -= weight
+
+        balance = self.bank_interface.check_balance() * share
+        if balance > 0:
+            self.bank_interface.transfer(balance, to=cohort.bank_interface)
+        return cohort
 
-    def choose_corporations(self, corps: list[Corporation]):
+    def choose_corporations(
+        self, corps: list[Corporation], cum_weights: list[float] | None = None
+    ):
         # return one corporation at random
         # with inverse price as weight
-        corp = random.choices(
-            corps, weights=[1 / corp.current_price for corp in corps], k=1
-        )[0]
+        if cum_weights is None:
+            cum_weights = list(accumulate(1 / corp.current_price for corp in corps))
+        corp = random.choices(corps, cum_weights=cum_weights, k=1)[0]
         return corp
 
     def purchase_queue(self, corps: list[Corporation], budget: int):
         # Generate a list of to purchase goods from
         # as long as budget allows
         queue = []
+        if not corps:
+            return queue
+        # Prices don't change while we shop, weigh the corporations once
+        cum_weights = list(accumulate(1 / corp.current_price for corp in corps))
+        cheapest = min(corp.current_price for corp in corps)
         while budget > 0:
             # Check if any corporation has affordable goods
-            if not any(corp.current_price <= budget for corp in corps):
+            if cheapest > budget:
                 break
-            corp = self.choose_corporations(corps)
+            corp = self.choose_corporations(corps, cum_weights)
             if corp.current_price <= budget:
                 budget -= corp.current_price
                 corp.register_demand(1)
@@ -43,7 +104,63 @@ class Person(BaseAgent):
 
         return queue
 
+    def consideration_set(
+        self, corps: list[Corporation], breadth: int
+    ) -> list[Corporation]:
+        """
+        The corporations this person compares this tick: a uniform sample of
+        `breadth` of them, or all of them if breadth is 0. A cohort samples
+        once for each of its people, so it considers up to breadth * weight.
+        """
+        k = breadth * self.weight
+        if breadth <= 0 or k >= len(corps):
+            return corps
+        return random.sample(corps, k)
+
+    def bulk_buy(self, corps: list[Corporation], budget: int) -> int:
+        """
+        Spend a cohort's budget as if each of its people ran purchase_queue
+        on an equal share of it, with one vectorized draw per round instead
+        of one draw per good.
+        """
+        affordable = [corp for corp in corps if corp.current_price <= budget]
+        if not affordable:
+            self.latest_queue_size = 0
+            return 0
+
+        prices = np.array([corp.current_price for corp in affordable], dtype=float)
+        weights = 1 / prices
+        weights /= weights.sum()
+        rng = np.random.default_rng(random.getrandbits(64))
+        remaining = np.full(self.weight, budget / self.weight)
+        counts = np.zeros(len(affordable), dtype=np.int64)
+        while True:
+            # People who can still afford the cheapest good keep drawing
+            active = np.flatnonzero(remaining >= prices.min())
+            if len(active) == 0:
+                break
+            choice = rng.choice(len(affordable), size=len(active), p=weights)
+            buys = prices[choice] <= remaining[active]
+            remaining[active[buys]] -= prices[choice[buys]]
+            counts += np.bincount(choice[buys], minlength=len(affordable))
+
+        self.latest_queue_size = int(counts.sum())
+        bought = 0
+        for corp, count in zip(affordable, counts.tolist()):
+            if count == 0:
+                continue
+            corp.register_demand(count)
+            goods = corp.sell_goods(self.bank_interface, count)
+            bought += len(goods)
+            self.bought_goods.extend(goods)
+            self.latest_spending += corp.current_price * len(goods)
+
+        return bought
+
     def buy_goods(self, corps: list[Corporation], budget: int) -> int:
+        if self.weight > 1:
+            return self.bulk_buy(corps, budget)
+
         queue = self.purchase_queue(corps, budget)
         self.latest_queue_size = len(queue)
         bought = 0
@@ -59,10 +176,10 @@ class Person(BaseAgent):
     def spend(self, corps: list[Corporation], tid: Union[str, None] = None) -> int:
         # TODO: find a way to trigger sell good even if the corporation has no inventory
         # so that we can register demand
-        if not tid:
-            tid = self.latest_salary_id
-
-        budget_ref = self.bank_interface.find_transaction(tid).amount
+        if tid:
+            budget_ref = self.bank_interface.find_transaction(tid).amount
+        else:
+            budget_ref = self.latest_income
         balance = self.bank_interface.check_balance()
 
         if balance == 0:
@@ -70,8 +187,9 @@ class Person(BaseAgent):
         elif balance < 0:
             raise Exception("account balance is negative")
 
-        # How much should the customer spend?
-        budget = budget_ref * self.mpc
+        # How much should the customer spend? Never more than we have, the
+        # last income may be an old one that has been spent since
+        budget = min(budget_ref * self.mpc, balance)
         self.latest_budget = budget
         return self.buy_goods(corps=corps, budget=int(budget))
 
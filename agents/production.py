@@ -0,0 +1,205 @@
+"""
+Multi-sector production with a sparse input-output matrix.
+
+Every corporation belongs to a sector, and matrix[i, j] is how many units of
+sector i's good go into one unit produced in sector j. Before production,
+corporations buy the inputs of their planned production from the inventories
+of the input sectors:
+
+- requirements are a (sectors, corporations) sparse matrix with one column per
+  corporation, so a tick costs O(corporations + nonzeros), never a pass over
+  pairs of corporations
+- buyers spend at most their balance left after salaries, a sector short of
+  goods rations all its buyers by the same ratio, and the scarcest input caps
+  each corporation's production
+- the units a sector sells are drawn from its sellers' inventories, and the
+  payment is shared by units sold
+- each corporation's purchases and sales are netted, then settled with one
+  batch withdraw and one batch deposit per bank
+
+Demand for inputs is registered with the sellers after production, like
+consumer demand, so it drives their production and hiring next tick.
+
+Usage:
+    sim.sim_settings.number_of_sectors = 3
+    sim.input_output = InputOutput(matrix)
+"""
+
+from typing import TYPE_CHECKING
+import random
+
+import numpy as np
+from scipy import sparse
+
+from banking.bank_interface import batch_deposit, batch_withdraw
+
+if TYPE_CHECKING:
+    from agents.corporation import Corporation
+
+# Spending stays this far below the budget, so rounding never overdraws
+MARGIN = 1e-9
+
+
+class InputOutput:
+
+    def __init__(self, matrix) -> None:
+        matrix = sparse.csc_array(matrix, dtype=float)
+        if matrix.shape[0] != matrix.shape[1]:
+            raise ValueError(f"Input-output matrix must be square, got {matrix.shape}")
+        if (matrix.data < 0).any():
+            raise ValueError("Input-output matrix must not be negative")
+        matrix.sum_duplicates()
+        self.matrix = matrix
+        # Input demand per corporation of the latest settle
+        self.demand: np.ndarray = np.zeros(0, dtype=np.int64)
+
+    @property
+    def sectors(self) -> int:
+        return self.matrix.shape[0]
+
+    def requirements(
+        self, sectors: np.ndarray, planned: np.ndarray
+    ) -> sparse.csc_array:
+        """Inputs of the planned production, (sectors, corporations)."""
+        requirements = self.matrix[:, sectors].tocsc()
+        requirements.data *= np.repeat(planned, np.diff(requirements.indptr))
+        return requirements
+
+    def settle(self, corps: list["Corporation"]) -> list[int]:
+        """
+        Buy and pay for the inputs of every corporation's planned production.
+        Returns how many goods each corporation can produce with its inputs.
+        """
+        n = len(corps)
+        if n == 0:
+            self.demand = np.zeros(0, dtype=np.int64)
+            return []
+
+        sectors = np.fromiter((corp.sector for corp in corps), np.int64, n)
+        if sectors.min() < 0 or sectors.max() >= self.sectors:
+            raise ValueError(
+                f"Corporation sectors must be in [0, {self.sectors}), "
+                f"got {sectors.min()} to {sectors.max()}"
+            )
+        planned = np.fromiter((corp.planned_production() for corp in corps), float, n)
+        inventory = np.fromiter((len(corp.goods) for corp in corps), np.int64, n)
+        price = np.fromiter((corp.current_price for corp in corps), float, n)
+        budget = np.fromiter(
+            (
+                corp.bank_interface.check_balance() - corp.salary * corp.headcount
+                for corp in corps
+            ),
+            float,
+            n,
+        )
+        budget = np.maximum(budget, 0) * (1 - MARGIN)
+
+        requirements = self.requirements(sectors, planned)
+        counts = np.diff(requirements.indptr)
+        rows = requirements.indices
+        cols = np.repeat(np.arange(n), counts)
+        units = requirements.data
+
+        # Inputs are bought at the inventory weighted price of their sector
+        supply = np.bincount(sectors, weights=inventory, minlength=self.sectors)
+        value = np.bincount(sectors, weights=inventory * price, minlength=self.sectors)
+        sector_price = np.divide(
+            value, supply, out=np.zeros(self.sectors), where=supply > 0
+        )
+
+        cost = np.bincount(cols, weights=units * sector_price[rows], minlength=n)
+        afford = np.minimum(
+            1, np.divide(budget, cost, out=np.ones(n), where=cost > 0)
+        )
+        need = np.bincount(rows, weights=units * afford[cols], minlength=self.sectors)
+        fill = np.minimum(
+            1, np.divide(supply, need, out=np.ones(self.sectors), where=need > 0)
+        )
+        scarcest = np.ones(n)
+        has_inputs = counts > 0
+        if has_inputs.any():
+            scarcest[has_inputs] = np.minimum.reduceat(
+                fill[rows], requirements.indptr[:-1][has_inputs]
+            )
+        factor = afford * scarcest
+
+        used = units * factor[cols]
+        paid = np.bincount(cols, weights=used * sector_price[rows], minlength=n)
+        bought = np.bincount(rows, weights=used, minlength=self.sectors)
+        sold, revenue = self._sell(sectors, inventory, bought, sector_price)
+        self._settle(corps, paid, sold, revenue)
+
+        # Unrationed demand, shared by the sellers' inventories
+        demand = np.bincount(rows, weights=units, minlength=self.sectors)
+        share = np.divide(
+            inventory, supply[sectors], out=np.zeros(n), where=supply[sectors] > 0
+        )
+        per_corp = np.bincount(sectors, minlength=self.sectors)
+        share = np.where(supply[sectors] > 0, share, 1 / per_corp[sectors])
+        self.demand = np.ceil(demand[sectors] * share).astype(np.int64)
+
+        return np.floor(planned * factor + MARGIN).astype(np.int64).tolist()
+
+    @staticmethod
+    def _sell(
+        sectors: np.ndarray,
+        inventory: np.ndarray,
+        bought: np.ndarray,
+        sector_price: np.ndarray,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Draw the goods each sector sold from its sellers' inventories."""
+        n = len(sectors)
+        supply = np.bincount(sectors, weights=inventory, minlength=len(bought))
+        sector_sold = np.minimum(np.ceil(bought), supply).astype(np.int64)
+        sold = np.zeros(n, dtype=np.int64)
+        revenue = np.zeros(n)
+        selling = np.flatnonzero(sector_sold)
+        if not len(selling):
+            return sold, revenue
+
+        rng = np.random.default_rng(random.getrandbits(64))
+        by_sector = np.argsort(sectors, kind="stable")
+        ends = np.cumsum(np.bincount(sectors, minlength=len(bought)))
+        starts = np.concatenate(([0], ends[:-1]))
+        for sector in selling.tolist():
+            members = by_sector[starts[sector] : ends[sector]]
+            sold[members] = rng.multivariate_hypergeometric(
+                inventory[members], sector_sold[sector]
+            )
+        # Buyers' payments for a sector are shared by units sold
+        paid = bought * sector_price
+        revenue = paid[sectors] * sold / np.maximum(sector_sold[sectors], 1)
+        return sold, revenue
+
+    @staticmethod
+    def _settle(
+        corps: list["Corporation"],
+        paid: np.ndarray,
+        sold: np.ndarray,
+        revenue: np.ndarray,
+    ) -> None:
+        net = revenue - paid
+        payers = np.flatnonzero(net < 0).tolist()
+        payees = np.flatnonzero(net > 0).tolist()
+        batch_withdraw(
+            [corps[i].bank_interface for i in payers], (-net[payers]).tolist()
+        )
+        batch_deposit([corps[i].bank_interface for i in payees], net[payees].tolist())
+
+        for i in np.flatnonzero((paid > 0) | (sold > 0)).tolist():
+            corp = corps[i]
+            if paid[i] > 0:
+                corp.latest_costs += float(paid[i])
+                corp.stats.record(corp.tick, costs=corp.latest_costs)
+            if sold[i] > 0:
+                del corp.goods[: sold[i]]
+                corp.latest_sales += int(sold[i])
+                corp.latest_revenue += float(revenue[i])
+                corp.stats.record(corp.tick, sales=corp.latest_sales)
+                corp.stats.record(corp.tick, revenue=corp.latest_revenue)
+
+    def register_demand(self, corps: list["Corporation"]) -> None:
+        """Register the latest input demand with the sellers, after production."""
+        for corp, demand in zip(corps, self.demand.tolist()):
+            if demand:
+                corp.register_demand(demand)
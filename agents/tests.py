@@ -1,9 +1,14 @@
 import pytest
 from agents.person import Person
 from agents.corporation import Corporation, Good
+from agents.workforce import Workforce
+from agents.government import Government
+from agents.production import InputOutput
 from banking.agents.bank import Bank
 from banking.agents.central_bank import CentralBank
 from banking.bank_interface import BankInterface
+from settings import SimulationSettings
+from banking.bank_accounting import Loan
 from logging_config import get_logger
 import numpy as np
 import math
@@ -16,7 +21,6 @@ def test_person_spend():
     central_bank = CentralBank()
     bank = Bank(central_bank)
     bank_2 = Bank(central_bank)
-    person.bank = bank
     person.bank_interface = BankInterface(bank, person)
     tid = person.bank_interface.deposit(100)
 
@@ -203,3 +207,285 @@ def test_finance_recommendation(deposit, costs, revenue, sales, expected) -> Non
     corporation.stats.sales = sales
     recommendation = corporation.finance_recommendation(allow_borrow=True)
     assert recommendation == expected
+
+
+def test_financial_snapshot_cache() -> None:
+    corporation = Corporation()
+    corporation.bank_interface = BankInterface(Bank(CentralBank()), corporation)
+    corporation.bank_interface.deposit(1000)
+    corporation.stats.costs = {0: 100, 1: 100, 2: 120, 3: 155, 4: 0}
+    corporation.stats.revenue = {0: 95, 1: 95, 2: 105, 3: 120, 4: 0}
+    corporation.stats.sales = {0: 10, 1: 10, 2: 10, 3: 10, 4: 0}
+    corporation.stats.overstock = {0: 0, 1: 0, 2: 0, 3: 0, 4: 0}
+    corporation.set_tick(4)
+    corporation.stats.set_tick(4)
+
+    snapshot = corporation.financial_snapshot()
+    assert snapshot.burn == 60
+    assert corporation.bank_interface.bank.corp_credit_check(
+        10, corporation, corporation.bank_interface
+    ) == 10
+    assert corporation.snapshot_misses == 1
+    assert corporation.snapshot_hits == 1
+
+    # A new tick invalidates the snapshot
+    corporation.set_tick(5)
+    corporation.stats.set_tick(5)
+    corporation.stats.costs[5] = 0
+    corporation.stats.revenue[5] = 0
+    corporation.financial_snapshot()
+    assert corporation.snapshot_misses == 2
+
+
+def test_agent_ids_and_slots() -> None:
+    person_1 = Person()
+    person_2 = Person()
+    assert person_2.id == person_1.id + 1
+    assert person_1.name == f"Person-{person_1.id}"
+    assert Corporation().name.startswith("Corp-")
+
+    for obj in (person_1, Corporation(), BankInterface(Bank(CentralBank()))):
+        assert not hasattr(obj, "__dict__")
+    assert not hasattr(Good(price=1), "__dict__")
+
+
+def test_workforce_hire_and_fire() -> None:
+    central_bank = CentralBank()
+    banks = [Bank(central_bank), Bank(central_bank)]
+    people = [Person(bank=banks[i % 2]) for i in range(20)]
+    workforce = Workforce()
+    workforce.add_unemployed(people)
+
+    corporation = Corporation(bank=banks[0])
+    corporation.workforce = workforce
+    corporation.salary = 100
+    corporation.ppe = 10
+    corporation.latest_demand = 100
+    corporation.bank_interface.deposit(10000)
+
+    assert workforce.match([corporation]) == 10
+    assert len(workforce) == 10
+    assert workforce.headcount(corporation) == 10
+    assert corporation.hiring == False
+    assert all(p.employer is corporation for p in corporation.employees)
+
+    # Firing 3 people pays each of them one salary of severance
+    saved = corporation.remove_employees(250)
+    assert saved == 300
+    assert len(workforce) == 13
+    fired = [p for p in people if p.employed == False and p.salary == 100]
+    assert len(fired) == 3
+    for person in fired:
+        assert person.employer is None
+        assert person.bank_interface.check_balance() == 100
+        assert person.bank_interface.find_transaction(person.latest_salary_id).amount == 100
+    assert central_bank.reserves.sum() == 10300
+
+    workforce.remove_unemployed(fired)
+    assert len(workforce) == 10
+    assert not set(fired) & set(workforce.unemployed)
+
+
+def test_workforce_openings_without_output() -> None:
+    corporation = Corporation()
+    workforce = Workforce()
+    corporation.ppe = 0
+    corporation.latest_demand = 0
+    # add_employee accepts one person before it stops hiring
+    assert workforce.openings(corporation) == 1
+    corporation.latest_demand = 10
+    assert workforce.openings(corporation) == math.inf
+    corporation.hiring = False
+    assert workforce.openings(corporation) == 0
+
+
+def test_government_benefits() -> None:
+    central_bank = CentralBank()
+    banks = [Bank(central_bank), Bank(central_bank)]
+    people = [Person(bank=banks[i % 2]) for i in range(6)]
+    sim_settings = SimulationSettings(
+        benefit=40, benefit_replacement_rate=0.5, benefit_duration=3
+    )
+    government = Government(sim_settings)
+    government.register(people)
+    workforce = Workforce()
+    workforce.government = government
+
+    # Never employed → flat benefit
+    workforce.add_unemployed(people[:2])
+    # Laid off at tick 1 with a salary of 100
+    government.set_tick(1)
+    for person in people[2:4]:
+        person.salary = 100
+    workforce.add_unemployed(people[2:4])
+
+    government.set_tick(2)
+    assert government.pay_benefits() == 2 * 20 + 2 * 50
+    assert [p.bank_interface.check_balance() for p in people] == [20, 20, 50, 50, 0, 0]
+    assert people[2].bank_interface.find_transaction(people[2].latest_salary_id).amount == 50
+    assert list(central_bank.reserves) == [70, 70]
+
+    # Hired people stop claiming, claims end after benefit_duration ticks.
+    # Each payment is the previous one times the replacement rate.
+    workforce.remove_unemployed([people[2]])
+    government.set_tick(3)
+    assert government.pay_benefits() == 25
+    assert people[3].bank_interface.check_balance() == 75
+    government.set_tick(4)
+    assert government.pay_benefits() == 0
+
+
+def test_bankruptcy() -> None:
+    bank = Bank(CentralBank())
+    workforce = Workforce()
+    corporation = Corporation(bank=bank)
+    corporation.workforce = workforce
+    corporation.salary = 100
+    corporation.bank_interface.deposit(250)
+    people = [Person(bank=bank) for _ in range(3)]
+    corporation.add_employees(people)
+    loan = Loan(
+        tid="loan",
+        amount=50,
+        issued_by=bank,
+        issued_to=corporation.bank_interface,
+        interest_rate=0.01,
+    )
+    bank.loans[corporation.bank_interface.account_id] += loan.amount
+    corporation.loans = [loan]
+
+    # 300 payroll, 250 balance
+    corporation.one_tick(1)
+    assert corporation.alive == False
+    assert corporation.employees == set()
+    assert len(workforce) == 3
+    assert all(p.bank_interface.check_balance() == 0 for p in people)
+    assert loan.written_off == True
+    assert bank.written_off == 50
+    assert corporation.loans == []
+
+
+def test_cohort_split_and_hiring() -> None:
+    central_bank = CentralBank()
+    bank = Bank(central_bank)
+    cohort = Person(bank=bank)
+    cohort.weight = 30
+    cohort.mpc = 0.4
+    cohort.bank_interface.deposit(300)
+    workforce = Workforce()
+    workforce.register([cohort])
+    workforce.add_unemployed([cohort])
+
+    part = cohort.split(10)
+    assert (cohort.weight, part.weight) == (20, 10)
+    assert part.mpc == 0.4
+    assert cohort.bank_interface.check_balance() == 200
+    assert part.bank_interface.check_balance() == 100
+    with pytest.raises(ValueError):
+        cohort.split(20)
+    workforce.register([part])
+    workforce.add_unemployed([part])
+
+    corporation = Corporation(bank=bank)
+    corporation.workforce = workforce
+    corporation.salary = 100
+    corporation.ppe = 10
+    corporation.latest_demand = 120
+    corporation.bank_interface.deposit(10000)
+
+    # 12 openings are filled by splitting cohorts, not by hiring 12 agents
+    assert workforce.match([corporation]) == 12
+    assert corporation.headcount == 12
+    assert sum(p.weight for p in workforce.unemployed) == 18
+    assert sum(p.weight for p in workforce.population) == 30
+
+    corporation.pay_salaries()
+    assert corporation.bank_interface.check_balance() == 10000 - 1200
+    assert sum(p.latest_income for p in corporation.employees) == 1200
+
+    # Firing 5 people splits them off whichever cohort is popped
+    assert corporation.remove_employees(450) == 500
+    assert corporation.headcount == 7
+    assert sum(p.weight for p in workforce.unemployed) == 23
+
+
+def test_cohort_bulk_buy() -> None:
+    central_bank = CentralBank()
+    bank = Bank(central_bank)
+    cohort = Person(bank=bank)
+    cohort.weight = 100
+    cohort.bank_interface.deposit(1000)
+
+    corps = []
+    for price in (10, 20):
+        corporation = Corporation(bank=bank)
+        corporation.current_price = price
+        corporation.goods = [Good(price=price) for _ in range(100)]
+        corps.append(corporation)
+
+    bought = cohort.buy_goods(corps, 1000)
+    assert bought == len(cohort.bought_goods) > 0
+    assert cohort.latest_spending <= 1000
+    assert cohort.bank_interface.check_balance() == 1000 - cohort.latest_spending
+    assert sum(c.latest_demand for c in corps) >= bought
+    assert sum(c.latest_revenue for c in corps) == cohort.latest_spending
+
+
+def test_consideration_set() -> None:
+    bank = Bank(CentralBank())
+    corps = [Corporation(bank=bank) for _ in range(20)]
+    person = Person(bank=bank)
+
+    assert person.consideration_set(corps, 0) is corps
+    sampled = person.consideration_set(corps, 3)
+    assert len(sampled) == len(set(sampled)) == 3
+    assert set(sampled) <= set(corps)
+
+    person.weight = 5
+    assert len(person.consideration_set(corps, 3)) == 15
+    person.weight = 10
+    assert person.consideration_set(corps, 3) is corps
+
+
+def test_input_output_settle() -> None:
+    central_bank = CentralBank()
+    bank = Bank(central_bank)
+
+    seller = Corporation(bank)
+    seller.current_price = 5
+    seller.goods = [Good(price=5) for _ in range(10)]
+
+    buyers = []
+    # The second buyer can only afford half its inputs after salaries
+    for balance in (100, 30):
+        buyer = Corporation(bank)
+        buyer.sector = 1
+        buyer.bank_interface.deposit(balance)
+        buyer.salary = 10
+        buyer.headcount = 1
+        buyer.ppe = 10
+        buyer.latest_demand = 4
+        buyers.append(buyer)
+
+    # Two units of sector 0 per unit of sector 1
+    input_output = InputOutput(np.array([[0, 2], [0, 0]]))
+    corps = [seller, *buyers]
+    limits = input_output.settle(corps)
+
+    # 12 units needed, 10 in stock, both buyers rationed by 10 / 12
+    assert limits == [0, 3, 1]
+    assert len(seller.goods) == 0
+    assert seller.latest_sales == 10
+    assert seller.bank_interface.check_balance() == pytest.approx(50)
+    assert buyers[0].latest_costs == pytest.approx(100 / 3)
+    assert buyers[1].latest_costs == pytest.approx(50 / 3)
+    assert buyers[1].bank_interface.check_balance() > buyers[1].salary
+    assert central_bank.get_reserve(bank) == pytest.approx(130)
+
+    # Unrationed demand goes to the seller after production
+    input_output.register_demand(corps)
+    assert seller.latest_demand == 16
+
+    buyers[0].sector = 2
+    with pytest.raises(ValueError):
+        input_output.settle(corps)
@@ -0,0 +1,183 @@
+from typing import TYPE_CHECKING, Iterable
+import math
+import random
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from .person import Person
+    from .corporation import Corporation
+    from .government import Government
+
+
+class Workforce:
+    """
+    Registry of the labor market: the unemployed pool and headcount per
+    corporation. Hiring and firing cost time proportional to the number of
+    people changing jobs, never the size of the population.
+    """
+
+    def __init__(self) -> None:
+        # Everyone in the economy, shared with Simulation.people
+        self.population: list["Person"] = []
+        self.unemployed: list["Person"] = []
+        self._position: dict["Person", int] = {}
+        # Notified when people enter or leave the pool
+        self.government: "Government | None" = None
+
+    def __len__(self) -> int:
+        return len(self.unemployed)
+
+    def headcount(self, corp: "Corporation") -> int:
+        return corp.headcount
+
+    def register(self, people: list["Person"]) -> None:
+        """Add new people (or cohorts split off existing ones) to the economy."""
+        self.population.extend(people)
+        if self.government is not None:
+            self.government.register(people)
+
+    def unregister(self, people: list["Person"]) -> None:
+        """Remove people from the economy, e.g. when cohorts are merged."""
+        self.remove_unemployed(people)
+        leaving = set(people)
+        self.population[:] = [p for p in self.population if p not in leaving]
+        if self.government is not None:
+            self.government.release(people)
+
+    def add_unemployed(self, people: Iterable["Person"]) -> None:
+        added = [
+            person for person in dict.fromkeys(people) if person not in self._position
+        ]
+        start = len(self.unemployed)
+        self._position.update(zip(added, range(start, start + len(added))))
+        self.unemployed.extend(added)
+
+        if self.government is not None:
+            self.government.enroll(added)
+
+    def remove_unemployed(self, people: Iterable["Person"]) -> None:
+        people = list(people)
+        if self.government is not None:
+            self.government.withdraw(people)
+
+        if len(people) * 2 > len(self.unemployed):
+            # Most of the pool leaves (e.g. initial hiring), rebuild it once
+            leaving = set(people)
+            self.unemployed = [p for p in self.unemployed if p not in leaving]
+            self._position = {person: i for i, person in enumerate(self.unemployed)}
+            return
+
+        for person in people:
+            # Swap with the last person so removal is O(1)
+            position = self._position.pop(person, None)
+            if position is None:
+                continue
+            last = self.unemployed.pop()
+            if last is not person:
+                self.unemployed[position] = last
+                self._position[last] = position
+
+    def hire(self, corp: "Corporation", people: list["Person"]) -> None:
+        self.remove_unemployed(people)
+        corp.add_employees(people)
+
+    def openings(self, corp: "Corporation") -> float:
+        """How many people the corporation hires before it stops hiring."""
+        if not corp.hiring:
+            return 0
+        if corp.ppe <= 0:
+            # Without output no headcount meets a positive demand
+            return math.inf if corp.latest_demand > 0 else 1
+        needed = math.ceil(corp.latest_demand / corp.ppe) - corp.headcount
+        # add_employee always accepts one person while the corp is hiring
+        return max(needed, 1)
+
+    def match(self, corporations: list["Corporation"]) -> int:
+        """
+        Match unemployed people to hiring corporations, weighted by salary,
+        and hire them in bulk per corporation.
+        """
+        openings = {corp: self.openings(corp) for corp in corporations}
+        hiring_corps = [corp for corp in corporations if openings[corp] > 0]
+        if not hiring_corps:
+            return 0
+
+        rng = np.random.default_rng(random.getrandbits(64))
+        candidates = [self.unemployed[i] for i in rng.permutation(len(self.unemployed))]
+        hires: dict["Corporation", list["Person"]] = {}
+        self._match_people(
+            [person for person in candidates if person.weight == 1],
+            hiring_corps,
+            openings,
+            hires,
+            rng,
+        )
+
+        split = []
+        for person in candidates:
+            if person.weight == 1:
+                continue
+            employed = False
+            while not employed and hiring_corps:
+                # Spread a cohort as if each of its people drew an employer
+                salaries = np.array([c.salary for c in hiring_corps], dtype=float)
+                counts = rng.multinomial(person.weight, salaries / salaries.sum())
+                for corp, count in zip(list(hiring_corps), counts.tolist()):
+                    count = min(count, openings[corp])
+                    if count == 0:
+                        continue
+                    hired = person
+                    if count < person.weight:
+                        hired = person.split(count)
+                        split.append(hired)
+                    hires.setdefault(corp, []).append(hired)
+                    openings[corp] -= count
+                    if openings[corp] <= 0:
+                        hiring_corps.remove(corp)
+                    employed = hired is person
+            if not hiring_corps:
+                break
+
+        self.register(split)
+        # One pass over the pool for everyone hired, not one per corporation
+        self.remove_unemployed(
+            [person for people in hires.values() for person in people]
+        )
+        for corp, people in hires.items():
+            corp.add_employees(people)
+
+        return sum(person.weight for people in hires.values() for person in people)
+
+    @staticmethod
+    def _match_people(
+        people: list["Person"],
+        hiring_corps: list["Corporation"],
+        openings: dict["Corporation", float],
+        hires: dict["Corporation", list["Person"]],
+        rng: np.random.Generator,
+    ) -> None:
+        """
+        Draw an employer for everyone at once. People drawn past a
+        corporation's openings draw again among the corporations still hiring.
+        """
+        while people and hiring_corps:
+            salaries = np.array([c.salary for c in hiring_corps], dtype=float)
+            choice = rng.choice(
+                len(hiring_corps), size=len(people), p=salaries / salaries.sum()
+            )
+            by_corp = np.argsort(choice, kind="stable")
+            bounds = np.cumsum(np.bincount(choice, minlength=len(hiring_corps)))
+
+            left = []
+            for corp, drawn in zip(hiring_corps, np.split(by_corp, bounds[:-1])):
+                hired = int(min(len(drawn), openings[corp]))
+                if hired:
+                    hires.setdefault(corp, []).extend(
+                        people[i] for i in drawn[:hired].tolist()
+                    )
+                    openings[corp] -= hired
+                left.append(drawn[hired:])
+
+            people = [people[i] for i in np.sort(np.concatenate(left)).tolist()]
+            hiring_corps[:] = [corp for corp in hiring_corps if openings[corp] > 0]
@@ -1,39 +1,162 @@
 from banking.bank_accounting import Deposit, Withdraw, Loan
+from banking.journal import DEPOSIT, WITHDRAW, TransactionJournal
+from event_log import EventKind
 from typing import TYPE_CHECKING, Union, Tuple
+import numpy as np
 import uuid
 
 if TYPE_CHECKING:
     from banking.bank_interface import BankInterface
     from agents.corporation import Corporation
+    from banking.agents.central_bank import CentralBank
+    from event_log import EventLog
+    from storage import ColumnStore
+    from tracing import Tracer
 
 
 class Bank:
 
     def __init__(self, central_bank: "CentralBank") -> None:
-        self.deposits: dict["BankInterface", list[Deposit]] = {}
-        self.withdraws: dict["BankInterface", list[Withdraw]] = {}
-        self.loans: dict["BankInterface", list[Loan]] = {}
-        self.Ledger: dict["BankInterface", float] = {}
+        # Per-account state, indexed by BankInterface.account_id
+        self.accounts: list["BankInterface | None"] = []
+        self.deposits: list[list[Deposit]] = []
+        self.withdraws: list[list[Withdraw]] = []
+        # Closed empty accounts, handed out again by register_BankInterface
+        self.free_accounts: list[int] = []
+        # Balances of all accounts, grown by doubling
+        self.Ledger = np.zeros(64)
+        # Amount lent to and written off for every account, grown with the
+        # ledger. The Loan objects are kept by the borrowers.
+        self.loans = np.zeros(64)
+        self.loans_written_off = np.zeros(64)
+        # Holds the ledger and loans as columns when set, see use_store
+        self.store: "ColumnStore | None" = None
+        # Attribute -> column name in store
+        self.column_names: dict[str, str] = {}
+        self.written_off: float = 0
+        self.bank_id: int = -1
         self.central_bank = central_bank
         self.central_bank.register_bank(self)
         self.interest_rate = 0.01
         self.tick = 0
+        self.event_log: "EventLog | None" = None
+        # Keeps deposits and withdraws instead of the per-account lists, set
+        # it before the first account is registered
+        self.journal: "TransactionJournal | None" = None
+        # Records sampled transfers and lookups, see Simulation.attach_tracer
+        self.tracer: "Tracer | None" = None
+
+    def use_store(self, store: "ColumnStore", prefix: str) -> None:
+        """
+        Keep the ledger, the loans and a transaction journal in store
+        columns, so with a memory-mapped store none of them is bounded by RAM.
+        Call it before the first account is registered.
+        """
+        self.store = store
+        self.column_names = {
+            "Ledger": f"{prefix}-ledger",
+            "loans": f"{prefix}-loans",
+            "loans_written_off": f"{prefix}-loans-written-off",
+        }
+        for attribute, name in self.column_names.items():
+            values = getattr(self, attribute)
+            column = store.column(name, np.float64, len(values))
+            column[: len(values)] = values
+            setattr(self, attribute, column)
+        self.journal = TransactionJournal(store, prefix)
+
+    def _grow_ledger(self, size: int) -> None:
+        """Grow the ledger and the loan columns to size accounts."""
+        for attribute in ("Ledger", "loans", "loans_written_off"):
+            if self.store is not None:
+                grown = self.store.grow(self.column_names[attribute], size)
+            else:
+                values = getattr(self, attribute)
+                grown = np.zeros(size)
+                grown[: len(values)] = values
+            setattr(self, attribute, grown)
 
     @staticmethod
     def generate_uid() -> str:
         return str(uuid.uuid4())
 
     def _update_ledger(self, bank_interface: "BankInterface", amount: float) -> None:
-        self.Ledger[bank_interface] += amount
+        self.Ledger[bank_interface.account_id] += amount
 
     def get_ledger(self, bank_interface: "BankInterface") -> float:
-        return self.Ledger[bank_interface]
+        return float(self.Ledger[bank_interface.account_id])
+
+    def balances(self) -> np.ndarray:
+        """Balances of all registered accounts, indexed by account id."""
+        return self.Ledger[: len(self.accounts)]
+
+    def _log_event(
+        self,
+        kind: EventKind,
+        bank_interface: "BankInterface",
+        amount: float,
+        to: Union["BankInterface", None] = None,
+    ) -> None:
+        self.event_log.write(
+            kind,
+            bank_interface.entity or bank_interface,
+            (to.entity or to) if to else None,
+            amount,
+        )
+
+    def register_BankInterface(self, bank_interface: "BankInterface") -> int:
+        if self.free_accounts:
+            account_id = self.free_accounts.pop()
+            self.accounts[account_id] = bank_interface
+            return account_id
+
+        account_id = len(self.accounts)
+        if account_id == len(self.Ledger):
+            self._grow_ledger(2 * len(self.Ledger))
 
-    def register_BankInterface(self, bank_interface: "BankInterface") -> None:
-        self.deposits[bank_interface] = []
-        self.withdraws[bank_interface] = []
-        self.loans[bank_interface] = []
-        self.Ledger[bank_interface] = 0
+        self.accounts.append(bank_interface)
+        if self.journal is None:
+            self.deposits.append([])
+            self.withdraws.append([])
+        return account_id
+
+    def register_accounts(self, n: int) -> range:
+        """
+        Reserve n account ids at once, growing the ledger a single time.
+        The accounts are filled in by BankInterface(bank, entity, account_id).
+        """
+        start = len(self.accounts)
+        needed = start + n
+        if needed > len(self.Ledger):
+            size = max(len(self.Ledger), 1)
+            while size < needed:
+                size *= 2
+            self._grow_ledger(size)
+
+        self.accounts.extend([None] * n)
+        if self.journal is None:
+            self.deposits.extend([[] for _ in range(n)])
+            self.withdraws.extend([[] for _ in range(n)])
+        return range(start, needed)
+
+    def close_account(
+        self, bank_interface: "BankInterface", reuse: bool = False
+    ) -> None:
+        """
+        Drop the holder and transaction history of an account whose holder
+        left the economy. Balance and loans stay in the ledger, so the bank
+        still adds up to its reserve plus loans. With reuse the account must
+        be empty, and its id goes to the next account registered.
+        """
+        account_id = bank_interface.account_id
+        if reuse and (self.Ledger[account_id] != 0 or self.loans[account_id] != 0):
+            raise ValueError(f"Account {account_id} is not empty, cannot reuse it")
+        self.accounts[account_id] = None
+        if self.journal is None:
+            self.deposits[account_id] = []
+            self.withdraws[account_id] = []
+        if reuse:
+            self.free_accounts.append(account_id)
 
     def transfer(
         self,
@@ -49,16 +172,40 @@ class Bank:
         if amount < 0:
             raise ValueError(f"Amount must be positive, got {amount}")
 
-        if from_ not in self.Ledger:
+        if from_.bank is not self:
             raise ValueError(f"BankInterface {from_} not found in bank {self}")
 
+        start = self.tracer.sample("transfer") if self.tracer is not None else None
         # Withdraw from self
-        wtid = self.withdraw(amount, from_)
+        wtid = self._withdraw(amount, from_)
         # Deposit to bank
-        dtid = to.bank.deposit(amount, to)
+        dtid = to.bank._deposit(amount, to)
+
+        if self.event_log is not None:
+            self._log_event(EventKind.TRANSFER, from_, amount, to)
+        if start is not None:
+            self.tracer.complete("transfer", "bank", start, {"amount": amount})
         return wtid, dtid
 
     def withdraw(self, amount: float, bank_interface: "BankInterface") -> str:
+        start = self.tracer.sample("withdraw") if self.tracer is not None else None
+        tid = self._withdraw(amount, bank_interface)
+        if self.event_log is not None:
+            self._log_event(EventKind.WITHDRAW, bank_interface, amount)
+        if start is not None:
+            self.tracer.complete("withdraw", "bank", start, {"amount": amount})
+        return tid
+
+    def deposit(self, amount: float, bank_interface: "BankInterface") -> str:
+        start = self.tracer.sample("deposit") if self.tracer is not None else None
+        tid = self._deposit(amount, bank_interface)
+        if self.event_log is not None:
+            self._log_event(EventKind.DEPOSIT, bank_interface, amount)
+        if start is not None:
+            self.tracer.complete("deposit", "bank", start, {"amount": amount})
+        return tid
+
+    def _withdraw(self, amount: float, bank_interface: "BankInterface") -> str:
 
         if amount > self.get_ledger(bank_interface):
             raise ValueError(
@@ -70,35 +217,124 @@ class Bank:
 
         # Generate transaction id
         tid = self.generate_uid()
-        # Generate withdraw object
-        withdraw = Withdraw(
-            tid=tid, amount=amount, withdrawn_by=bank_interface, withdrawn_from=self
-        )
-        # Add withdraw to withdraws ledger
-        self.withdraws[bank_interface].append(withdraw)
+        if self.journal is not None:
+            self.journal.append(bank_interface.account_id, amount, WITHDRAW, tid)
+        else:
+            # Generate withdraw object
+            withdraw = Withdraw(
+                tid=tid, amount=amount, withdrawn_by=bank_interface, withdrawn_from=self
+            )
+            # Add withdraw to withdraws ledger
+            self.withdraws[bank_interface.account_id].append(withdraw)
         # Remove reserve from central bank
         self.central_bank.remove_reserve(amount, self)
 
         return tid
 
-    def deposit(self, amount: float, bank_interface: "BankInterface") -> str:
+    def _deposit(self, amount: float, bank_interface: "BankInterface") -> str:
 
         # Update ledger
         self._update_ledger(bank_interface, amount)
 
         # Generate transaction id
         tid = self.generate_uid()
-        # Generate deposit object
-        deposit = Deposit(
-            tid=tid, amount=amount, deposited_by=bank_interface, deposited_to=self
-        )
-        # Add deposit to deposits ledger
-        self.deposits[bank_interface].append(deposit)
+        if self.journal is not None:
+            self.journal.append(bank_interface.account_id, amount, DEPOSIT, tid)
+        else:
+            # Generate deposit object
+            deposit = Deposit(
+                tid=tid, amount=amount, deposited_by=bank_interface, deposited_to=self
+            )
+            # Add deposit to deposits ledger
+            self.deposits[bank_interface.account_id].append(deposit)
         # Add reserve to central bank
         self.central_bank.add_reserve(amount, self)
 
         return tid
 
+    def deposit_batch(
+        self, amounts: list[float], bank_interfaces: list["BankInterface"]
+    ) -> list[str]:
+        """Deposit into many accounts with a single ledger and reserve update."""
+        if not bank_interfaces:
+            return []
+        account_ids = [bank_interface.account_id for bank_interface in bank_interfaces]
+        np.add.at(self.Ledger, account_ids, amounts)
+
+        if self.journal is not None:
+            tids = [self.generate_uid() for _ in bank_interfaces]
+            self.journal.extend(account_ids, amounts, DEPOSIT, tids)
+            if self.event_log is not None:
+                for bank_interface, amount in zip(bank_interfaces, amounts):
+                    self._log_event(EventKind.DEPOSIT, bank_interface, amount)
+            self.central_bank.add_reserve(sum(amounts), self)
+            return tids
+
+        tids = []
+        for bank_interface, amount in zip(bank_interfaces, amounts):
+            tid = self.generate_uid()
+            self.deposits[bank_interface.account_id].append(
+                Deposit(
+                    tid=tid,
+                    amount=amount,
+                    deposited_by=bank_interface,
+                    deposited_to=self,
+                )
+            )
+            if self.event_log is not None:
+                self._log_event(EventKind.DEPOSIT, bank_interface, amount)
+            tids.append(tid)
+
+        self.central_bank.add_reserve(sum(amounts), self)
+        return tids
+
+    def withdraw_batch(
+        self, amounts: list[float], bank_interfaces: list["BankInterface"]
+    ) -> list[str]:
+        """Withdraw from many accounts with a single ledger and reserve update."""
+        if not bank_interfaces:
+            return []
+        account_ids = [bank_interface.account_id for bank_interface in bank_interfaces]
+        # Checked before anything changes, so a failing batch leaves no trace
+        ids, positions = np.unique(account_ids, return_inverse=True)
+        needed = np.zeros(len(ids))
+        np.add.at(needed, positions, amounts)
+        short = needed > self.Ledger[ids]
+        if short.any():
+            i = int(np.argmax(short))
+            raise ValueError(
+                f"Amount {needed[i]} is greater than bank balance "
+                f"{self.Ledger[ids[i]]}"
+            )
+        self.Ledger[ids] -= needed
+
+        if self.journal is not None:
+            tids = [self.generate_uid() for _ in bank_interfaces]
+            self.journal.extend(account_ids, amounts, WITHDRAW, tids)
+            if self.event_log is not None:
+                for bank_interface, amount in zip(bank_interfaces, amounts):
+                    self._log_event(EventKind.WITHDRAW, bank_interface, amount)
+            self.central_bank.remove_reserve(sum(amounts), self)
+            return tids
+
+        tids = []
+        for bank_interface, amount in zip(bank_interfaces, amounts):
+            tid = self.generate_uid()
+            self.withdraws[bank_interface.account_id].append(
+                Withdraw(
+                    tid=tid,
+                    amount=amount,
+                    withdrawn_by=bank_interface,
+                    withdrawn_from=self,
+                )
+            )
+            if self.event_log is not None:
+                self._log_event(EventKind.WITHDRAW, bank_interface, amount)
+            tids.append(tid)
+
+        self.central_bank.remove_reserve(sum(amounts), self)
+        return tids
+
     def get_reserve(self, bank: "Bank") -> float:
         return self.central_bank.get_reserve(bank)
 
@@ -122,17 +358,29 @@ class Bank:
         self._update_ledger(bank_interface, credit_amount)
 
         # Add loan to loans ledger
-        self.loans[bank_interface].append(loan)
+        self.loans[bank_interface.account_id] += credit_amount
+
+        if self.event_log is not None:
+            self._log_event(EventKind.LOAN, bank_interface, credit_amount)
         return loan
 
+    def write_off_loans(self, bank_interface: "BankInterface") -> float:
+        """Write off all outstanding loans of a bankrupt borrower."""
+        account_id = bank_interface.account_id
+        amount = float(self.loans[account_id] - self.loans_written_off[account_id])
+        self.loans_written_off[account_id] = self.loans[account_id]
+        self.written_off += amount
+        return amount
+
     def corp_credit_check(
         self, amount: float, corp: "Corporation", bank_interface: "BankInterface"
     ) -> float:
         # Financial indicators
         balance = self.get_ledger(bank_interface)
-        runway, burn, net_margin = corp.forecast()
-        trend = corp.revenue_trend()
-        current_loans = sum([l.amount for l in self.loans[bank_interface]])
+        snapshot = corp.financial_snapshot()
+        runway, net_margin = snapshot.runway, snapshot.net_margin
+        trend = snapshot.revenue_trend
+        current_loans = float(self.loans[bank_interface.account_id])
 
         # --- Risk assessment ---
         # If company is losing money and has <3 months runway → too risky
@@ -170,10 +418,33 @@ class Bank:
         if not isinstance(tid, str) or tid == "":
             raise ValueError(f"Transaction id {tid} is not a string or is empty")
 
-        for deposit in self.deposits[bank_interface]:
+        if self.tracer is not None:
+            start = self.tracer.sample("find_transaction")
+            if start is not None:
+                try:
+                    return self._find_transaction(tid, bank_interface)
+                finally:
+                    self.tracer.complete("find_transaction", "bank", start)
+        return self._find_transaction(tid, bank_interface)
+
+    def _find_transaction(
+        self, tid: str, bank_interface: "BankInterface"
+    ) -> Union[Deposit, Withdraw]:
+        if self.journal is not None:
+            found = self.journal.find(tid, bank_interface.account_id)
+            if found is None:
+                raise ValueError(
+                    f"Transaction {tid} not found for BankInterface {bank_interface}"
+                )
+            kind, amount = found
+            if kind == DEPOSIT:
+                return Deposit(tid, amount, bank_interface, self)
+            return Withdraw(tid, amount, bank_interface, self)
+
+        for deposit in self.deposits[bank_interface.account_id]:
             if deposit.tid == tid:
                 return deposit
-        for withdraw in self.withdraws[bank_interface]:
+        for withdraw in self.withdraws[bank_interface.account_id]:
             if withdraw.tid == tid:
                 return withdraw
 
@@ -182,27 +453,21 @@ class Bank:
         )
 
     def check_balance(self, bank_interface: "BankInterface") -> float:
-        deposits = self.deposits[bank_interface]
-        withdraws = self.withdraws[bank_interface]
+        if self.journal is not None:
+            return float(self.journal.balances([bank_interface.account_id])[0])
+        deposits = self.deposits[bank_interface.account_id]
+        withdraws = self.withdraws[bank_interface.account_id]
         total = sum(deposit.amount for deposit in deposits) - sum(
             withdraw.amount for withdraw in withdraws
         )
         return total
 
-
-class CentralBank:
-
-    def __init__(self) -> None:
-        self.reserves: dict["Bank", float] = {}
-
-    def register_bank(self, bank: "Bank") -> None:
-        self.reserves[bank] = 0
-
-    def remove_reserve(self, amount: float, bank: "Bank") -> None:
-        self.reserves[bank] -= amount
-
-    def add_reserve(self, amount: float, bank: "Bank") -> None:
-        self.reserves[bank] += amount
-
-    def get_reserve(self, bank: "Bank") -> float:
-        return self.reserves[bank]
+    def check_balances(self, bank_interfaces: list["BankInterface"]) -> np.ndarray:
+        """check_balance of many accounts, with one pass over the journal."""
+        if self.journal is not None:
+            return self.journal.balances(
+                [bank_interface.account_id for bank_interface in bank_interfaces]
+            )
+        return np.array(
+            [self.check_balance(bank_interface) for bank_interface in bank_interfaces]
+        )
@@ -1,16 +1,27 @@
+from typing import TYPE_CHECKING
+import numpy as np
+
+if TYPE_CHECKING:
+    from banking.agents.bank import Bank
+
+
 class CentralBank:
 
     def __init__(self) -> None:
-        self.reserves: dict["Bank", float] = {}
+        # Reserves of all banks, indexed by Bank.bank_id
+        self.banks: list["Bank"] = []
+        self.reserves = np.zeros(0)
 
     def register_bank(self, bank: "Bank") -> None:
-        self.reserves[bank] = 0
+        bank.bank_id = len(self.banks)
+        self.banks.append(bank)
+        self.reserves = np.append(self.reserves, 0.0)
 
     def remove_reserve(self, amount: float, bank: "Bank") -> None:
-        self.reserves[bank] -= amount
+        self.reserves[bank.bank_id] -= amount
 
     def add_reserve(self, amount: float, bank: "Bank") -> None:
-        self.reserves[bank] += amount
+        self.reserves[bank.bank_id] += amount
 
     def get_reserve(self, bank: "Bank") -> float:
-        return self.reserves[bank]
+        return float(self.reserves[bank.bank_id])
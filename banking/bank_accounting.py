@@ -6,16 +6,17 @@ if TYPE_CHECKING:
     from .bank_interface import BankInterface
 
 
-@dataclass
+@dataclass(slots=True)
 class Loan:
     tid: str
     amount: float
     issued_by: "Bank"
     issued_to: "BankInterface"
     interest_rate: float
+    written_off: bool = False
 
 
-@dataclass
+@dataclass(slots=True)
 class Deposit:
     tid: str
     amount: float
@@ -23,7 +24,7 @@ class Deposit:
     deposited_to: "Bank"
 
 
-@dataclass
+@dataclass(slots=True)
 class Withdraw:
     tid: str
     amount: float
@@ -31,7 +32,7 @@ class Withdraw:
     withdrawn_from: "Bank"
 
 
-@dataclass
+@dataclass(slots=True)
 class Reserve:
     tid: str
     amount: float
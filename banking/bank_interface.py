@@ -10,12 +10,22 @@ if TYPE_CHECKING:
 
 class BankInterface:
 
+    __slots__ = ("bank", "entity", "account_id")
+
     def __init__(
-        self, bank: "Bank", entity: Union["Person", "Corporation"] = None
+        self,
+        bank: "Bank",
+        entity: Union["Person", "Corporation"] = None,
+        account_id: int | None = None,
     ) -> None:
         self.bank = bank
         self.entity = entity
-        self.bank.register_BankInterface(self)
+        if account_id is None:
+            account_id = self.bank.register_BankInterface(self)
+        else:
+            # Reserved with Bank.register_accounts
+            self.bank.accounts[account_id] = self
+        self.account_id: int = account_id
 
     def check_balance(self) -> float:
         return self.bank.get_ledger(self)
@@ -37,3 +47,34 @@ class BankInterface:
 
     def borrow_funds(self, amount: float) -> str:
         return self.bank.issue_loan(amount, self.entity, self)
+
+
+def batch_deposit(
+    bank_interfaces: list["BankInterface"], amounts: list[float]
+) -> list[str]:
+    """Deposit into many accounts with one Bank.deposit_batch call per bank."""
+    return _per_bank("deposit_batch", bank_interfaces, amounts)
+
+
+def batch_withdraw(
+    bank_interfaces: list["BankInterface"], amounts: list[float]
+) -> list[str]:
+    """Withdraw from many accounts with one Bank.withdraw_batch call per bank."""
+    return _per_bank("withdraw_batch", bank_interfaces, amounts)
+
+
+def _per_bank(
+    method: str, bank_interfaces: list["BankInterface"], amounts: list[float]
+) -> list[str]:
+    by_bank: dict["Bank", list[int]] = {}
+    for i, bank_interface in enumerate(bank_interfaces):
+        by_bank.setdefault(bank_interface.bank, []).append(i)
+
+    tids = [""] * len(bank_interfaces)
+    for bank, indices in by_bank.items():
+        batch_tids = getattr(bank, method)(
+            [amounts[i] for i in indices], [bank_interfaces[i] for i in indices]
+        )
+        for i, tid in zip(indices, batch_tids):
+            tids[i] = tid
+    return tids
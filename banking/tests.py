@@ -4,6 +4,9 @@ from banking.agents.central_bank import CentralBank
 from banking.agents.bank import Bank
 from banking.bank_interface import BankInterface
 from banking.bank_accounting import Deposit, Withdraw
+from banking.bank_interface import batch_deposit, batch_withdraw
+from banking.journal import TransactionJournal
+from storage import ColumnStore
 from agents.person import Person
 from agents.corporation import Corporation
 import numpy as np
@@ -161,3 +164,78 @@ def test_corp_credit_check(deposit, costs, revenue, amount, expected):
         f"net_margin={corp.forecast()[2]:.2f}, "
         f"runway={corp.forecast()[0]:.2f})"
     )
+
+
+def test_account_ids() -> None:
+    central_bank = CentralBank()
+    bank_1 = Bank(central_bank)
+    bank_2 = Bank(central_bank)
+    interfaces = [BankInterface(bank_1) for _ in range(100)]
+    other = BankInterface(bank_2)
+
+    assert [bi.account_id for bi in interfaces] == list(range(100))
+    assert other.account_id == 0
+    assert (bank_1.bank_id, bank_2.bank_id) == (0, 1)
+
+    interfaces[70].deposit(30)
+    interfaces[70].transfer(10, to=other)
+    balances = bank_1.balances()
+    assert len(balances) == 100
+    assert balances[70] == 20
+    assert balances.sum() == interfaces[70].check_balance()
+    assert list(central_bank.reserves) == [20, 10]
+
+    with pytest.raises(ValueError):
+        bank_1.transfer(5, from_=other, to=interfaces[0])
+
+
+def test_register_accounts() -> None:
+    bank = Bank(CentralBank())
+    first = BankInterface(bank)
+    account_ids = bank.register_accounts(200)
+    assert account_ids == range(1, 201)
+    assert len(bank.Ledger) == 256
+
+    interfaces = [BankInterface(bank, None, account_id) for account_id in account_ids]
+    assert bank.accounts == [first] + interfaces
+    assert BankInterface(bank).account_id == 201
+
+    interfaces[-1].deposit(50)
+    first.deposit(5)
+    assert bank.balances()[[0, 200]].tolist() == [5, 50]
+    assert interfaces[-1].check_balance() == bank.check_balance(interfaces[-1]) == 50
+
+
+def test_transaction_journal(tmp_path) -> None:
+    central_bank = CentralBank()
+    bank = Bank(central_bank)
+    # Small chunks and buffer, so lookups cross chunk and file boundaries
+    store = ColumnStore(str(tmp_path), chunk_size=100)
+    bank.journal = TransactionJournal(store, "bank", buffer_size=64)
+    interfaces = [BankInterface(bank) for _ in range(3)]
+    assert bank.deposits == bank.withdraws == []
+
+    tid = interfaces[0].deposit(100)
+    wtid, dtid = interfaces[0].transfer(30, to=interfaces[1])
+    for _ in range(1500):
+        interfaces[2].deposit(1)
+    batch_deposit(interfaces[:2], [5, 7])
+    batch_withdraw(interfaces[1:], [2, 500])
+
+    assert interfaces[0].find_transaction(tid) == Deposit(
+        tid, 100, interfaces[0], bank
+    )
+    assert interfaces[0].find_transaction(wtid) == Withdraw(
+        wtid, 30, interfaces[0], bank
+    )
+    assert interfaces[1].find_transaction(dtid).amount == 30
+    with pytest.raises(ValueError):
+        interfaces[1].find_transaction(tid)
+
+    expected = [75, 35, 1000]
+    assert [i.check_balance() for i in interfaces] == expected
+    assert bank.check_balances(interfaces).tolist() == expected
+    assert bank.balances().tolist() == expected
+    assert central_bank.get_reserve(bank) == sum(expected)
+    assert len(bank.journal) == 1507
+    assert (tmp_path / "bank-amount.bin").stat().st_size >= 1507 * 8
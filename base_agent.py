@@ -4,32 +4,62 @@ Base class for all agents in the SimEcon simulation.
 Provides common functionality like logging that can be shared across different agent types.
 """
 
-import os
 from logging_config import get_logger
-from dataclasses import asdict
-import matplotlib.pyplot as plt
+from dataclasses import fields
+from itertools import count
+import logging
+import sys
 
-logger = get_logger(__name__)
+class AgentIds:
+    """
+    Id sequences of one run, one per agent type, so ids are dense and the
+    same every time a run is repeated, also within one process.
+    """
+
+    def __init__(self) -> None:
+        self.counters: dict[str, count] = {}
+
+    def next(self, name_prefix: str) -> int:
+        return next(self.counters.setdefault(name_prefix, count()))
+
+
+# Ids of agents created outside a simulation
+_default_ids = AgentIds()
 
 
 class BaseAgent:
     """Base class for all simulation agents with common logging functionality."""
 
-    def __init__(self, name_prefix: str = "Agent"):
+    __slots__ = ("tick", "id", "name_prefix", "ids")
+
+    def __init__(self, name_prefix: str = "Agent", ids: AgentIds | None = None):
         self.tick: int = 0
-        self.name = f"{name_prefix}-{id(self)}"
+        self.name_prefix = name_prefix
+        # Agents derived from this one, e.g. split cohorts, draw from here too
+        self.ids = ids if ids is not None else _default_ids
+        self.id: int = self.ids.next(name_prefix)
+
+    @property
+    def name(self) -> str:
+        return f"{self.name_prefix}-{self.id}"
 
     def set_tick(self, tick: int):
         """Set the current tick value from the simulation."""
         self.tick = tick
 
     def _log(self, message: str, *args, level: str = "debug") -> None:
-        """Helper method to log with agent name, tick, and method name."""
-        import inspect
-
-        method_name = inspect.stack()[1].function
+        """
+        Log with agent name, tick, and method name, to the logger of the agent
+        type (agents.Corp, agents.Person, ...) so each can be limited alone.
+        """
+        logger = get_logger(f"agents.{self.name_prefix}")
+        levelno = logging.getLevelName(level.upper())
+        # Skip the frame lookup and formatting when nobody listens
+        if not logger.isEnabledFor(levelno):
+            return
+        method_name = sys._getframe(1).f_code.co_name
         full_message = f"Tick:{self.tick} - {self.name} - {method_name} - {message}"
-        getattr(logger, level)(full_message, *args)
+        logger.log(levelno, full_message, *args)
 
 
 class BaseStats:
@@ -45,38 +75,25 @@ class BaseStats:
 
     def get_latest(self):
         latest_stats = {}
-        for stat_name, stat_dict in asdict(self).items():
+        # Read the columns in place, asdict would copy every past tick
+        for stat_field in fields(self):
+            stat_name = stat_field.name
+            stat_dict = getattr(self, stat_name)
             if not stat_dict:
                 latest_stats[stat_name] = None
                 continue
-            max_tick = max(stat_dict.keys())
-            latest_stats[stat_name] = stat_dict[max_tick]
+            # Columns are filled in tick order, the last key is the latest
+            latest_stats[stat_name] = stat_dict[next(reversed(stat_dict))]
         return latest_stats
 
     def plot(
         self, columns: list[str], folder: str, filename: str, log_scale: bool = False
     ):
-        """Plot one or more stats columns and save to file."""
-
-        os.makedirs(f"charts/{folder}", exist_ok=True)
-        plt.figure(figsize=(10, 5))
-
-        for col in columns:
-            data = getattr(self, col, None)
-            if data is None or not isinstance(data, dict):
-                raise Exception(f"'{col}' not found or not a dict")
-
-            ticks, values = zip(*sorted(data.items()))
-            plt.plot(ticks, values, label=col)
-
-        plt.xlabel("Tick")
-        plt.ylabel("Value")
-        plt.title(", ".join(columns))
-        plt.legend()
-        if log_scale:
-            plt.yscale("log")
-        plt.tight_layout()
-
-        filepath = os.path.join(f"charts/{folder}", f"{filename}.png")
-        plt.savefig(filepath)
-        plt.close()
+        """
+        Plot one or more stats columns and save to file.
+        Use reporting.ReportGenerator to render many charts in the background.
+        """
+        from reporting import ChartSpec, render_chart
+
+        spec = ChartSpec.from_stats(self, columns, folder, filename, log_scale)
+        return render_chart(spec)
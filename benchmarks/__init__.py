@@ -0,0 +1,48 @@
+"""
+Benchmarks of SimEcon, one module each, run as python -m benchmarks.<name>.
+
+make_simulation builds the small seeded economy the benchmarks and tests.py
+share.
+"""
+
+import random
+
+from simulation import Simulation
+
+
+def make_simulation(
+    number_of_people: int = 200,
+    aggregate: bool = False,
+    seed: int | None = None,
+    banks: int = 2,
+    corporations: int = 4,
+    demand: int = 50,
+    initialize: bool = True,
+    **settings,
+) -> Simulation:
+    """
+    A small economy. With a seed random is seeded first, with initialize
+    False the caller can still set hooks before the agents are created.
+    Other keyword arguments are set on sim_settings.
+    """
+    if seed is not None:
+        random.seed(seed)
+    sim = Simulation()
+    sim.sim_settings.aggregate_people = aggregate
+    sim.sim_settings.number_of_banks = banks
+    sim.sim_settings.number_of_people = number_of_people
+    sim.sim_settings.number_of_corporations = corporations
+    sim.sim_settings.benefit = 40
+    for name, value in settings.items():
+        if not hasattr(sim.sim_settings, name):
+            raise ValueError(f"Unknown setting {name}")
+        setattr(sim.sim_settings, name, value)
+    sim.corporation_seed.price = 15
+    sim.corporation_seed.demand = demand
+    sim.corporation_seed.ppe = 8
+    sim.corporation_seed.salary = 100
+    sim.corporation_seed.balance = 50000
+    sim.person_seed.mpc = 0.5
+    if initialize:
+        sim.initialize()
+    return sim
@@ -0,0 +1,70 @@
+"""
+Accuracy and speed of cohort aggregation against the full-agent run.
+
+Runs the same configuration and seed once with one agent per person and once
+with aggregate_people, and reports the wall time of both runs and the relative
+difference of the main SimStats metrics at the last tick.
+
+Usage:
+    python -m benchmarks.aggregation [number_of_people] [number_of_ticks]
+"""
+
+import logging
+import random
+import sys
+import time
+
+from invariants import InvariantChecker
+from simulation import Simulation
+
+METRICS = (
+    "persons_employed",
+    "goods_sold",
+    "goods_avg_price",
+    "person_avg_spending",
+    "person_avg_money_in_banks",
+    "company_money_in_banks",
+)
+
+
+def run(number_of_people: int, number_of_ticks: int, aggregate: bool):
+    random.seed(0)
+    sim = Simulation()
+    sim.sim_settings.number_of_banks = 4
+    sim.sim_settings.number_of_corporations = 10
+    sim.sim_settings.number_of_people = number_of_people
+    sim.sim_settings.aggregate_people = aggregate
+    sim.corporation_seed.price = 15
+    sim.corporation_seed.demand = number_of_people * 5
+    sim.corporation_seed.ppe = 8
+    sim.corporation_seed.salary = 100
+    sim.corporation_seed.balance = number_of_people * 500
+    sim.person_seed.mpc = 0.5
+    # Sampled, so it does not skew the timings
+    sim.observers.append(InvariantChecker(interval=5, sample_size=100, strict=True))
+
+    start = time.perf_counter()
+    sim.initialize()
+    sim.run(number_of_ticks)
+    return sim, time.perf_counter() - start
+
+
+def main(number_of_people: int = 10_000, number_of_ticks: int = 20) -> None:
+    logging.disable(logging.WARNING)
+    full, full_time = run(number_of_people, number_of_ticks, aggregate=False)
+    cohort, cohort_time = run(number_of_people, number_of_ticks, aggregate=True)
+
+    print(f"people:   {number_of_people}, ticks: {number_of_ticks}")
+    print(f"agents:   {len(full.people)} full, {len(cohort.people)} aggregated")
+    print(f"time:     {full_time:.2f}s full, {cohort_time:.2f}s aggregated")
+    print(f"speedup:  {full_time / cohort_time:.0f}x")
+    tick = full.tick
+    for metric in METRICS:
+        expected = getattr(full.stats, metric)[tick]
+        actual = getattr(cohort.stats, metric)[tick]
+        error = abs(actual - expected) / abs(expected) if expected else 0
+        print(f"{metric:27} {expected:>14.2f} {actual:>14.2f} {error:>8.2%}")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
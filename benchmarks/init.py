@@ -0,0 +1,71 @@
+"""
+Initialization time of the economy.
+
+Times init_banks + init_people and init_corporations (which runs the first
+labor market) for each population size, with homogeneous seeds and with
+every seed field drawn from a distribution.
+
+Usage:
+    python -m benchmarks.init [number_of_people ...]
+"""
+
+import logging
+import random
+import sys
+import time
+
+from settings import CorporationSeed, Distribution, PersonSeed
+from simulation import Simulation
+
+
+def init_times(
+    number_of_people: int, heterogeneous: bool = False
+) -> tuple[float, float]:
+    random.seed(0)
+    sim = Simulation()
+    sim.sim_settings.number_of_banks = 4
+    sim.sim_settings.number_of_corporations = 10
+    sim.sim_settings.number_of_people = number_of_people
+    sim.corporation_seed.price = 15
+    sim.corporation_seed.demand = number_of_people * 5
+    sim.corporation_seed.ppe = 8
+    sim.corporation_seed.salary = 100
+    sim.corporation_seed.balance = number_of_people * 500
+    sim.person_seed.mpc = 0.5
+    if heterogeneous:
+        sim.corporation_seed = CorporationSeed(
+            price=Distribution.lognormal(2.7, 0.2),
+            demand=number_of_people * 5,
+            salary=Distribution.normal(100, 10, low=50),
+            ppe=Distribution.empirical([6, 8, 10]),
+            balance=number_of_people * 500,
+        )
+        sim.person_seed = PersonSeed(mpc=Distribution.normal(0.5, 0.1, low=0, high=1))
+
+    start = time.perf_counter()
+    sim.init_banks()
+    sim.init_people()
+    people = time.perf_counter()
+    sim.init_corporations()
+    corporations = time.perf_counter()
+    assert len(sim.people) == number_of_people
+    return people - start, corporations - people
+
+
+def main(sizes: list[int]) -> None:
+    logging.disable(logging.WARNING)
+    header = ("people", "seeds", "people s", "corps s", "total s")
+    print("{:>10} {:>14} {:>10} {:>10} {:>10}".format(*header))
+    for n in sizes:
+        for heterogeneous in (False, True):
+            people, corporations = init_times(n, heterogeneous)
+            seeds = "heterogeneous" if heterogeneous else "homogeneous"
+            total = people + corporations
+            print(
+                f"{n:>10} {seeds:>14} {people:>10.2f} {corporations:>10.2f} "
+                f"{total:>10.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10_000, 100_000, 1_000_000])
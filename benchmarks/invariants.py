@@ -0,0 +1,60 @@
+"""
+Cost of the accounting invariant checks.
+
+Runs the same configuration and seed without checks, with full checks and
+with sampled checks on every tick, and reports the wall time of each run.
+
+Usage:
+    python -m benchmarks.invariants [number_of_people] [number_of_ticks]
+"""
+
+import logging
+import random
+import sys
+import time
+
+from invariants import InvariantChecker
+from simulation import Simulation
+
+
+def run(
+    number_of_people: int, number_of_ticks: int, checker: InvariantChecker | None
+) -> float:
+    random.seed(0)
+    sim = Simulation()
+    sim.sim_settings.number_of_banks = 4
+    sim.sim_settings.number_of_corporations = 10
+    sim.sim_settings.number_of_people = number_of_people
+    sim.corporation_seed.price = 15
+    sim.corporation_seed.demand = number_of_people * 5
+    sim.corporation_seed.ppe = 8
+    sim.corporation_seed.salary = 100
+    sim.corporation_seed.balance = number_of_people * 500
+    sim.person_seed.mpc = 0.5
+    if checker is not None:
+        sim.observers.append(checker)
+
+    sim.initialize()
+    start = time.perf_counter()
+    sim.run(number_of_ticks)
+    elapsed = time.perf_counter() - start
+    if checker is not None:
+        assert not checker.violations, checker.violations[0]
+    return elapsed
+
+
+def main(number_of_people: int = 10_000, number_of_ticks: int = 20) -> None:
+    logging.disable(logging.WARNING)
+    baseline = run(number_of_people, number_of_ticks, None)
+    print(f"people:   {number_of_people}, ticks: {number_of_ticks}")
+    print(f"off:      {baseline:.2f}s")
+    for label, checker in (
+        ("full", InvariantChecker()),
+        ("sampled", InvariantChecker(sample_size=100, seed=0)),
+    ):
+        elapsed = run(number_of_people, number_of_ticks, checker)
+        print(f"{label + ':':9} {elapsed:.2f}s ({elapsed / baseline - 1:+.1%})")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,67 @@
+"""
+Memory benchmark for agents and bank accounting.
+
+Reports bytes per person (agent + bank account) and bytes per transaction
+(ledger entry + transaction object), measured with tracemalloc. The journal
+rows repeat both with the bank's ledger and history in memory-mapped columns,
+which live in the page cache and on disk instead of the heap.
+
+Usage:
+    python -m benchmarks.memory [number_of_people]
+"""
+
+import sys
+import tempfile
+import tracemalloc
+
+from agents.person import Person
+from banking.agents.bank import Bank
+from banking.agents.central_bank import CentralBank
+from storage import ColumnStore
+
+
+def make_bank(path: str | None = None) -> Bank:
+    bank = Bank(CentralBank())
+    if path is not None:
+        bank.use_store(ColumnStore(path), "bank")
+    return bank
+
+
+def bytes_per_person(n: int, path: str | None = None) -> float:
+    bank = make_bank(path)
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    people = [Person(bank=bank) for _ in range(n)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    assert len(people) == n
+    return (after - before) / n
+
+
+def bytes_per_transaction(n: int, path: str | None = None) -> float:
+    bank = make_bank(path)
+    people = [Person(bank=bank) for _ in range(n)]
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for person in people:
+        person.bank_interface.deposit(100)
+    if bank.journal is not None:
+        # Buffered appends count once written out
+        bank.journal.flush()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before) / n
+
+
+def main(n: int = 100_000) -> None:
+    print(f"people:       {n}")
+    print(f"person:       {bytes_per_person(n):.0f} bytes")
+    print(f"transaction:  {bytes_per_transaction(n):.0f} bytes")
+    with tempfile.TemporaryDirectory() as path:
+        print(f"person, journal:      {bytes_per_person(n, path):.0f} bytes")
+    with tempfile.TemporaryDirectory() as path:
+        print(f"transaction, journal: {bytes_per_transaction(n, path):.0f} bytes")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
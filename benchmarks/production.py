@@ -0,0 +1,72 @@
+"""
+Cost of settling inter-firm input purchases against the number of corporations.
+
+Builds corporations spread over the sectors of a random sparse input-output
+matrix, each with inventory, workers and a balance, and times
+InputOutput.settle. The time per corporation should stay flat as the number
+of corporations grows.
+
+Usage:
+    python -m benchmarks.production [number_of_sectors] [number_of_corporations ...]
+"""
+
+import logging
+import random
+import sys
+import time
+
+import numpy as np
+from scipy import sparse
+
+from agents.corporation import Corporation, Good
+from agents.production import InputOutput
+from banking.agents.bank import Bank
+from banking.agents.central_bank import CentralBank
+
+
+def build(number_of_corporations: int, number_of_sectors: int):
+    random.seed(0)
+    rng = np.random.default_rng(0)
+    central_bank = CentralBank()
+    banks = [Bank(central_bank) for _ in range(4)]
+    corps = []
+    for i in range(number_of_corporations):
+        corp = Corporation(random.choice(banks))
+        corp.sector = i % number_of_sectors
+        corp.ppe = 8
+        corp.salary = 100
+        corp.headcount = 10
+        corp.latest_demand = 100
+        corp.current_price = float(rng.uniform(10, 20))
+        corp.goods = [Good(price=corp.current_price)] * int(rng.integers(0, 100))
+        corp.bank_interface.deposit(10_000)
+        corps.append(corp)
+
+    # About 4 inputs per sector, as in aggregated input-output tables
+    matrix = sparse.random_array(
+        (number_of_sectors, number_of_sectors),
+        density=min(1, 4 / number_of_sectors),
+        rng=rng,
+    ) * 0.25
+    return InputOutput(matrix), corps
+
+
+def settle_time(number_of_corporations: int, number_of_sectors: int) -> float:
+    input_output, corps = build(number_of_corporations, number_of_sectors)
+    start = time.perf_counter()
+    input_output.settle(corps)
+    return time.perf_counter() - start
+
+
+def main(number_of_sectors: int, sizes: list[int]) -> None:
+    logging.disable(logging.WARNING)
+    print(f"sectors: {number_of_sectors}")
+    print(f"{'corporations':>12} {'settle s':>9} {'us/corp':>8}")
+    for n in sizes:
+        elapsed = settle_time(n, number_of_sectors)
+        print(f"{n:>12} {elapsed:>9.3f} {elapsed / n * 1e6:>8.1f}")
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    main(args[0] if args else 40, args[1:] or [1_000, 5_000, 20_000, 80_000])
@@ -0,0 +1,64 @@
+"""
+Wall time of a regional economy in one process against one process per region.
+
+Usage:
+    python -m benchmarks.regions [number_of_regions] [people_per_region] [ticks]
+"""
+
+import logging
+import sys
+import time
+
+from regions import InProcessBackend, LocalBackend, RegionConfig, RegionalSimulation
+from settings import CorporationSeed, PersonSeed, SimulationSettings
+
+
+def region_config(number_of_people: int) -> RegionConfig:
+    return RegionConfig(
+        SimulationSettings(
+            number_of_banks=4,
+            number_of_corporations=10,
+            number_of_people=number_of_people,
+        ),
+        CorporationSeed(
+            price=15,
+            demand=number_of_people * 5,
+            ppe=8,
+            salary=100,
+            balance=number_of_people * 500,
+        ),
+        PersonSeed(mpc=0.5),
+    )
+
+
+def run_time(backend, number_of_regions: int, number_of_people: int, ticks: int):
+    economy = RegionalSimulation(
+        [region_config(number_of_people) for _ in range(number_of_regions)],
+        export_share=0.2,
+        seed=0,
+        backend=backend,
+    )
+    start = time.perf_counter()
+    results = economy.run(ticks)
+    return time.perf_counter() - start, results, economy.trade
+
+
+def main(
+    number_of_regions: int = 4, number_of_people: int = 20_000, ticks: int = 10
+) -> None:
+    logging.disable(logging.WARNING)
+    serial, serial_results, _ = run_time(
+        InProcessBackend(), number_of_regions, number_of_people, ticks
+    )
+    parallel, parallel_results, trade = run_time(
+        LocalBackend(), number_of_regions, number_of_people, ticks
+    )
+    same = [r.stats for r in serial_results] == [r.stats for r in parallel_results]
+    print(f"regions: {number_of_regions} x {number_of_people} people, ticks: {ticks}")
+    print(f"time:    {serial:.2f}s one process, {parallel:.2f}s one per region")
+    print(f"speedup: {serial / parallel:.1f}x, identical results: {same}")
+    print(f"traded:  {trade.sum():.0f}")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:4]))
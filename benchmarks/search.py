@@ -0,0 +1,46 @@
+"""
+Cost of the consumer search in people_tick against the number of corporations.
+
+Times people_tick for every person comparing all corporations and for a
+bounded consideration set of search_breadth corporations.
+
+Usage:
+    python -m benchmarks.search [number_of_corporations ...]
+"""
+
+import logging
+import random
+import sys
+
+from simulation import Simulation
+
+
+def people_tick_time(number_of_corporations: int, breadth: int) -> float:
+    random.seed(0)
+    sim = Simulation()
+    sim.sim_settings.number_of_banks = 4
+    sim.sim_settings.number_of_corporations = number_of_corporations
+    sim.sim_settings.number_of_people = 10_000
+    sim.sim_settings.search_breadth = breadth
+    sim.corporation_seed.price = 15
+    sim.corporation_seed.demand = 50
+    sim.corporation_seed.ppe = 8
+    sim.corporation_seed.salary = 100
+    sim.corporation_seed.balance = 50_000
+    sim.person_seed.mpc = 0.5
+    sim.initialize()
+    sim.run(3)
+    return sim.phase_timings["people"]
+
+
+def main(sizes: list[int]) -> None:
+    logging.disable(logging.WARNING)
+    print(f"{'corporations':>12} {'all s':>8} {'k=5 s':>8}")
+    for n in sizes:
+        full = people_tick_time(n, 0)
+        bounded = people_tick_time(n, 5)
+        print(f"{n:>12} {full:>8.2f} {bounded:>8.2f}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10, 100, 1_000, 10_000])
@@ -0,0 +1,64 @@
+"""
+Overhead of tracing a run, against the bank operation sampling period.
+
+Runs the same seeded simulation untraced and then traced with each period,
+and reports the best run time of REPEATS, the slowdown and the number of
+events written.
+
+Usage:
+    python -m benchmarks.tracing [number_of_people] [transfer_every ...]
+"""
+
+import logging
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks import make_simulation
+from tracing import Tracer
+
+TICKS = 20
+REPEATS = 3
+
+
+def run(number_of_people: int, transfer_every: int | None, path: str):
+    sim = make_simulation(
+        number_of_people,
+        seed=0,
+        corporations=max(number_of_people // 100, 1),
+        demand=500,
+    )
+    tracer = None
+    if transfer_every is not None:
+        tracer = Tracer(path, transfer_every=transfer_every)
+        sim.attach_tracer(tracer)
+    start = time.perf_counter()
+    sim.run(TICKS)
+    if tracer is None:
+        return time.perf_counter() - start, 0
+    tracer.close()
+    return time.perf_counter() - start, tracer.written
+
+
+def best(number_of_people: int, transfer_every: int | None, path: str):
+    runs = [run(number_of_people, transfer_every, path) for _ in range(REPEATS)]
+    return min(runs)
+
+
+def main(number_of_people: int, periods: list[int]) -> None:
+    logging.disable(logging.WARNING)
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "trace.json")
+        baseline, _ = best(number_of_people, None, path)
+        print(f"people: {number_of_people}, ticks: {TICKS}")
+        print(f"{'every':>8} {'run s':>8} {'slowdown':>9} {'events':>8}")
+        print(f"{'-':>8} {baseline:>8.3f} {1:>9.3f} {0:>8}")
+        for every in periods:
+            elapsed, events = best(number_of_people, every, path)
+            print(f"{every:>8} {elapsed:>8.3f} {elapsed / baseline:>9.3f} {events:>8}")
+
+
+if __name__ == "__main__":
+    people = int(sys.argv[1]) if len(sys.argv) > 1 else 4000
+    main(people, [int(arg) for arg in sys.argv[2:]] or [1, 10, 100, 1000])
@@ -0,0 +1,70 @@
+"""
+Early termination of simulation runs.
+
+The monitor is checked at the end of every Simulation.one_tick and returns a
+reason code once the economy has collapsed or reached a steady state.
+"""
+
+from collections import deque
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from simulation import Simulation
+
+COMPLETED = "completed"
+PRICE_CONVERGED = "price_converged"
+NO_EMPLOYMENT = "no_employment"
+CORPORATIONS_DEAD = "corporations_dead"
+
+
+@dataclass
+class ConvergenceCriteria:
+    # Never stop before this tick
+    min_ticks: int = 10
+    # Ticks in the rolling window for goods_avg_price
+    window: int = 20
+    # Stop once the rolling variance of goods_avg_price falls below this, 0 disables
+    price_variance: float = 0
+    stop_on_zero_employment: bool = True
+    stop_on_dead_corporations: bool = True
+
+
+class ConvergenceMonitor:
+
+    def __init__(self, criteria: ConvergenceCriteria | None = None) -> None:
+        self.criteria = criteria or ConvergenceCriteria()
+        self.prices: deque[float] = deque(maxlen=self.criteria.window)
+
+    def check(self, sim: "Simulation") -> str | None:
+        """Return a stop reason, or None to keep running."""
+        criteria = self.criteria
+
+        if criteria.stop_on_dead_corporations and not any(
+            corp.alive for corp in sim.corporations
+        ):
+            return CORPORATIONS_DEAD
+
+        price = sim.stats.goods_avg_price.get(sim.tick)
+        if price is not None:
+            self.prices.append(price)
+
+        if sim.tick < criteria.min_ticks:
+            return None
+
+        if (
+            criteria.stop_on_zero_employment
+            and sim.stats.persons_employed.get(sim.tick) == 0
+        ):
+            return NO_EMPLOYMENT
+
+        if (
+            criteria.price_variance > 0
+            and len(self.prices) == criteria.window
+            and np.var(self.prices) < criteria.price_variance
+        ):
+            return PRICE_CONVERGED
+
+        return None
@@ -0,0 +1,217 @@
+"""
+Live dashboard for a running simulation.
+
+Every tick, the dashboard observer puts a frame with SimStats.get_latest()
+and Simulation.phase_timings on a bounded queue and returns. A small asyncio
+HTTP server in a background thread drains the queue and streams the frames
+to clients as server-sent events. When the queue or a slow client's buffer
+is full the oldest frame is dropped, so the simulation loop never waits on
+the dashboard.
+
+Usage:
+    with Dashboard(port=8050) as dashboard:
+        sim.observers.append(dashboard)
+        sim.run()
+
+    http://127.0.0.1:8050/         live table of metrics and timings
+    http://127.0.0.1:8050/events   server-sent events, one JSON frame per tick
+    http://127.0.0.1:8050/latest   latest frame as JSON
+"""
+
+from typing import TYPE_CHECKING, Any
+import asyncio
+import json
+import queue
+import threading
+
+from logging_config import get_logger
+
+if TYPE_CHECKING:
+    from simulation import Simulation
+
+logger = get_logger(__name__)
+
+PAGE = """<!doctype html>
+<html>
+<head><title>SimEcon</title>
+<style>body{font-family:monospace} td{padding:0 1em} .n{text-align:right}</style>
+</head>
+<body>
+<h3>Tick <span id="tick">-</span> <small id="dropped"></small></h3>
+<table><tbody id="stats"></tbody></table>
+<h3>Phase timings (ms)</h3>
+<table><tbody id="timings"></tbody></table>
+<script>
+function rows(id, values, scale) {
+  document.getElementById(id).innerHTML = Object.entries(values)
+    .map(([k, v]) => `<tr><td>${k}</td><td class="n">${
+      v === null ? "-" : (v * scale).toFixed(2)}</td></tr>`)
+    .join("");
+}
+new EventSource("/events").onmessage = (event) => {
+  const frame = JSON.parse(event.data);
+  document.getElementById("tick").textContent = frame.tick;
+  document.getElementById("dropped").textContent =
+    frame.dropped ? `(${frame.dropped} frames dropped)` : "";
+  rows("stats", frame.stats, 1);
+  rows("timings", frame.timings, 1000);
+};
+</script>
+</body>
+</html>
+"""
+
+
+class Dashboard:
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 8050,
+        maxsize: int = 256,
+        poll_interval: float = 0.05,
+    ) -> None:
+        self.host = host
+        # 0 picks a free port, read it back after start()
+        self.port = port
+        self.maxsize = maxsize
+        self.poll_interval = poll_interval
+        self.frames: queue.Queue[dict[str, Any]] = queue.Queue(maxsize)
+        self.dropped: int = 0
+        self.latest: dict[str, Any] | None = None
+        self._clients: set[asyncio.Queue[str]] = set()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._stopping: asyncio.Event | None = None
+        self._thread: threading.Thread | None = None
+
+    def on_tick(self, sim: "Simulation") -> None:
+        self.publish(
+            {
+                "tick": sim.tick,
+                "stats": sim.stats.get_latest(),
+                "timings": dict(sim.phase_timings),
+            }
+        )
+
+    def publish(self, frame: dict[str, Any]) -> None:
+        """Queue a frame without blocking, dropping the oldest if full."""
+        while True:
+            try:
+                self.frames.put_nowait(frame)
+                return
+            except queue.Full:
+                try:
+                    self.frames.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    def start(self) -> "Dashboard":
+        ready = threading.Event()
+        self._thread = threading.Thread(
+            target=asyncio.run, args=(self._serve(ready),), daemon=True
+        )
+        self._thread.start()
+        ready.wait()
+        logger.info("Dashboard on http://%s:%d", self.host, self.port)
+        return self
+
+    def stop(self) -> None:
+        if self._loop is None:
+            return
+        self._loop.call_soon_threadsafe(self._stopping.set)
+        self._thread.join()
+        self._loop = None
+
+    def __enter__(self) -> "Dashboard":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    async def _serve(self, ready: threading.Event) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._stopping = asyncio.Event()
+        server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = server.sockets[0].getsockname()[1]
+        ready.set()
+
+        async with server:
+            broadcaster = asyncio.create_task(self._broadcast())
+            await self._stopping.wait()
+            broadcaster.cancel()
+            for client in self._clients:
+                # Ends the client's stream
+                client.put_nowait("")
+
+    async def _broadcast(self) -> None:
+        while True:
+            try:
+                frame = self.frames.get_nowait()
+            except queue.Empty:
+                await asyncio.sleep(self.poll_interval)
+                continue
+
+            frame["dropped"] = self.dropped
+            self.latest = frame
+            data = json.dumps(frame)
+            for client in self._clients:
+                if client.full():
+                    client.get_nowait()
+                client.put_nowait(data)
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            request = (await reader.readline()).split()
+            # Headers are not needed, read past them
+            while (await reader.readline()).strip():
+                pass
+            path = request[1].decode() if len(request) > 1 else "/"
+
+            if path == "/events":
+                await self._stream(writer)
+            elif path == "/latest":
+                self._respond(writer, "application/json", json.dumps(self.latest))
+            elif path == "/":
+                self._respond(writer, "text/html", PAGE)
+            else:
+                self._respond(writer, "text/plain", "not found", "404 Not Found")
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    def _respond(
+        writer: asyncio.StreamWriter,
+        content_type: str,
+        body: str,
+        status: str = "200 OK",
+    ) -> None:
+        data = body.encode()
+        writer.write(
+            f"HTTP/1.1 {status}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(data)}\r\n"
+            "Connection: close\r\n\r\n".encode() + data
+        )
+
+    async def _stream(self, writer: asyncio.StreamWriter) -> None:
+        client: asyncio.Queue[str] = asyncio.Queue(self.maxsize)
+        self._clients.add(client)
+        try:
+            writer.write(
+                b"HTTP/1.1 200 OK\r\n"
+                b"Content-Type: text/event-stream\r\n"
+                b"Cache-Control: no-cache\r\n\r\n"
+            )
+            if self.latest is not None:
+                client.put_nowait(json.dumps(self.latest))
+            while data := await client.get():
+                writer.write(f"data: {data}\n\n".encode())
+                await writer.drain()
+        finally:
+            self._clients.discard(client)
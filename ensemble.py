@@ -0,0 +1,213 @@
+"""
+Streaming statistics over many runs of the same Simulation configuration.
+
+SimStats rows are consumed as runs finish; per tick and metric only a running
+mean/variance (Welford) and P² quantile markers are kept, so memory does not
+grow with the number of replications.
+
+Usage:
+    ensemble = EnsembleStats(quantiles=(0.05, 0.5, 0.95))
+    for seed in range(50):
+        ensemble.add_run(run_simulation(seed).stats)
+    ensemble.plot_bands("goods_avg_price", folder="ensemble", filename="price")
+"""
+
+from dataclasses import asdict
+from typing import TYPE_CHECKING
+import math
+import os
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from simulation import SimStats
+
+
+class Welford:
+    """Running mean and variance."""
+
+    __slots__ = ("n", "mean", "m2")
+
+    def __init__(self) -> None:
+        self.n: int = 0
+        self.mean: float = 0.0
+        self.m2: float = 0.0
+
+    def add(self, x: float) -> None:
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (x - self.mean)
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / (self.n - 1) if self.n > 1 else 0.0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+
+class P2Quantile:
+    """
+    P² estimate of a single quantile (Jain & Chlamtac, 1985), five markers
+    regardless of the number of observations.
+    """
+
+    __slots__ = ("p", "heights", "positions", "desired", "increments")
+
+    def __init__(self, p: float) -> None:
+        self.p = p
+        self.heights: list[float] = []
+        self.positions = [1, 2, 3, 4, 5]
+        self.desired = [1, 1 + 2 * p, 1 + 4 * p, 3 + 2 * p, 5]
+        self.increments = [0, p / 2, p, (1 + p) / 2, 1]
+
+    def add(self, x: float) -> None:
+        h = self.heights
+        if len(h) < 5:
+            h.append(x)
+            h.sort()
+            return
+
+        n = self.positions
+        if x < h[0]:
+            h[0] = x
+            k = 0
+        elif x >= h[4]:
+            h[4] = x
+            k = 3
+        else:
+            k = next(i for i in range(1, 5) if x < h[i]) - 1
+
+        for i in range(k + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            self.desired[i] += self.increments[i]
+
+        for i in range(1, 4):
+            d = self.desired[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                d = 1 if d > 0 else -1
+                height = self._parabolic(i, d)
+                if not h[i - 1] < height < h[i + 1]:
+                    height = h[i] + d * (h[i + d] - h[i]) / (n[i + d] - n[i])
+                h[i] = height
+                n[i] += d
+
+    def _parabolic(self, i: int, d: int) -> float:
+        h, n = self.heights, self.positions
+        return h[i] + d / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + d) * (h[i + 1] - h[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - d) * (h[i] - h[i - 1]) / (n[i] - n[i - 1])
+        )
+
+    @property
+    def value(self) -> float:
+        if not self.heights:
+            return math.nan
+        if len(self.heights) < 5 or self.positions[4] == 5:
+            # Too few observations for the markers, use the exact quantile
+            return float(np.quantile(self.heights, self.p))
+        return self.heights[2]
+
+
+class EnsembleStats:
+    """Per tick mean, variance and quantiles of every SimStats metric."""
+
+    def __init__(
+        self,
+        quantiles: tuple[float, ...] = (0.05, 0.5, 0.95),
+        metrics: list[str] | None = None,
+    ) -> None:
+        self.quantile_levels = quantiles
+        self.metrics = metrics
+        self.runs: int = 0
+        self.moments: dict[str, dict[int, Welford]] = {}
+        self.quantiles: dict[str, dict[int, list[P2Quantile]]] = {}
+
+    def add_row(self, tick: int, row: dict[str, float | None]) -> None:
+        for metric, value in row.items():
+            if value is None or (self.metrics and metric not in self.metrics):
+                continue
+            moments = self.moments.setdefault(metric, {})
+            if tick not in moments:
+                moments[tick] = Welford()
+                self.quantiles.setdefault(metric, {})[tick] = [
+                    P2Quantile(q) for q in self.quantile_levels
+                ]
+            moments[tick].add(value)
+            for estimator in self.quantiles[metric][tick]:
+                estimator.add(value)
+
+    def add_run(self, stats: "SimStats") -> None:
+        """Consume every tick of a finished run; the SimStats can then be dropped."""
+        columns = asdict(stats)
+        ticks = sorted({tick for column in columns.values() for tick in column})
+        for tick in ticks:
+            self.add_row(
+                tick, {metric: column.get(tick) for metric, column in columns.items()}
+            )
+        self.runs += 1
+
+    def ticks(self, metric: str) -> np.ndarray:
+        return np.array(sorted(self.moments[metric]))
+
+    def mean(self, metric: str) -> np.ndarray:
+        moments = self.moments[metric]
+        return np.array([moments[tick].mean for tick in sorted(moments)])
+
+    def std(self, metric: str) -> np.ndarray:
+        moments = self.moments[metric]
+        return np.array([moments[tick].std for tick in sorted(moments)])
+
+    def confidence_band(
+        self, metric: str, z: float = 1.96
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Normal confidence interval of the mean per tick."""
+        moments = self.moments[metric]
+        mean = self.mean(metric)
+        counts = np.array([moments[tick].n for tick in sorted(moments)])
+        half_width = z * self.std(metric) / np.sqrt(counts)
+        return mean - half_width, mean + half_width
+
+    def quantile(self, metric: str, q: float) -> np.ndarray:
+        index = self.quantile_levels.index(q)
+        estimators = self.quantiles[metric]
+        return np.array([estimators[tick][index].value for tick in sorted(estimators)])
+
+    def plot_bands(
+        self, metric: str, folder: str, filename: str, charts_dir: str = "charts"
+    ) -> str:
+        """Plot mean, confidence band and outer quantile band of a metric."""
+        import matplotlib
+
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+
+        os.makedirs(os.path.join(charts_dir, folder), exist_ok=True)
+        ticks = self.ticks(metric)
+        fig, ax = plt.subplots(figsize=(10, 5))
+
+        low_q, high_q = min(self.quantile_levels), max(self.quantile_levels)
+        ax.fill_between(
+            ticks,
+            self.quantile(metric, low_q),
+            self.quantile(metric, high_q),
+            alpha=0.2,
+            label=f"q{low_q:g}-q{high_q:g}",
+        )
+        low, high = self.confidence_band(metric)
+        ax.fill_between(ticks, low, high, alpha=0.4, label="95% CI")
+        ax.plot(ticks, self.mean(metric), label="mean")
+
+        ax.set_xlabel("Tick")
+        ax.set_ylabel("Value")
+        ax.set_title(f"{metric} ({self.runs} runs)")
+        ax.legend()
+        fig.tight_layout()
+
+        filepath = os.path.join(charts_dir, folder, f"{filename}.png")
+        fig.savefig(filepath)
+        plt.close(fig)
+        return filepath
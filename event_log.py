@@ -0,0 +1,217 @@
+"""
+Append-only binary event log for SimEcon runs.
+
+Every event is a fixed size record (tick, kind, agent, other, amount) so the
+log can be seeked by offset. Agent names are interned to integer ids and
+written to a ``.names`` sidecar, checkpoint offsets to an ``.idx`` sidecar.
+
+Usage:
+    log = EventLog("runs/run.log")
+    sim.attach_event_log(log, checkpoint_interval=100)
+    ...
+    log.close()
+
+    reader = EventLogReader("runs/run.log")
+    reader.agent_state("Corp-3", tick=4200)
+"""
+
+from enum import IntEnum
+from typing import TYPE_CHECKING, Iterator
+import struct
+
+if TYPE_CHECKING:
+    from simulation import Simulation
+
+RECORD = struct.Struct("<IBIId")
+INDEX = struct.Struct("<IQ")
+NO_AGENT = 0xFFFFFFFF
+
+
+class EventKind(IntEnum):
+    TICK = 0
+    DEPOSIT = 1
+    WITHDRAW = 2
+    TRANSFER = 3
+    LOAN = 4
+    HIRE = 5
+    FIRE = 6
+    PRICE = 7
+    SALARY = 8
+    CHECKPOINT = 9
+    CK_BALANCE = 10
+    CK_EMPLOYER = 11
+    CK_PRICE = 12
+    CK_SALARY = 13
+    CK_LOANS = 14
+    BANKRUPTCY = 15
+
+
+class EventLog:
+    """Buffered writer, shared by Bank, Corporation and Simulation."""
+
+    def __init__(self, path: str, buffer_size: int = 1 << 20) -> None:
+        self.path = path
+        self.buffer_size = buffer_size
+        self.buffer = bytearray()
+        self.tick: int = 0
+        # One run per log, an existing log at path is replaced, since the
+        # names and checkpoint offsets only describe the run that wrote them
+        self._file = open(path, "wb")
+        self._names = open(f"{path}.names", "w", encoding="utf-8")
+        self._index = open(f"{path}.idx", "wb")
+        self._ids: dict[object, int] = {}
+        self._offset = 0
+
+    def agent_id(self, agent: object) -> int:
+        if agent is None:
+            return NO_AGENT
+        aid = self._ids.get(agent)
+        if aid is None:
+            aid = len(self._ids)
+            self._ids[agent] = aid
+            name = getattr(agent, "name", None) or f"Agent-{id(agent)}"
+            self._names.write(f"{aid}\t{name}\n")
+        return aid
+
+    def release(self, agent: object) -> None:
+        """Forget an agent that left the run, its name stays in .names."""
+        self._ids.pop(agent, None)
+
+    def write(
+        self, kind: EventKind, agent: object, other: object = None, amount: float = 0
+    ) -> None:
+        self.buffer += RECORD.pack(
+            self.tick, kind, self.agent_id(agent), self.agent_id(other), amount
+        )
+        if len(self.buffer) >= self.buffer_size:
+            self.flush()
+
+    def set_tick(self, tick: int) -> None:
+        self.tick = tick
+        self.write(EventKind.TICK, None)
+
+    def checkpoint(self, sim: "Simulation") -> None:
+        """Write the state of every agent at the end of the current tick."""
+        self._index.write(INDEX.pack(self.tick, self._offset + len(self.buffer)))
+        self.write(EventKind.CHECKPOINT, None)
+
+        for person in sim.people:
+            balance = person.bank_interface.check_balance()
+            self.write(EventKind.CK_BALANCE, person, amount=balance)
+            if not person.employed:
+                self.write(EventKind.CK_EMPLOYER, person)
+
+        for corp in sim.corporations:
+            balance = corp.bank_interface.check_balance()
+            loans = sum(loan.amount for loan in corp.loans)
+            self.write(EventKind.CK_BALANCE, corp, amount=balance)
+            self.write(EventKind.CK_PRICE, corp, amount=corp.current_price)
+            self.write(EventKind.CK_SALARY, corp, amount=corp.salary)
+            self.write(EventKind.CK_LOANS, corp, amount=loans)
+            for employee in corp.employees:
+                self.write(EventKind.CK_EMPLOYER, employee, corp)
+
+    def flush(self) -> None:
+        self._file.write(self.buffer)
+        self._offset += len(self.buffer)
+        self.buffer.clear()
+        self._file.flush()
+        self._names.flush()
+        self._index.flush()
+
+    def close(self) -> None:
+        self.flush()
+        self._file.close()
+        self._names.close()
+        self._index.close()
+
+    def __enter__(self) -> "EventLog":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class EventLogReader:
+    """Rebuild agent state from the nearest checkpoint plus the log."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.names: dict[int, str] = {}
+        self.ids: dict[str, int] = {}
+        with open(f"{path}.names", encoding="utf-8") as f:
+            for line in f:
+                aid, name = line.rstrip("\n").split("\t", 1)
+                self.names[int(aid)] = name
+                self.ids[name] = int(aid)
+
+        self.checkpoints: list[tuple[int, int]] = []
+        with open(f"{path}.idx", "rb") as f:
+            data = f.read()
+        for tick, offset in INDEX.iter_unpack(data):
+            self.checkpoints.append((tick, offset))
+
+    def events(self, offset: int = 0) -> Iterator[tuple[int, EventKind, int, int, float]]:
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            while chunk := f.read(RECORD.size * 4096):
+                for tick, kind, agent, other, amount in RECORD.iter_unpack(chunk):
+                    yield tick, EventKind(kind), agent, other, amount
+
+    def nearest_checkpoint(self, tick: int) -> tuple[int, int] | None:
+        best = None
+        for checkpoint in self.checkpoints:
+            if checkpoint[0] <= tick:
+                best = checkpoint
+        return best
+
+    def agent_state(self, name: str, tick: int) -> dict:
+        """State of the agent at the end of the given tick."""
+        aid = self.ids[name]
+        state = {
+            "balance": 0.0,
+            "employer": None,
+            "price": None,
+            "salary": None,
+            "loans": 0.0,
+            "bankrupt": False,
+        }
+
+        checkpoint = self.nearest_checkpoint(tick)
+        offset = checkpoint[1] if checkpoint else 0
+
+        for event_tick, kind, agent, other, amount in self.events(offset):
+            if event_tick > tick:
+                break
+
+            if kind == EventKind.TRANSFER:
+                if agent == aid:
+                    state["balance"] -= amount
+                if other == aid:
+                    state["balance"] += amount
+                continue
+            if agent != aid:
+                continue
+
+            if kind in (EventKind.DEPOSIT, EventKind.LOAN):
+                state["balance"] += amount
+                if kind == EventKind.LOAN:
+                    state["loans"] += amount
+            elif kind == EventKind.WITHDRAW:
+                state["balance"] -= amount
+            elif kind == EventKind.HIRE or kind == EventKind.CK_EMPLOYER:
+                state["employer"] = self.names.get(other)
+            elif kind == EventKind.FIRE:
+                state["employer"] = None
+            elif kind in (EventKind.PRICE, EventKind.CK_PRICE):
+                state["price"] = amount
+            elif kind in (EventKind.SALARY, EventKind.CK_SALARY):
+                state["salary"] = amount
+            elif kind == EventKind.CK_BALANCE:
+                state["balance"] = amount
+            elif kind == EventKind.CK_LOANS:
+                state["loans"] = amount
+            elif kind == EventKind.BANKRUPTCY:
+                state["bankrupt"] = True
+
+        return state
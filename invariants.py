@@ -0,0 +1,188 @@
+"""
+Accounting invariants, checked while a simulation runs.
+
+Money is only created by deposits from outside the banking system and by
+loans, so at every tick boundary:
+
+- per account, the ledger equals deposits - withdraws + loans issued to it
+  (written off loans stay in the ledger, the bank absorbs the loss)
+- per bank, the sum of its ledger equals its central bank reserve plus all
+  loans it issued
+- the recorded SimStats match the agents they were computed from
+
+The per bank checks are vectorized over the ledger and always run. The per
+account and per agent checks cost O(transactions of the checked accounts), so
+with sample_size set the cost of a check is bounded regardless of population.
+
+Usage:
+    sim.observers.append(InvariantChecker(interval=10, sample_size=100))
+"""
+
+from collections import deque
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+import math
+import random
+
+from logging_config import get_logger
+
+if TYPE_CHECKING:
+    from banking.agents.bank import Bank
+    from banking.bank_interface import BankInterface
+    from simulation import Simulation
+
+logger = get_logger(__name__)
+
+
+@dataclass(slots=True)
+class Violation:
+    tick: int
+    check: str
+    # Agent or account the violation was found on
+    subject: str
+    expected: float
+    actual: float
+
+    def __str__(self) -> str:
+        return (
+            f"Tick {self.tick}: {self.check} violated for {self.subject}, "
+            f"expected {self.expected}, got {self.actual}"
+        )
+
+
+class InvariantError(Exception):
+    pass
+
+
+class InvariantChecker:
+
+    def __init__(
+        self,
+        interval: int = 1,
+        sample_size: int | None = None,
+        tolerance: float = 1e-6,
+        strict: bool = False,
+        seed: int | None = None,
+        max_violations: int = 1000,
+    ) -> None:
+        self.interval = interval
+        # Accounts and agents checked per bank and group, None checks all
+        self.sample_size = sample_size
+        self.tolerance = tolerance
+        # Raise on the first violation instead of recording it
+        self.strict = strict
+        # Own generator, so sampling never changes the simulation's draws
+        self.rng = random.Random(seed)
+        self.violations: deque[Violation] = deque(maxlen=max_violations)
+        self.checks: int = 0
+
+    def on_tick(self, sim: "Simulation") -> None:
+        if self.interval and sim.tick % self.interval == 0:
+            self.check(sim)
+
+    def _sample(self, items: list[Any]) -> list[Any]:
+        if self.sample_size is None or len(items) <= self.sample_size:
+            return items
+        return self.rng.sample(items, self.sample_size)
+
+    def _compare(
+        self, tick: int, check: str, subject: str, expected: float, actual: float
+    ) -> list[Violation]:
+        # Relative tolerance too, balances grow far beyond float precision of 1
+        if math.isclose(expected, actual, rel_tol=1e-9, abs_tol=self.tolerance):
+            return []
+        violation = Violation(tick, check, subject, expected, actual)
+        if self.strict:
+            raise InvariantError(str(violation))
+        logger.warning("%s", violation)
+        self.violations.append(violation)
+        return [violation]
+
+    @staticmethod
+    def _account_name(bank_interface: "BankInterface") -> str:
+        entity = bank_interface.entity
+        if entity is not None:
+            return entity.name
+        return f"Bank-{bank_interface.bank.bank_id}/{bank_interface.account_id}"
+
+    def check_bank(self, tick: int, bank: "Bank") -> list[Violation]:
+        loans = float(bank.loans[: len(bank.accounts)].sum())
+        return self._compare(
+            tick,
+            "reserve",
+            f"Bank-{bank.bank_id}",
+            bank.central_bank.get_reserve(bank) + loans,
+            float(bank.balances().sum()),
+        )
+
+    def check_account(
+        self, tick: int, bank_interface: "BankInterface", balance: float | None = None
+    ) -> list[Violation]:
+        bank = bank_interface.bank
+        if balance is None:
+            balance = bank.check_balance(bank_interface)
+        loans = float(bank.loans[bank_interface.account_id])
+        name = self._account_name(bank_interface)
+        violations = self._compare(
+            tick,
+            "ledger",
+            name,
+            balance + loans,
+            bank.get_ledger(bank_interface),
+        )
+        if bank.get_ledger(bank_interface) < -self.tolerance:
+            violations += self._compare(
+                tick, "balance", name, 0, bank.get_ledger(bank_interface)
+            )
+        return violations
+
+    def check_stats(self, sim: "Simulation") -> list[Violation]:
+        tick = sim.stats.tick
+        violations = self._compare(
+            tick,
+            "stats",
+            "persons_employed",
+            sum(corp.headcount for corp in sim.corporations),
+            sim.stats.persons_employed.get(tick, 0),
+        )
+        violations += self._compare(
+            tick,
+            "stats",
+            "corporations_alive",
+            len(sim.corporations),
+            sim.stats.corporations_alive.get(tick, 0),
+        )
+        for corp in self._sample(sim.corporations):
+            violations += self._compare(
+                tick,
+                "headcount",
+                corp.name,
+                sum(employee.weight for employee in corp.employees),
+                corp.headcount,
+            )
+            violations += self._compare(
+                tick,
+                "employer",
+                corp.name,
+                len(corp.employees),
+                sum(employee.employer is corp for employee in corp.employees),
+            )
+        return violations
+
+    def check(self, sim: "Simulation") -> list[Violation]:
+        """Run every check once, return the violations found."""
+        self.checks += 1
+        violations = []
+        for bank in sim.banks:
+            violations += self.check_bank(sim.tick, bank)
+            # Closed accounts have no holder and no history left to check
+            accounts = self._sample(
+                [account for account in bank.accounts if account is not None]
+            )
+            # One pass over a journal for all sampled accounts
+            balances = bank.check_balances(accounts).tolist()
+            for bank_interface, balance in zip(accounts, balances):
+                violations += self.check_account(sim.tick, bank_interface, balance)
+        if sim.stats.tick == sim.tick:
+            violations += self.check_stats(sim)
+        return violations
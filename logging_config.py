@@ -1,17 +1,41 @@
 """
 Simple logging configuration for SimEcon project.
 
+By default records are formatted and written to stdout by the thread that
+logs them. With queued=True (or LOG_FILE set) the simulation thread only puts
+records on a queue, and a QueueListener thread formats and writes them to a
+rotating file or any other handler. Agents log to one logger per agent type
+(agents.Corp, agents.Person, ...), and RateLimitFilter caps how many records
+per second each of them passes, counting what it drops.
+
 Usage:
     from logging_config import get_logger
 
     logger = get_logger(__name__)
     logger.debug("Debug message")
     logger.info("Info message")
+
+    # Off the simulation thread, into run.log, run.log.1, ...
+    setup_logging("INFO", queued=True, filename="run.log")
+
+Environment:
+    LOG_LEVEL   level of the auto setup, INFO unless set
+    LOG_FILE    log queued to this rotating file instead of stdout
 """
 
+import atexit
 import logging
+import logging.handlers
 import os
+import queue
 import sys
+import time
+
+FORMAT = "%(asctime)s [%(levelname)8s] %(name)s: %(message)s"
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# The listener of the queued mode, stopped by stop_logging
+_listener: logging.handlers.QueueListener | None = None
 
 
 def get_logger(name: str) -> logging.Logger:
@@ -19,22 +43,157 @@ def get_logger(name: str) -> logging.Logger:
     return logging.getLogger(name)
 
 
-def setup_logging(level: str = "DEBUG"):
-    """Setup basic logging configuration."""
-    logging.basicConfig(
-        level=getattr(logging, level.upper(), logging.DEBUG),
-        format="%(asctime)s [%(levelname)8s] %(name)s: %(message)s",
-        datefmt="%Y-%m-%d %H:%M:%S",
-        stream=sys.stdout,
-    )
+# Arguments that cannot change between logging and formatting
+_IMMUTABLE = (str, int, float, bool, type(None))
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    # QueueHandler.prepare formats the record on the logging thread. The
+    # listener is in the same process, so only records whose arguments may
+    # change before it gets to them are formatted here.
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        args = record.args
+        if isinstance(args, dict):
+            args = args.values()
+        if args and not all(isinstance(arg, _IMMUTABLE) for arg in args):
+            record.msg = record.getMessage()
+            record.args = None
+        if record.exc_info:
+            # The traceback holds frames that keep running
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Token bucket per logger: at most burst records at once and rate records
+    per second after that. Only loggers under one of prefixes are limited,
+    and never records at ERROR or above. The first record passed after a
+    drop says how many were dropped.
+    """
+
+    def __init__(
+        self,
+        rate: float = 20.0,
+        burst: int = 100,
+        prefixes: tuple[str, ...] = ("agents",),
+    ) -> None:
+        super().__init__()
+        self.rate = rate
+        self.burst = burst
+        self.prefixes = prefixes
+        # Logger name -> (tokens, time of the last refill)
+        self._buckets: dict[str, tuple[float, float]] = {}
+        self._dropped: dict[str, int] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.ERROR or not record.name.startswith(
+            self.prefixes
+        ):
+            return True
+
+        now = time.monotonic()
+        tokens, last = self._buckets.get(record.name, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - last) * self.rate)
+        if tokens < 1:
+            self._buckets[record.name] = (tokens, now)
+            self._dropped[record.name] = self._dropped.get(record.name, 0) + 1
+            return False
+
+        self._buckets[record.name] = (tokens - 1, now)
+        dropped = self._dropped.pop(record.name, 0)
+        if dropped:
+            record.msg = f"{record.getMessage()} ({dropped} similar records dropped)"
+            record.args = None
+        return True
+
+
+def setup_logging(
+    level: str = "INFO",
+    queued: bool = False,
+    filename: str | None = None,
+    handler: logging.Handler | None = None,
+    max_bytes: int = 64 << 20,
+    backup_count: int = 5,
+    rate_limit: RateLimitFilter | None = None,
+) -> logging.handlers.QueueListener | None:
+    """
+    Setup logging. Queued, records go to handler, or a rotating file if
+    filename is given, or stdout, from a background thread.
+    """
+    global _listener
+    stop_logging()
+    level_number = getattr(logging, level.upper(), logging.INFO)
+
+    if not queued:
+        logging.basicConfig(
+            level=level_number,
+            format=FORMAT,
+            datefmt=DATE_FORMAT,
+            stream=sys.stdout,
+            force=True,
+        )
+    else:
+        if handler is None:
+            if filename is not None:
+                handler = logging.handlers.RotatingFileHandler(
+                    filename, maxBytes=max_bytes, backupCount=backup_count
+                )
+            else:
+                handler = logging.StreamHandler(sys.stdout)
+            handler.setFormatter(logging.Formatter(FORMAT, DATE_FORMAT))
+
+        # Unbounded, put_nowait never blocks the simulation
+        records: queue.SimpleQueue = queue.SimpleQueue()
+        queue_handler = _DeferredQueueHandler(records)
+        queue_handler.addFilter(rate_limit or RateLimitFilter())
+        root = logging.getLogger()
+        for existing in root.handlers[:]:
+            root.removeHandler(existing)
+            existing.close()
+        root.addHandler(queue_handler)
+        root.setLevel(level_number)
+        _listener = logging.handlers.QueueListener(
+            records, handler, respect_handler_level=True
+        )
+        _listener.start()
 
     # Silence noisy third-party loggers
     logging.getLogger("matplotlib").setLevel(logging.WARNING)
+    return _listener
 
 
+def stop_logging() -> None:
+    """
+    Write out the queued records and stop the listener thread. Records
+    logged after that are written to stdout directly, at the same level.
+    """
+    global _listener
+    if _listener is None:
+        return
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        if isinstance(handler, _DeferredQueueHandler):
+            root.removeHandler(handler)
+            handler.close()
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    _listener = None
+    logging.basicConfig(
+        level=root.level, format=FORMAT, datefmt=DATE_FORMAT, stream=sys.stdout
+    )
+
+
+atexit.register(stop_logging)
+
 # Auto-setup based on environment
 if "pytest" in sys.modules:
     setup_logging("WARNING")  # Quiet during tests
 else:
-    level = os.getenv("LOG_LEVEL", "DEBUG")
-    setup_logging(level)
+    setup_logging(
+        os.getenv("LOG_LEVEL", "INFO"),
+        queued="LOG_FILE" in os.environ,
+        filename=os.getenv("LOG_FILE"),
+    )
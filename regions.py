@@ -0,0 +1,401 @@
+"""
+Regional sharding of one economy over several processes.
+
+The economy is split into regions, each a full Simulation with its own
+people, corporations and banks, stepped in its own process. Regions only
+exchange batched messages at tick barriers:
+
+- after every tick, each corporation consigns a share of its inventory to
+  every other region, where it is sold by a Storefront next to the local
+  corporations
+- after the tick the goods were offered, each storefront reports its sales,
+  the money paid and the demand it saw to the corporation's home region,
+  which deposits the money and takes back the unsold goods
+
+Buyers pay from their own banks when they buy, the sellers' banks receive the
+money at the next barrier, so interbank settlement between regions is one
+batch deposit per bank and tick. Between those two moments the money is in
+flight, a final barrier without a tick settles everything still open.
+
+Every region is seeded with seed + its index and messages are delivered in
+region order, so a run is reproducible for a fixed seed and the same for
+every backend.
+
+Usage:
+    regions = [RegionConfig(settings, corp_seed, person_seed) for _ in range(4)]
+    economy = RegionalSimulation(regions, export_share=0.2, seed=1)
+    results = economy.run(100)
+"""
+
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+import multiprocessing
+import random
+
+import numpy as np
+
+from agents.corporation import Good
+from banking.bank_interface import batch_deposit
+from logging_config import get_logger
+from settings import CorporationSeed, PersonSeed, SimulationSettings
+from simulation import SimStats, Simulation
+
+if TYPE_CHECKING:
+    from agents.corporation import Corporation
+    from agents.person import Person
+    from banking.bank_interface import BankInterface
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class RegionConfig:
+    sim_settings: SimulationSettings
+    corporation_seed: CorporationSeed
+    person_seed: PersonSeed
+    # Added to the region's Simulation.observers, e.g. an InvariantChecker
+    observers: list = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class Consignment:
+    home: int
+    # Index into the home region's corporations
+    corp: int
+    units: int
+    price: float
+
+
+@dataclass(slots=True)
+class Report:
+    home: int
+    corp: int
+    sold: int
+    revenue: float
+    demand: int
+    unsold: int
+
+
+@dataclass
+class RegionResult:
+    stats: SimStats
+    # Central bank reserves after initialize and after the final barrier
+    initial_reserves: float
+    reserves: float
+
+
+class Storefront:
+    """Goods a corporation of another region consigned to this one."""
+
+    __slots__ = ("name", "home", "corp", "current_price", "goods", "sold", "demand")
+
+    def __init__(self, consignment: Consignment) -> None:
+        self.name = f"Region-{consignment.home}/Corp-{consignment.corp}"
+        self.home = consignment.home
+        self.corp = consignment.corp
+        self.current_price = consignment.price
+        self.goods = [Good(price=consignment.price) for _ in range(consignment.units)]
+        self.sold: int = 0
+        self.demand: int = 0
+
+    def check_inventory(self) -> bool:
+        return len(self.goods) > 0
+
+    def register_demand(self, demand: int) -> None:
+        self.demand += demand
+
+    def sell_good(self, bank_interface: "BankInterface") -> Good | None:
+        goods = self.sell_goods(bank_interface, 1)
+        return goods[0] if goods else None
+
+    def sell_goods(self, bank_interface: "BankInterface", count: int) -> list[Good]:
+        count = min(count, len(self.goods))
+        if count == 0:
+            return []
+        # Leaves this region, the seller's bank receives it at the barrier
+        bank_interface.withdraw(self.current_price * count)
+        goods = self.goods[:count]
+        del self.goods[:count]
+        self.sold += count
+        return goods
+
+    def report(self) -> Report:
+        return Report(
+            self.home,
+            self.corp,
+            self.sold,
+            self.current_price * self.sold,
+            self.demand,
+            len(self.goods),
+        )
+
+
+class Region:
+    """One region's Simulation and its side of the barrier protocol."""
+
+    def __init__(
+        self,
+        config: RegionConfig,
+        index: int,
+        number_of_regions: int,
+        export_share: float,
+        seed: int,
+    ) -> None:
+        self.index = index
+        self.number_of_regions = number_of_regions
+        self.export_share = export_share
+        # The region's draws come from its own seed, the caller's state is
+        # put back afterwards
+        caller_state = random.getstate()
+        random.seed(seed)
+        self.sim = Simulation()
+        self.sim.sim_settings = config.sim_settings
+        self.sim.corporation_seed = config.corporation_seed
+        self.sim.person_seed = config.person_seed
+        self.sim.observers.extend(config.observers)
+        self.sim.search_pool = self._market
+        self.sim.initialize()
+        # Regions stepped in one process must not share random's state
+        self.random_state = random.getstate()
+        random.setstate(caller_state)
+        # Stable indices for messages, sim.corporations drops bankruptcies
+        self.corporations: list["Corporation"] = list(self.sim.corporations)
+        self.storefronts: list[Storefront] = []
+        self._market_list: list | None = None
+        self.initial_reserves = self.reserves()
+
+    def reserves(self) -> float:
+        return float(np.sum(self.sim.central_bank.reserves))
+
+    def _market(self, person: "Person") -> list:
+        # Built once per tick, corporations_tick replaces sim.corporations
+        if self._market_list is None:
+            self._market_list = self.sim.corporations + self.storefronts
+        return self._market_list
+
+    def step(self, inbox: list[Consignment | Report], tick: bool = True) -> dict:
+        """Settle the inbox, then run one tick and return the outbox by region."""
+        self.settle([message for message in inbox if isinstance(message, Report)])
+        self.storefronts = [
+            Storefront(message)
+            for message in inbox
+            if isinstance(message, Consignment)
+        ]
+        self._market_list = None
+        if not tick:
+            return {}
+
+        caller_state = random.getstate()
+        random.setstate(self.random_state)
+        self.sim.one_tick()
+        self.random_state = random.getstate()
+        random.setstate(caller_state)
+
+        outbox: dict[int, list[Consignment | Report]] = {}
+        for storefront in self.storefronts:
+            outbox.setdefault(storefront.home, []).append(storefront.report())
+        self.storefronts = []
+        for region, consignment in self.consign():
+            outbox.setdefault(region, []).append(consignment)
+        return outbox
+
+    def settle(self, reports: list[Report]) -> None:
+        """Book what other regions sold for our corporations on this tick."""
+        tick = self.sim.tick + 1
+        paid = [report for report in reports if report.revenue > 0]
+        batch_deposit(
+            [self.corporations[report.corp].bank_interface for report in paid],
+            [report.revenue for report in paid],
+        )
+        for report in reports:
+            corp = self.corporations[report.corp]
+            corp.set_tick(tick)
+            corp.goods.extend(
+                Good(price=corp.current_price) for _ in range(report.unsold)
+            )
+            if report.sold:
+                corp.latest_sales += report.sold
+                corp.latest_revenue += report.revenue
+                corp.stats.record(tick, sales=corp.latest_sales)
+                corp.stats.record(tick, revenue=corp.latest_revenue)
+            if report.demand:
+                corp.register_demand(report.demand)
+
+    def consign(self) -> list[tuple[int, Consignment]]:
+        """Move a share of every live corporation's inventory to each region."""
+        others = self.number_of_regions - 1
+        consignments = []
+        if others == 0 or self.export_share <= 0:
+            return consignments
+        for i, corp in enumerate(self.corporations):
+            units = int(len(corp.goods) * self.export_share / others)
+            if not corp.alive or units == 0:
+                continue
+            for region in range(self.number_of_regions):
+                if region == self.index:
+                    continue
+                del corp.goods[:units]
+                consignments.append(
+                    (region, Consignment(self.index, i, units, corp.current_price))
+                )
+        return consignments
+
+    def result(self) -> RegionResult:
+        return RegionResult(self.sim.stats, self.initial_reserves, self.reserves())
+
+
+def _route(
+    outboxes: list[dict[int, list]], number_of_regions: int
+) -> list[list]:
+    """Inboxes for the next barrier, each in order of the sending region."""
+    inboxes: list[list] = [[] for _ in range(number_of_regions)]
+    for outbox in outboxes:
+        for region, messages in outbox.items():
+            inboxes[region].extend(messages)
+    return inboxes
+
+
+def _returns(inboxes: list[list]) -> list[list]:
+    """Final inboxes: reports as they are, consignments sent back unsold."""
+    final: list[list] = [[] for _ in inboxes]
+    for inbox in inboxes:
+        for message in inbox:
+            if isinstance(message, Consignment):
+                message = Report(
+                    message.home, message.corp, 0, 0.0, 0, message.units
+                )
+            final[message.home].append(message)
+    return final
+
+
+class InProcessBackend:
+    """All regions in this process, one after the other. For debugging."""
+
+    def start(self, regions: list[tuple]) -> None:
+        self.regions = [Region(*args) for args in regions]
+
+    def step(self, inboxes: list[list], tick: bool = True) -> list[dict]:
+        return [
+            region.step(inbox, tick) for region, inbox in zip(self.regions, inboxes)
+        ]
+
+    def results(self) -> list[RegionResult]:
+        return [region.result() for region in self.regions]
+
+    def close(self) -> None:
+        self.regions = []
+
+
+class LocalBackend:
+    """Every region in its own process on this machine, messages over pipes."""
+
+    def __init__(self, start_method: str | None = None) -> None:
+        self.context = multiprocessing.get_context(start_method)
+        self.workers: list[tuple[Any, Any]] = []
+
+    def start(self, regions: list[tuple]) -> None:
+        for args in regions:
+            connection, child = self.context.Pipe()
+            process = self.context.Process(
+                target=_serve_region, args=(args, child), daemon=True
+            )
+            process.start()
+            child.close()
+            self.workers.append((process, connection))
+        self._gather()
+
+    def _gather(self) -> list:
+        results = []
+        for i, (_, connection) in enumerate(self.workers):
+            status, result = connection.recv()
+            if status == "error":
+                self.close()
+                raise RuntimeError(f"Region {i} failed: {result}")
+            results.append(result)
+        return results
+
+    def step(self, inboxes: list[list], tick: bool = True) -> list[dict]:
+        # Every region runs its tick before any reply is awaited
+        for (_, connection), inbox in zip(self.workers, inboxes):
+            connection.send(("step", (inbox, tick)))
+        return self._gather()
+
+    def results(self) -> list[RegionResult]:
+        for _, connection in self.workers:
+            connection.send(("result", None))
+        return self._gather()
+
+    def close(self) -> None:
+        for process, connection in self.workers:
+            try:
+                connection.send(("stop", None))
+            except (BrokenPipeError, OSError):
+                pass
+            connection.close()
+            process.join()
+        self.workers = []
+
+
+def _serve_region(args: tuple, connection) -> None:
+    try:
+        region = Region(*args)
+        connection.send(("ok", None))
+        while True:
+            command, payload = connection.recv()
+            if command == "step":
+                connection.send(("ok", region.step(*payload)))
+            elif command == "result":
+                connection.send(("ok", region.result()))
+            else:
+                break
+    except Exception as e:
+        connection.send(("error", repr(e)))
+    finally:
+        connection.close()
+
+
+class RegionalSimulation:
+
+    def __init__(
+        self,
+        regions: list[RegionConfig],
+        export_share: float = 0.2,
+        seed: int = 0,
+        backend: InProcessBackend | LocalBackend | None = None,
+    ) -> None:
+        self.regions = regions
+        # Share of a corporation's inventory offered abroad, split evenly
+        # over the other regions
+        self.export_share = export_share
+        self.seed = seed
+        self.backend = backend if backend is not None else LocalBackend()
+        # Value sold by row's corporations in column's region
+        self.trade = np.zeros((len(regions), len(regions)))
+
+    def run(self, number_of_ticks: int) -> list[RegionResult]:
+        n = len(self.regions)
+        self.backend.start(
+            [
+                (config, i, n, self.export_share, self.seed + i)
+                for i, config in enumerate(self.regions)
+            ]
+        )
+        try:
+            inboxes: list[list] = [[] for _ in range(n)]
+            for _ in range(number_of_ticks):
+                inboxes = self._barrier(self.backend.step(inboxes))
+            # Settle the last tick's sales and take back unsold goods
+            self.backend.step(_returns(inboxes), tick=False)
+            results = self.backend.results()
+        finally:
+            self.backend.close()
+        logger.info("Ran %d regions for %d ticks", n, number_of_ticks)
+        return results
+
+    def _barrier(self, outboxes: list[dict]) -> list[list]:
+        for sender, outbox in enumerate(outboxes):
+            for messages in outbox.values():
+                for message in messages:
+                    if isinstance(message, Report):
+                        self.trade[message.home, sender] += message.revenue
+        return _route(outboxes, len(self.regions))
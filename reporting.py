@@ -0,0 +1,199 @@
+"""
+Batched chart rendering for SimStats and CorpStats.
+
+Charts are collected as ChartSpecs (plain arrays, cheap to pickle) and
+rendered in a process pool on Agg canvases, without pyplot. A manifest
+of data digests is kept per charts folder; charts whose input did not change
+since the last render are skipped.
+
+Usage:
+    report = ReportGenerator()
+    report.add(sim.stats, ["goods_sold", "goods_produced"], "goods", "goods")
+    report.add_corporations(sim.corporations, ["revenue", "costs"])
+    report.render()
+"""
+
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+import hashlib
+import json
+import os
+import threading
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from agents.corporation import Corporation
+    from base_agent import BaseStats
+
+MANIFEST = ".manifest.json"
+
+
+@dataclass
+class ChartSpec:
+    folder: str
+    filename: str
+    columns: list[str]
+    ticks: list[np.ndarray] = field(default_factory=list)
+    values: list[np.ndarray] = field(default_factory=list)
+    log_scale: bool = False
+
+    @classmethod
+    def from_stats(
+        cls,
+        stats: "BaseStats",
+        columns: list[str],
+        folder: str,
+        filename: str,
+        log_scale: bool = False,
+    ) -> "ChartSpec":
+        spec = cls(folder, filename, columns, log_scale=log_scale)
+        for col in columns:
+            data = getattr(stats, col, None)
+            if data is None or not isinstance(data, dict):
+                raise Exception(f"'{col}' not found or not a dict")
+
+            ticks, values = zip(*sorted(data.items()))
+            spec.ticks.append(np.asarray(ticks))
+            spec.values.append(np.asarray(values, dtype=float))
+        return spec
+
+    def path(self, charts_dir: str) -> str:
+        return os.path.join(charts_dir, self.folder, f"{self.filename}.png")
+
+    def digest(self) -> str:
+        h = hashlib.sha1()
+        h.update(repr((self.columns, self.log_scale)).encode())
+        for ticks, values in zip(self.ticks, self.values):
+            h.update(ticks.tobytes())
+            h.update(values.tobytes())
+        return h.hexdigest()
+
+
+def render_chart(spec: ChartSpec, charts_dir: str = "charts") -> str:
+    """Render one chart to a PNG file and return its path."""
+    # No pyplot, so rendering never switches the caller's backend or
+    # touches its open figures
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    os.makedirs(os.path.join(charts_dir, spec.folder), exist_ok=True)
+    fig = Figure(figsize=(10, 5))
+    FigureCanvasAgg(fig)
+    ax = fig.subplots()
+
+    for col, ticks, values in zip(spec.columns, spec.ticks, spec.values):
+        ax.plot(ticks, values, label=col)
+
+    ax.set_xlabel("Tick")
+    ax.set_ylabel("Value")
+    ax.set_title(", ".join(spec.columns))
+    ax.legend()
+    if spec.log_scale:
+        ax.set_yscale("log")
+    fig.tight_layout()
+
+    filepath = spec.path(charts_dir)
+    fig.savefig(filepath)
+    return filepath
+
+
+class ReportGenerator:
+    """Render many charts in a background process pool."""
+
+    def __init__(self, charts_dir: str = "charts", workers: int | None = None):
+        self.charts_dir = charts_dir
+        self.workers = workers
+        self.specs: list[ChartSpec] = []
+
+    def add(
+        self,
+        stats: "BaseStats",
+        columns: list[str],
+        folder: str,
+        filename: str,
+        log_scale: bool = False,
+    ) -> ChartSpec:
+        spec = ChartSpec.from_stats(stats, columns, folder, filename, log_scale)
+        self.specs.append(spec)
+        return spec
+
+    def add_corporations(
+        self,
+        corporations: list["Corporation"],
+        columns: list[str],
+        folder: str = "corporations",
+        log_scale: bool = False,
+    ) -> None:
+        """Add one chart per corporation, named after the corporation."""
+        for corp in corporations:
+            self.add(corp.stats, columns, folder, corp.name, log_scale)
+
+    def _load_manifest(self) -> dict[str, str]:
+        try:
+            with open(os.path.join(self.charts_dir, MANIFEST)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def _save_manifest(self, manifest: dict[str, str]) -> None:
+        os.makedirs(self.charts_dir, exist_ok=True)
+        with open(os.path.join(self.charts_dir, MANIFEST), "w") as f:
+            json.dump(manifest, f, indent=1, sort_keys=True)
+
+    def pending(self) -> list[tuple[ChartSpec, str]]:
+        """Specs whose chart is missing or whose data changed."""
+        manifest = self._load_manifest()
+        pending = []
+        for spec in self.specs:
+            digest = spec.digest()
+            path = spec.path(self.charts_dir)
+            if manifest.get(path) == digest and os.path.exists(path):
+                continue
+            pending.append((spec, digest))
+        return pending
+
+    def render(self, block: bool = True) -> list[Future] | list[str]:
+        """
+        Render all pending charts. With block=False the futures are returned
+        and the manifest is written when they complete.
+        """
+        pending = self.pending()
+        self.specs = []
+        if not pending:
+            return []
+
+        executor = ProcessPoolExecutor(max_workers=self.workers)
+        futures = [
+            executor.submit(render_chart, spec, self.charts_dir)
+            for spec, _ in pending
+        ]
+        executor.shutdown(wait=False)
+
+        if block:
+            paths = [future.result() for future in futures]
+            self._record(pending, futures)
+            return paths
+
+        lock = threading.Lock()
+        remaining = [len(futures)]
+
+        def done(_: Future) -> None:
+            with lock:
+                remaining[0] -= 1
+                if remaining[0] == 0:
+                    self._record(pending, futures)
+
+        for future in futures:
+            future.add_done_callback(done)
+        return futures
+
+    def _record(
+        self, pending: list[tuple[ChartSpec, str]], futures: list[Future]
+    ) -> None:
+        manifest = self._load_manifest()
+        for (spec, digest), future in zip(pending, futures):
+            if future.exception() is None:
+                manifest[spec.path(self.charts_dir)] = digest
+        self._save_manifest(manifest)
@@ -0,0 +1,137 @@
+"""
+Declarative scenarios: parameter changes scheduled on ticks.
+
+A scenario is compiled into a timeline indexed by tick, so applying it at a
+tick boundary costs O(changes on that tick). Scenarios serialize to JSON and
+pickle, so the same scenario can be shipped to every run of a sweep.
+
+Usage:
+    scenario = (
+        Scenario()
+        .at(20, "corporations", "salary", 0.9, mode="scale")
+        .at(40, "banks", "interest_rate", 0.03)
+        .at(40, "people", "mpc", 0.4, agents=[1, 2, 3])
+    )
+    sim.scenario = scenario
+"""
+
+from dataclasses import asdict, dataclass, field
+from typing import TYPE_CHECKING, Any
+import json
+
+from logging_config import get_logger
+
+if TYPE_CHECKING:
+    from simulation import Simulation
+
+logger = get_logger(__name__)
+
+MODES = ("set", "scale", "add")
+
+
+@dataclass
+class ParameterChange:
+    tick: int
+    # Simulation attribute holding the target: a list of agents
+    # ("corporations", "people", "banks") or a single object ("sim_settings")
+    group: str
+    attribute: str
+    value: Any
+    mode: str = "set"
+    # Agent ids within the group, None applies the change to all of them.
+    # Ids are numbered per run, so they pick the same agents in every run.
+    agents: list[int] | None = None
+
+
+@dataclass
+class Scenario:
+    changes: list[ParameterChange] = field(default_factory=list)
+
+    def __post_init__(self) -> None:
+        self.timeline: dict[int, list[ParameterChange]] | None = None
+        # Id index per group of the simulation it was built for
+        self._agent_sim: "Simulation | None" = None
+        self._agent_index: dict[str, dict[int, Any]] = {}
+
+    def __getstate__(self) -> dict:
+        # The index holds agents of one run, a pickled scenario starts clean
+        state = self.__dict__.copy()
+        state["_agent_sim"] = None
+        state["_agent_index"] = {}
+        return state
+
+    def at(
+        self,
+        tick: int,
+        group: str,
+        attribute: str,
+        value: Any,
+        mode: str = "set",
+        agents: list[int] | None = None,
+    ) -> "Scenario":
+        if mode not in MODES:
+            raise ValueError(f"Unknown mode {mode}, expected one of {MODES}")
+        self.changes.append(
+            ParameterChange(tick, group, attribute, value, mode, agents)
+        )
+        self.timeline = None
+        return self
+
+    def compile(self) -> dict[int, list[ParameterChange]]:
+        timeline: dict[int, list[ParameterChange]] = {}
+        for change in sorted(self.changes, key=lambda change: change.tick):
+            timeline.setdefault(change.tick, []).append(change)
+        self.timeline = timeline
+        return timeline
+
+    def _targets(self, sim: "Simulation", change: ParameterChange) -> list[Any]:
+        target = getattr(sim, change.group)
+        if not isinstance(target, list):
+            return [target]
+        if change.agents is None:
+            return target
+
+        # Build the id index once per group and run, dead agents are skipped
+        if self._agent_sim is not sim:
+            self._agent_sim = sim
+            self._agent_index = {}
+        index = self._agent_index.get(change.group)
+        if index is None or len(index) < len(target):
+            index = {agent.id: agent for agent in target}
+            self._agent_index[change.group] = index
+        missing = [aid for aid in change.agents if aid not in index]
+        if missing:
+            logger.warning(
+                "Tick %d: no live %s with ids %s, %s not changed for them",
+                change.tick,
+                change.group,
+                missing,
+                change.attribute,
+            )
+        agents = [index[aid] for aid in change.agents if aid in index]
+        return [agent for agent in agents if getattr(agent, "alive", True)]
+
+    def apply(self, sim: "Simulation") -> int:
+        """Apply the changes scheduled for sim.tick, return how many were applied."""
+        if self.timeline is None:
+            self.compile()
+
+        changes = self.timeline.get(sim.tick, ())
+        for change in changes:
+            for target in self._targets(sim, change):
+                if change.mode == "set":
+                    value = change.value
+                elif change.mode == "scale":
+                    value = getattr(target, change.attribute) * change.value
+                else:
+                    value = getattr(target, change.attribute) + change.value
+                setattr(target, change.attribute, value)
+
+        return len(changes)
+
+    def to_json(self) -> str:
+        return json.dumps([asdict(change) for change in self.changes])
+
+    @classmethod
+    def from_json(cls, data: str) -> "Scenario":
+        return cls([ParameterChange(**change) for change in json.loads(data)])
@@ -1,20 +1,109 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+import math
+
+import numpy as np
+
+KINDS = ("normal", "lognormal", "uniform", "empirical")
+
+
+@dataclass
+class Distribution:
+    """
+    Seed value drawn per agent. Draws for all agents are made in one call,
+    optionally clipped to [low, high].
+
+    normal: mean, std
+    lognormal: mean, std of the underlying normal
+    uniform: low, high
+    empirical: resampled with replacement from values
+    """
+
+    kind: str
+    mean: float = 0
+    std: float = 0
+    low: float | None = None
+    high: float | None = None
+    values: list[float] = field(default_factory=list)
+
+    def __post_init__(self) -> None:
+        if self.kind not in KINDS:
+            raise ValueError(
+                f"Unknown distribution {self.kind}, expected one of {KINDS}"
+            )
+        if self.kind == "empirical" and not self.values:
+            raise ValueError("An empirical distribution needs values")
+
+    @classmethod
+    def normal(cls, mean: float, std: float, **bounds) -> "Distribution":
+        return cls("normal", mean, std, **bounds)
+
+    @classmethod
+    def lognormal(cls, mean: float, std: float, **bounds) -> "Distribution":
+        return cls("lognormal", mean, std, **bounds)
+
+    @classmethod
+    def uniform(cls, low: float, high: float) -> "Distribution":
+        return cls("uniform", low=low, high=high)
+
+    @classmethod
+    def empirical(cls, values: list[float], **bounds) -> "Distribution":
+        return cls("empirical", values=list(values), **bounds)
+
+    def sample(self, rng: np.random.Generator, n: int) -> np.ndarray:
+        if self.kind == "normal":
+            draws = rng.normal(self.mean, self.std, n)
+        elif self.kind == "lognormal":
+            draws = rng.lognormal(self.mean, self.std, n)
+        elif self.kind == "uniform":
+            draws = rng.uniform(self.low, self.high, n)
+        else:
+            draws = rng.choice(np.asarray(self.values, dtype=float), n)
+
+        if self.low is not None or self.high is not None:
+            draws = np.clip(draws, self.low, self.high)
+        return draws
+
+    def expected(self) -> float:
+        """Mean of the unclipped distribution."""
+        if self.kind == "normal":
+            return self.mean
+        if self.kind == "lognormal":
+            return math.exp(self.mean + self.std**2 / 2)
+        if self.kind == "uniform":
+            return (self.low + self.high) / 2
+        return float(np.mean(self.values))
+
+
+def sample(
+    value: "float | Distribution", rng: np.random.Generator, n: int
+) -> np.ndarray:
+    """Draw n values of a seed field, a plain number gives n copies of itself."""
+    if isinstance(value, Distribution):
+        return value.sample(rng, n)
+    return np.full(n, value)
+
+
+def expected(value: "float | Distribution") -> float:
+    if isinstance(value, Distribution):
+        return value.expected()
+    return value
 
 
 @dataclass
 class CorporationSeed:
-    price: float = 0
-    demand: int = 0
-    salary: float = 0
-    ppe: int = 0
+    # Every field takes a number or a Distribution
+    price: float | Distribution = 0
+    demand: int | Distribution = 0
+    salary: float | Distribution = 0
+    ppe: int | Distribution = 0
     salery_review: int = 0
-    salary: float = 0
-    balance: float = 0
+    salary: float | Distribution = 0
+    balance: float | Distribution = 0
 
 
 @dataclass
 class PersonSeed:
-    mpc: float = 0
+    mpc: float | Distribution = 0
 
 
 @dataclass
@@ -24,3 +113,18 @@ class SimulationSettings:
     number_of_people: int = 0
     number_of_banks: int = 0
     benefit: float = 0
+    benefits_enabled: bool = False
+    benefit_replacement_rate: float = 0.6
+    # Ticks a claim is paid for, 0 pays until the person is hired
+    benefit_duration: int = 0
+    # Simulate people as weighted cohorts of identical agents
+    aggregate_people: bool = False
+    # Corporations a person samples and compares per tick, 0 compares all
+    search_breadth: int = 0
+    # Corporations are spread evenly over the sectors of Simulation.input_output
+    number_of_sectors: int = 1
+    # Directory for memory-mapped ledgers, loans and transaction histories,
+    # one subdirectory per run, deleted by Simulation.close. Forks and
+    # branches copy the run's files to a subdirectory of their own. None
+    # keeps them in memory. Agents and their bank accounts stay in memory.
+    storage_path: str | None = None
@@ -0,0 +1,323 @@
+"""
+Simulation state in shared memory, for analysis while a run is in progress.
+
+SharedStateWriter is an observer: at the end of a tick it copies the account
+balances of every bank, the price, inventory, headcount and sector of every
+live corporation and the latest SimStats row into a
+multiprocessing.shared_memory block. SharedStateReader maps the same block in
+another process without copying it.
+
+Writes are guarded by a seqlock: the writer makes the sequence number odd,
+writes, and makes it even again. A reader copies the arrays and retries if
+the sequence was odd or changed meanwhile, so it only ever returns a whole
+tick boundary, and the writer never waits for readers. When the economy
+outgrows the block, the writer marks it moved and recreates it, bigger,
+under the same name, readers attach again on their next snapshot.
+
+Usage:
+    with SharedStateWriter(name="simecon") as writer:
+        writer.open(accounts=10_000, corporations=100)  # optional
+        sim.observers.append(writer)
+        sim.run()
+
+    # in another process
+    reader = SharedStateReader("simecon")
+    snapshot = reader.snapshot()
+    snapshot.balances, snapshot.stats["goods_avg_price"]
+"""
+
+from dataclasses import dataclass, fields
+from multiprocessing import resource_tracker, shared_memory
+from typing import TYPE_CHECKING
+import os
+import time
+
+import numpy as np
+
+from logging_config import get_logger
+from simulation import SimStats
+
+if TYPE_CHECKING:
+    from simulation import Simulation
+
+logger = get_logger(__name__)
+
+STAT_NAMES = tuple(stat_field.name for stat_field in fields(SimStats))
+
+# Header slots, int64
+SEQ, TICK, ACCOUNTS, CORPORATIONS, ROWS, ACCOUNT_CAPACITY, CORP_CAPACITY, HISTORY = (
+    range(8)
+)
+HEADER = 8
+# Sequence number of a block the writer replaced or closed
+MOVED = -1
+
+
+@dataclass
+class StateSnapshot:
+    tick: int
+    # Ledger balances of all banks, in bank and account id order
+    balances: np.ndarray
+    # Bank index of every balance
+    banks: np.ndarray
+    corporation_prices: np.ndarray
+    corporation_inventory: np.ndarray
+    corporation_headcount: np.ndarray
+    corporation_sectors: np.ndarray
+    # Ticks of the rows in stats, oldest first
+    ticks: np.ndarray
+    # SimStats column by name, one value per tick in ticks
+    stats: dict[str, np.ndarray]
+
+
+def _layout(account_capacity: int, corp_capacity: int, history: int) -> dict:
+    """Offset, dtype and shape of every array in a block."""
+    arrays = {
+        "header": (np.int64, (HEADER,)),
+        "balances": (np.float64, (account_capacity,)),
+        "banks": (np.int64, (account_capacity,)),
+        "corporation_prices": (np.float64, (corp_capacity,)),
+        "corporation_inventory": (np.int64, (corp_capacity,)),
+        "corporation_headcount": (np.int64, (corp_capacity,)),
+        "corporation_sectors": (np.int64, (corp_capacity,)),
+        "ticks": (np.int64, (history,)),
+        "stats": (np.float64, (history, len(STAT_NAMES))),
+    }
+    layout = {}
+    offset = 0
+    for name, (dtype, shape) in arrays.items():
+        layout[name] = (offset, dtype, shape)
+        # Every dtype is 8 bytes, so offsets stay aligned
+        offset += 8 * int(np.prod(shape))
+    layout["size"] = offset
+    return layout
+
+
+def _views(buffer, layout: dict) -> dict[str, np.ndarray]:
+    views = {}
+    for name, value in layout.items():
+        if name == "size":
+            continue
+        offset, dtype, shape = value
+        views[name] = np.ndarray(shape, dtype, buffer=buffer, offset=offset)
+    return views
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """Open an existing block without taking ownership of it."""
+    try:
+        return shared_memory.SharedMemory(name, track=False)
+    except TypeError:
+        # Before Python 3.13 the resource tracker unlinks attached blocks
+        # when the process exits, the writer owns this one
+        block = shared_memory.SharedMemory(name)
+        resource_tracker.unregister(block._name, "shared_memory")
+        return block
+
+
+class SharedStateWriter:
+
+    def __init__(
+        self,
+        name: str | None = None,
+        interval: int = 1,
+        history: int = 256,
+        headroom: float = 2.0,
+    ) -> None:
+        self.name = name if name is not None else f"simecon-{os.getpid()}"
+        self.interval = interval
+        # SimStats rows kept, oldest are overwritten
+        self.history = history
+        # Capacity allocated per account and corporation present, so a
+        # growing economy rarely needs a bigger block
+        self.headroom = headroom
+        self.block: shared_memory.SharedMemory | None = None
+        self.arrays: dict[str, np.ndarray] = {}
+        self.rows: int = 0
+
+    def on_tick(self, sim: "Simulation") -> None:
+        if self.interval and sim.tick % self.interval == 0:
+            self.publish(sim)
+
+    def open(self, accounts: int = 1, corporations: int = 1) -> None:
+        """
+        Create the block before the first publish, sized for accounts and
+        corporations, so readers can attach early. They wait until a tick is
+        published, publish grows the block as needed.
+        """
+        if self.block is None:
+            self._allocate(accounts, corporations)
+
+    def _allocate(self, accounts: int, corporations: int) -> None:
+        rows = {}
+        if self.block is not None:
+            # Carry the stats history over to the new block
+            rows = {name: self.arrays[name].copy() for name in ("ticks", "stats")}
+            self.close()
+
+        account_capacity = max(int(accounts * self.headroom), 1)
+        corp_capacity = max(int(corporations * self.headroom), 1)
+        layout = _layout(account_capacity, corp_capacity, self.history)
+        self.block = shared_memory.SharedMemory(
+            self.name, create=True, size=layout["size"]
+        )
+        self.arrays = _views(self.block.buf, layout)
+        header = self.arrays["header"]
+        header[:] = 0
+        # Odd until the first publish is complete, readers wait for it
+        header[SEQ] = 1
+        header[ACCOUNT_CAPACITY] = account_capacity
+        header[CORP_CAPACITY] = corp_capacity
+        header[HISTORY] = self.history
+        if rows:
+            self.arrays["ticks"][:] = rows["ticks"]
+            self.arrays["stats"][:] = rows["stats"]
+        logger.info(
+            "Shared state %s: %d accounts, %d corporations",
+            self.name,
+            account_capacity,
+            corp_capacity,
+        )
+
+    def publish(self, sim: "Simulation") -> None:
+        """Copy the state at this tick boundary into shared memory."""
+        balances = [bank.balances() for bank in sim.banks]
+        accounts = sum(len(ledger) for ledger in balances)
+        corps = sim.corporations
+        if (
+            self.block is None
+            or accounts > len(self.arrays["balances"])
+            or len(corps) > len(self.arrays["corporation_prices"])
+        ):
+            self._allocate(accounts, len(corps))
+
+        arrays = self.arrays
+        header = arrays["header"]
+        # Already odd on a new block
+        if header[SEQ] % 2 == 0:
+            header[SEQ] += 1
+
+        start = 0
+        for i, ledger in enumerate(balances):
+            arrays["balances"][start : start + len(ledger)] = ledger
+            arrays["banks"][start : start + len(ledger)] = i
+            start += len(ledger)
+        n = len(corps)
+        arrays["corporation_prices"][:n] = [corp.current_price for corp in corps]
+        arrays["corporation_inventory"][:n] = [len(corp.goods) for corp in corps]
+        arrays["corporation_headcount"][:n] = [corp.headcount for corp in corps]
+        arrays["corporation_sectors"][:n] = [corp.sector for corp in corps]
+
+        row = self.rows % self.history
+        tick = sim.stats.tick
+        arrays["ticks"][row] = tick
+        arrays["stats"][row] = [
+            getattr(sim.stats, name).get(tick, np.nan) for name in STAT_NAMES
+        ]
+        self.rows += 1
+
+        header[TICK] = sim.tick
+        header[ACCOUNTS] = accounts
+        header[CORPORATIONS] = n
+        header[ROWS] = self.rows
+        header[SEQ] += 1
+
+    def close(self) -> None:
+        if self.block is None:
+            return
+        self.arrays["header"][SEQ] = MOVED
+        # The views must go before the block can be closed
+        self.arrays = {}
+        self.block.close()
+        self.block.unlink()
+        self.block = None
+
+    def __enter__(self) -> "SharedStateWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class SharedStateReader:
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.block: shared_memory.SharedMemory | None = None
+        self.arrays: dict[str, np.ndarray] = {}
+
+    def _open(self) -> None:
+        self.close()
+        self.block = _attach(self.name)
+        capacities = np.ndarray((HEADER,), np.int64, buffer=self.block.buf)[
+            [ACCOUNT_CAPACITY, CORP_CAPACITY, HISTORY]
+        ].tolist()
+        self.arrays = _views(self.block.buf, _layout(*capacities))
+
+    def snapshot(self, timeout: float = 1.0) -> StateSnapshot:
+        """Copy of the latest complete tick, waiting at most timeout seconds."""
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                if self.block is None:
+                    self._open()
+                snapshot = self._read()
+                if snapshot is not None:
+                    return snapshot
+                if self.moved():
+                    self._open()
+            except FileNotFoundError:
+                # The writer is between two blocks
+                pass
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"No consistent state in {self.name}")
+            time.sleep(0)
+
+    def moved(self) -> bool:
+        return int(self.arrays["header"][SEQ]) == MOVED
+
+    def _read(self) -> StateSnapshot | None:
+        arrays = self.arrays
+        header = arrays["header"]
+        seq = int(header[SEQ])
+        # Odd while the writer is writing
+        if seq == MOVED or seq % 2:
+            return None
+
+        tick, accounts, n, rows = (
+            int(header[TICK]),
+            int(header[ACCOUNTS]),
+            int(header[CORPORATIONS]),
+            int(header[ROWS]),
+        )
+        history = len(arrays["ticks"])
+        # Oldest row first once the ring has wrapped, none before any row
+        order = np.roll(np.arange(history), -rows)[history - min(rows, history) :]
+        stats = arrays["stats"][order]
+        snapshot = StateSnapshot(
+            tick=tick,
+            balances=arrays["balances"][:accounts].copy(),
+            banks=arrays["banks"][:accounts].copy(),
+            corporation_prices=arrays["corporation_prices"][:n].copy(),
+            corporation_inventory=arrays["corporation_inventory"][:n].copy(),
+            corporation_headcount=arrays["corporation_headcount"][:n].copy(),
+            corporation_sectors=arrays["corporation_sectors"][:n].copy(),
+            ticks=arrays["ticks"][order],
+            stats={name: stats[:, i] for i, name in enumerate(STAT_NAMES)},
+        )
+        if int(header[SEQ]) != seq:
+            return None
+        return snapshot
+
+    def close(self) -> None:
+        if self.block is None:
+            return
+        self.arrays = {}
+        self.block.close()
+        self.block = None
+
+    def __enter__(self) -> "SharedStateReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -1,13 +1,35 @@
-import settings
 from agents.corporation import Corporation
+from agents.decisions import finance_actions
+from agents.production import InputOutput
 from agents.person import Person
-from base_agent import BaseStats
+from agents.government import Government
+from agents.workforce import Workforce
+from base_agent import AgentIds, BaseStats
 from banking.agents.bank import Bank
 from banking.agents.central_bank import CentralBank
 import random
+import numpy as np
 from logging_config import get_logger
-from settings import CorporationSeed, PersonSeed, SimulationSettings
+from settings import (
+    CorporationSeed,
+    PersonSeed,
+    SimulationSettings,
+    expected,
+    sample,
+)
+from collections import deque
 from dataclasses import dataclass, field
+from event_log import EventLog
+from convergence import COMPLETED, ConvergenceMonitor
+from scenario import Scenario
+from storage import ColumnStore
+from tracing import Tracer
+from typing import Callable
+import copy
+import gc
+import os
+import tempfile
+import multiprocessing
 import time
 
 logger = get_logger(__name__)
@@ -35,6 +57,7 @@ class SimStats(BaseStats):
     company_avg_costs: dict[int, float] = field(default_factory=dict)
     company_avg_profit: dict[int, float] = field(default_factory=dict)
     company_total_loans: dict[int, int] = field(default_factory=dict)
+    corporations_alive: dict[int, int] = field(default_factory=dict)
 
 
 class Simulation:
@@ -43,50 +66,176 @@ class Simulation:
         self.people: list[Person] = []
         self.banks: list[Bank] = []
         self.central_bank: CentralBank | None = None
+        # Columns of the banks' transaction journals, see init_banks
+        self.store: ColumnStore | None = None
         self.tick = 0
+        # Agent ids of this run, each type numbered from 0
+        self.agent_ids = AgentIds()
         self.sim_settings = SimulationSettings()
         self.corporation_seed = CorporationSeed()
         self.person_seed = PersonSeed()
         self.stats = SimStats()
+        self.government = Government(self.sim_settings)
+        self.workforce = Workforce()
+        self.workforce.government = self.government
+        # Shared, so people must only be added or removed in place
+        self.workforce.population = self.people
+        self.event_log: EventLog | None = None
+        self.checkpoint_interval: int = 0
+        self.monitor: ConvergenceMonitor | None = None
+        self.scenario: Scenario | None = None
+        # Called with the simulation at the end of every tick, e.g. InvariantChecker
+        self.observers: list = []
+        # Corporations a person searches, e.g. a supplier network or the
+        # corporations at the person's bank. None searches all of them.
+        self.search_pool: Callable[[Person], list[Corporation]] | None = None
+        # Inputs bought between sectors before production, None produces
+        # from labor alone
+        self.input_output: InputOutput | None = None
+        # Records phase, corporation and bank spans, see attach_tracer
+        self.tracer: Tracer | None = None
+        # Seconds spent in each phase of the latest tick
+        self.phase_timings: dict[str, float] = {}
+        self._phase_start: float = 0
+        self.stop_reason: str | None = None
+        self.bankruptcies: int = 0
+        # Most recent bankruptcies only, so high churn runs don't keep growing
+        self.dead_corporations: deque[Corporation] = deque(maxlen=100)
 
     def corporations_tick(self):
         # Check for salary review
+        if self.input_output is None:
+            if self.tracer is None:
+                for corp in self.corporations:
+                    corp.one_tick(self.tick, finance=False)
+            else:
+                self._traced_corporations_tick()
+        else:
+            self.produce_with_inputs()
+        finance_actions(
+            [corp for corp in self.corporations if corp.reviews_finance()]
+        )
+
+        # Move corporations that went bankrupt out of the active list, and
+        # out of the bank and event log, only dead_corporations keeps them
+        if not all(corp.alive for corp in self.corporations):
+            for corp in self.corporations:
+                if not corp.alive:
+                    self.bankruptcies += 1
+                    self.dead_corporations.append(corp)
+                    corp.bank_interface.bank.close_account(corp.bank_interface)
+                    if self.event_log is not None:
+                        self.event_log.release(corp)
+            self.corporations = [corp for corp in self.corporations if corp.alive]
+
+    def _traced_corporations_tick(self):
+        tracer = self.tracer
         for corp in self.corporations:
-            if corp.alive:
-                corp.one_tick(self.tick)
+            start = tracer.sample("one_tick")
+            corp.one_tick(self.tick, finance=False)
+            if start is not None:
+                tracer.complete("one_tick", "corporation", start, {"corp": corp.name})
 
-    def goverment_tick(self):
-        # Get unemployed people
-        unemployed_people = [p for p in self.people if not p.employed]
-        # Give them money
-        for person in unemployed_people:
-            ltid = person.latest_salary_id
-            if ltid:
-                amount = person.bank_interface.find_transaction(ltid).amount
-            else:
-                amount = self.sim_settings.benefit
+    def produce_with_inputs(self):
+        """one_tick for all corporations, with inputs settled in between."""
+        for corp in self.corporations:
+            corp.set_tick(self.tick)
+            corp.initialize_tick_stats()
+        limits = self.input_output.settle(self.corporations)
+        for corp, limit in zip(self.corporations, limits):
+            corp.produce_goods(limit)
+            corp.pay_salaries()
+        self.input_output.register_demand(self.corporations)
 
-            tid = person.bank_interface.deposit(amount * 0.6)
-            person.latest_salary_id = tid
+    def goverment_tick(self):
+        # Pay benefits to everyone with an open claim
+        return self.government.pay_benefits()
 
     def people_tick(self):
         # We always need to reset demand and sales
-        if not self.corporations or not self.people:
+        if not (self.corporations or self.bankruptcies) or not self.people:
             raise Exception("corporations and people must be initialized")
 
+        breadth = self.sim_settings.search_breadth
         for person in self.people:
             person.set_tick(self.tick)
             if person.bank_interface.check_balance() > 0:
-                person.spend(self.corporations)
+                corps = self.corporations
+                if self.search_pool is not None:
+                    corps = self.search_pool(person)
+                if breadth:
+                    corps = person.consideration_set(corps, breadth)
+                person.spend(corps)
 
     def one_tick(self):
+        self._phase_start = tick_start = time.perf_counter()
         self.tick += 1
         self.stats.set_tick(self.tick)
-        # self.goverment_tick()
+        if self.event_log is not None:
+            self.event_log.set_tick(self.tick)
+        if self.scenario is not None:
+            self.scenario.apply(self)
+        self.government.set_tick(self.tick)
+        if self.sim_settings.benefits_enabled:
+            self.goverment_tick()
+        self._lap("government")
         self.corporations_tick()
+        self._lap("corporations")
         self.people_tick()
+        if self.sim_settings.aggregate_people:
+            self.aggregate_people()
+        self._lap("people")
         self.clean_up()
-        self.gen_stats()
+        if self.tracer is None:
+            self.gen_stats()
+        else:
+            start = time.perf_counter()
+            self.gen_stats()
+            self.tracer.complete("gen_stats", "phase", start)
+        self._lap("stats")
+        if self.checkpoint_interval and self.tick % self.checkpoint_interval == 0:
+            self.event_log.checkpoint(self)
+        self._lap("checkpoint")
+        # Observers see the timings of this tick up to here
+        for observer in self.observers:
+            observer.on_tick(self)
+        if self.monitor is not None:
+            self.stop_reason = self.monitor.check(self)
+        self._lap("observers")
+        if self.tracer is not None:
+            self.tracer.span(
+                "one_tick", "tick", tick_start, self._phase_start, {"tick": self.tick}
+            )
+
+    def _lap(self, phase: str) -> None:
+        now = time.perf_counter()
+        self.phase_timings[phase] = now - self._phase_start
+        if self.tracer is not None:
+            self.tracer.span(phase, "phase", self._phase_start, now)
+        self._phase_start = now
+
+    def attach_event_log(self, event_log: EventLog, checkpoint_interval: int = 0):
+        """Write banking, labor and price events of this run to event_log."""
+        self.event_log = event_log
+        self.checkpoint_interval = checkpoint_interval
+        for bank in self.banks:
+            bank.event_log = event_log
+        for corp in self.corporations:
+            corp.event_log = event_log
+        # Initial state, so replay never has to start from an empty economy
+        event_log.set_tick(self.tick)
+        event_log.checkpoint(self)
+
+    def attach_tracer(self, tracer: Tracer) -> None:
+        """Record the phases, corporations and bank operations to tracer."""
+        self.tracer = tracer
+        for bank in self.banks:
+            bank.tracer = tracer
+
+    def detach_tracer(self) -> None:
+        self.tracer = None
+        for bank in self.banks:
+            bank.tracer = None
 
     def clean_up(self):
         for corp in self.corporations:
@@ -94,16 +243,123 @@ class Simulation:
         for person in self.people:
             person.clean_up()
 
-    def run(self):
-        logger.info("Starting simulation run for %d ticks", settings.NUMBER_OF_TICKS)
-        for tick in range(settings.NUMBER_OF_TICKS):
-            pass
+    def initialize(self):
+        # sim_settings may have been replaced after __init__
+        self.government.sim_settings = self.sim_settings
+        self.init_banks()
+        self.init_people()
+        self.init_corporations()
+
+    def run(self, number_of_ticks: int | None = None) -> str:
+        """Run until number_of_ticks or until the monitor stops the run."""
+        if number_of_ticks is None:
+            number_of_ticks = self.sim_settings.number_of_ticks
+        logger.info("Starting simulation run for %d ticks", number_of_ticks)
+
+        for _ in range(number_of_ticks):
+            self.one_tick()
+            if self.stop_reason:
+                logger.info("Stopped on tick %d: %s", self.tick, self.stop_reason)
+                self.flush()
+                return self.stop_reason
+
+        self.flush()
+        return COMPLETED
+
+    def flush(self) -> None:
+        """Write the banks' buffered transactions and mapped columns to disk."""
+        if self.store is None:
+            return
+        for bank in self.banks:
+            if bank.journal is not None:
+                bank.journal.flush()
+        self.store.flush()
+
+    def close(self) -> None:
+        """
+        Flush and delete this run's directory under storage_path. The
+        simulation cannot be run after that.
+        """
+        if self.store is None:
+            return
+        self.flush()
+        self.store.close(remove=True)
+        self.store = None
+
+    def __enter__(self) -> "Simulation":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def fork(self) -> "Simulation":
+        """
+        Independent copy of the current state, e.g. to branch policy variants
+        off a warmed-up baseline. The copy does not write to the event log
+        or the trace and starts without observers, which hold threads or
+        shared resources of this run. With storage_path it copies the run's
+        files to a directory of its own, close it when done.
+        """
+        memo = {id(self.event_log): None} if self.event_log is not None else {}
+        if self.tracer is not None:
+            memo[id(self.tracer)] = None
+        memo[id(self.observers)] = []
+        if self.store is not None:
+            # Before the banks, so their columns map to the copy's files
+            copy.deepcopy(self.store, memo)
+        branch = copy.deepcopy(self, memo)
+        branch.checkpoint_interval = 0
+        return branch
+
+    def fork_branches(
+        self,
+        variants: dict[str, Scenario | Callable[["Simulation"], None]],
+        number_of_ticks: int,
+        seed: int | None = None,
+    ) -> dict[str, SimStats]:
+        """
+        Run each variant from the current state in its own forked process.
+        Children share the parent's memory copy-on-write, so branching costs
+        nothing up front. Requires the fork start method (Linux, macOS).
+        """
+        context = multiprocessing.get_context("fork")
+        branches = {}
+        for i, (name, variant) in enumerate(variants.items()):
+            receiver, sender = context.Pipe(duplex=False)
+            branch_seed = None if seed is None else seed + i
+            process = context.Process(
+                target=_run_branch,
+                args=(self, variant, number_of_ticks, branch_seed, sender),
+            )
+            process.start()
+            sender.close()
+            branches[name] = (process, receiver)
+
+        results = {}
+        for name, (process, receiver) in branches.items():
+            status, result = receiver.recv()
+            process.join()
+            if status == "error":
+                raise RuntimeError(f"Branch {name} failed: {result}")
+            results[name] = result
+        return results
+
+    def detach_event_log(self) -> None:
+        self.event_log = None
+        self.checkpoint_interval = 0
+        for bank in self.banks:
+            bank.event_log = None
+        for corp in self.corporations:
+            corp.event_log = None
 
     def gen_stats(self):
 
-        alive_corporations = [c for c in self.corporations if c.alive]
-        # Population stats
-        persons_employed = len([1 for p in self.people if p.employed])
+        # Dead corporations are compacted out in corporations_tick
+        alive_corporations = self.corporations
+        corp_count = max(len(alive_corporations), 1)
+        # Population stats, a cohort counts once per person it represents
+        population = sum([p.weight for p in self.people])
+        persons_employed = sum([p.weight for p in self.people if p.employed])
         goods_owned = sum([len(p.bought_goods) for p in self.people])
         goods_demanded = sum([c.stats.demand[self.tick] for c in alive_corporations])
         goods_produced = sum(
@@ -115,16 +371,20 @@ class Simulation:
         )
         goods_avg_price = sum(
             [c.stats.price[self.tick] for c in alive_corporations]
-        ) / len(alive_corporations)
-        goods_min_price = min([c.stats.price[self.tick] for c in alive_corporations])
-        goods_max_price = max([c.stats.price[self.tick] for c in alive_corporations])
+        ) / corp_count
+        goods_min_price = min(
+            [c.stats.price[self.tick] for c in alive_corporations], default=0
+        )
+        goods_max_price = max(
+            [c.stats.price[self.tick] for c in alive_corporations], default=0
+        )
         person_total_budget = sum([p.latest_budget for p in self.people])
-        person_avg_spending = sum([p.latest_spending for p in self.people]) / len(
-            self.people
+        person_avg_spending = (
+            sum([p.latest_spending for p in self.people]) / population
+        )
+        person_avg_money_in_banks = (
+            sum([p.bank_interface.check_balance() for p in self.people]) / population
         )
-        person_avg_money_in_banks = sum(
-            [p.bank_interface.check_balance() for p in self.people]
-        ) / len(self.people)
         person_total_queue_size = sum([p.latest_queue_size for p in self.people])
         company_money_in_banks = sum(
             [c.bank_interface.check_balance() for c in alive_corporations]
@@ -132,19 +392,17 @@ class Simulation:
         company_revenue = sum([c.stats.revenue[self.tick] for c in alive_corporations])
         company_avg_revenue = sum(
             [c.stats.revenue[self.tick] for c in alive_corporations]
-        ) / len(alive_corporations)
+        ) / corp_count
         company_avg_costs = sum(
             [c.stats.costs[self.tick] for c in alive_corporations]
-        ) / len(alive_corporations)
+        ) / corp_count
         company_avg_profit = sum(
             [c.stats.profit[self.tick] for c in alive_corporations]
-        ) / len(alive_corporations)
+        ) / corp_count
         company_total_loans = sum(
             [sum([l.amount for l in c.loans]) for c in alive_corporations]
         )
-        person_avg_salary = sum([c.salary for c in alive_corporations]) / len(
-            alive_corporations
-        )
+        person_avg_salary = sum([c.salary for c in alive_corporations]) / corp_count
 
         self.stats.record(
             self.tick,
@@ -168,34 +426,28 @@ class Simulation:
             company_avg_costs=round(company_avg_costs, 2),
             company_total_loans=company_total_loans,
             person_avg_salary=round(person_avg_salary, 2),
+            corporations_alive=len(alive_corporations),
         )
 
         return self.stats
 
     def init_banks(self):
         self.central_bank = CentralBank()
+        path = self.sim_settings.storage_path
+        if path is not None:
+            # A directory of its own, runs sharing storage_path never open
+            # each other's columns
+            os.makedirs(path, exist_ok=True)
+            self.store = ColumnStore(tempfile.mkdtemp(prefix="run-", dir=path))
         for _ in range(self.sim_settings.number_of_banks):
-            self.banks.append(Bank(self.central_bank))
-
-    def choose_job(self):
-        # TODO create labor market class
-        # return a random corp weighted by the salary
-        hiring_corps = [c for c in self.corporations if c.hiring]
-        if not hiring_corps:
-            return None
-        return random.choices(hiring_corps, weights=[c.salary for c in hiring_corps])[0]
+            bank = Bank(self.central_bank)
+            if self.store is not None:
+                bank.use_store(self.store, f"bank-{bank.bank_id}")
+            self.banks.append(bank)
 
     def labor_market(self):
-        unemployed_people = [p for p in self.people if not p.employed]
-        random.shuffle(unemployed_people)
-        employee_count = 0
-        for person in unemployed_people:
-            corp = self.choose_job()
-            if corp:
-                corp.add_employee(person)
-                employee_count += 1
-
-        return employee_count
+        # Match unemployed people to hiring corps, weighted by salary
+        return self.workforce.match(self.corporations)
 
     def init_corporations(self):
         if not self.people or not self.banks:
@@ -203,16 +455,27 @@ class Simulation:
 
         # Create corporations
         for _ in range(self.sim_settings.number_of_corporations):
-            self.corporations.append(Corporation(random.choice(self.banks)))
+            self.corporations.append(
+                Corporation(random.choice(self.banks), self.agent_ids)
+            )
 
-        # Add settings to corporations
-        for corp in self.corporations:
-            corp.ppe = self.corporation_seed.ppe
-            corp.salary = self.corporation_seed.salary
-            corp.latest_demand = self.corporation_seed.demand
-            corp.current_price = self.corporation_seed.price
-            corp.salary = self.corporation_seed.salary
-            corp.bank_interface.deposit(self.corporation_seed.balance)
+        # Add settings to corporations, each seed field drawn for all at once
+        n = len(self.corporations)
+        rng = np.random.default_rng(random.getrandbits(64))
+        seed = self.corporation_seed
+        ppe = np.rint(sample(seed.ppe, rng, n)).astype(int).tolist()
+        salary = sample(seed.salary, rng, n).tolist()
+        demand = np.rint(sample(seed.demand, rng, n)).astype(int).tolist()
+        price = sample(seed.price, rng, n).tolist()
+        balance = sample(seed.balance, rng, n).tolist()
+        for i, corp in enumerate(self.corporations):
+            corp.ppe = ppe[i]
+            corp.salary = salary[i]
+            corp.latest_demand = demand[i]
+            corp.current_price = price[i]
+            corp.bank_interface.deposit(balance[i])
+            corp.workforce = self.workforce
+            corp.sector = i % self.sim_settings.number_of_sectors
 
         # Start labor market
         employee_count = self.labor_market()
@@ -227,21 +490,127 @@ class Simulation:
         if not self.banks:
             raise Exception("banks must be initialized")
 
-        for _ in range(self.sim_settings.number_of_people):
-            # Select random bank
-            bank = random.choice(self.banks)
-            person = Person(bank=bank)
-            person.mpc = self.person_seed.mpc
-            self.people.append(person)
+        if not self.sim_settings.aggregate_people:
+            self.init_people_bulk()
+            return
+
+        # One cohort per bank and mpc, sized as if everyone picked a random
+        # bank. Continuous mpc distributions leave few people per cohort.
+        people = []
+        counts = self._people_per_bank(self.sim_settings.number_of_people)
+        rng = np.random.default_rng(random.getrandbits(64))
+        for bank, count in zip(self.banks, counts.tolist()):
+            mpcs = sample(self.person_seed.mpc, rng, count)
+            for mpc, weight in zip(*np.unique(mpcs, return_counts=True)):
+                person = Person(bank=bank, ids=self.agent_ids)
+                person.mpc = float(mpc)
+                person.weight = int(weight)
+                people.append(person)
+
+        self.workforce.register(people)
+        self.workforce.add_unemployed(people)
+
+    def init_people_bulk(self, number_of_people: int | None = None) -> list[Person]:
+        """
+        Add people with one bank choice draw for everyone and one account
+        reservation per bank, instead of registering accounts one by one.
+        """
+        if number_of_people is None:
+            number_of_people = self.sim_settings.number_of_people
+
+        people = []
+        counts = self._people_per_bank(number_of_people)
+        rng = np.random.default_rng(random.getrandbits(64))
+        mpcs = sample(self.person_seed.mpc, rng, number_of_people).tolist()
+        # Allocating millions of agents triggers full collections that find
+        # nothing to free, hold the collector off until they all exist
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            for bank, count in zip(self.banks, counts.tolist()):
+                for account_id in bank.register_accounts(count):
+                    person = Person(bank, account_id, self.agent_ids)
+                    person.mpc = mpcs[len(people)]
+                    people.append(person)
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+        # Spending order follows self.people, don't let it follow the bank
+        order = rng.permutation(len(people))
+        people = [people[i] for i in order]
+
+        self.workforce.register(people)
+        self.workforce.add_unemployed(people)
+        return people
+
+    def _people_per_bank(self, number_of_people: int) -> np.ndarray:
+        # Seeded from random, so random.seed reproduces the draw
+        rng = np.random.default_rng(random.getrandbits(64))
+        return rng.multinomial(
+            number_of_people, [1 / len(self.banks)] * len(self.banks)
+        )
+
+    def aggregate_people(self) -> int:
+        """
+        Merge people with the same employer, bank, mpc and employment state
+        into one cohort. Cohorts split again when part of them is hired or
+        fired, so they only stay merged while they behave the same way.
+        Returns the number of agents merged away.
+        """
+        cohorts: dict[tuple, Person] = {}
+        merged: list[Person] = []
+        for person in self.people:
+            key = (
+                person.employer,
+                person.bank_interface.bank,
+                person.mpc,
+                person.employed,
+            )
+            cohort = cohorts.setdefault(key, person)
+            if cohort is person:
+                continue
+
+            balance = person.bank_interface.check_balance()
+            if balance > 0:
+                person.bank_interface.transfer(balance, to=cohort.bank_interface)
+            cohort.weight += person.weight
+            cohort.latest_income += person.latest_income
+            cohort.latest_spending += person.latest_spending
+            cohort.latest_budget += person.latest_budget
+            cohort.latest_queue_size += person.latest_queue_size
+            cohort.bought_goods.extend(person.bought_goods)
+            if person.employer is not None:
+                person.employer.employees.discard(person)
+            merged.append(person)
+
+        if merged:
+            # self.people is the workforce population, shrunk in place
+            self.workforce.unregister(merged)
+            # Their balances moved to the cohorts, the next split reuses the
+            # accounts
+            for person in merged:
+                person.bank_interface.bank.close_account(
+                    person.bank_interface, reuse=True
+                )
+                if self.event_log is not None:
+                    self.event_log.release(person)
+
+        return len(merged)
 
     def validate_settings(self):
+        # Distribution seeds are checked at their mean
+        demand = expected(self.corporation_seed.demand)
+        ppe = expected(self.corporation_seed.ppe)
+        salary = expected(self.corporation_seed.salary)
+        price = expected(self.corporation_seed.price)
         # Calculate employees needed for demand
-        emp_needed_per_corp = self.corporation_seed.demand // self.corporation_seed.ppe
+        emp_needed_per_corp = demand // ppe
         emp_needed_total = (
             emp_needed_per_corp * self.sim_settings.number_of_corporations
         )
-        total_salary = self.corporation_seed.salary * emp_needed_total
-        total_possible_revenue = total_salary * self.person_seed.mpc
+        total_salary = salary * emp_needed_total
+        total_possible_revenue = total_salary * expected(self.person_seed.mpc)
 
         if emp_needed_total > self.sim_settings.number_of_people:
             logger.warning(
@@ -249,11 +618,11 @@ class Simulation:
                 f"Needed {emp_needed_total}, have {self.sim_settings.number_of_people}"
             )
 
-        unit_cost = round(self.corporation_seed.salary / self.corporation_seed.ppe, 2)
-        if unit_cost > self.corporation_seed.price:
+        unit_cost = round(salary / ppe, 2)
+        if unit_cost > price:
             logger.warning(
                 "Unit cost exceeds price. "
-                f"Cost: {unit_cost}, Price: {self.corporation_seed.price}"
+                f"Cost: {unit_cost}, Price: {price}"
             )
 
         missing = total_salary - total_possible_revenue
@@ -268,6 +637,38 @@ class Simulation:
         time.sleep(3)
 
 
+def _run_branch(
+    sim: Simulation,
+    variant: Scenario | Callable[[Simulation], None],
+    number_of_ticks: int,
+    seed: int | None,
+    sender,
+) -> None:
+    branch = None
+    try:
+        # The parent owns the event log file
+        sim.detach_event_log()
+        sim.detach_tracer()
+        sim.observers = []
+        if sim.store is not None:
+            # The mapped files are shared with the parent, not copy-on-write
+            sim = branch = sim.fork()
+        if seed is not None:
+            random.seed(seed)
+        if isinstance(variant, Scenario):
+            sim.scenario = variant
+        else:
+            variant(sim)
+        sim.run(number_of_ticks)
+        sender.send(("ok", sim.stats))
+    except Exception as e:
+        sender.send(("error", repr(e)))
+    finally:
+        if branch is not None:
+            branch.close()
+        sender.close()
+
+
 if __name__ == "__main__":
     sim = Simulation()
     sim.initialize()
@@ -0,0 +1,125 @@
+"""
+Growable numeric columns, in memory or in numpy.memmap files.
+
+Columns are grown by doubling like Bank.Ledger. With a path, every column is
+a raw file under it, mapped with numpy.memmap, so state larger than physical
+memory stays on disk and the OS page cache keeps the recently used parts.
+Passes over a column should go through chunks(), so they read the file
+sequentially and never hold more than one chunk of temporaries.
+
+Usage:
+    store = ColumnStore("run/state")
+    amounts = store.column("amounts", np.float64)
+    amounts = store.grow("amounts", 1_000_000)
+    total = sum(float(amounts[chunk].sum()) for chunk in store.chunks(n))
+    store.close(remove=True)
+"""
+
+from typing import Iterator
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+# Rows a new column starts with, so small files are not remapped every append
+INITIAL_ROWS = 1024
+
+
+class ColumnStore:
+
+    def __init__(self, path: str | None = None, chunk_size: int = 1 << 20) -> None:
+        # None keeps the columns in memory
+        self.path = path
+        if path is not None:
+            os.makedirs(path, exist_ok=True)
+        # Rows per chunk of a pass over a column
+        self.chunk_size = chunk_size
+        self.columns: dict[str, np.ndarray] = {}
+
+    def column(self, name: str, dtype, size: int = 0) -> np.ndarray:
+        """Create a zero filled column with room for at least size rows."""
+        if name in self.columns:
+            raise ValueError(f"Column {name} already exists")
+        dtype = np.dtype(dtype)
+        rows = max(size, INITIAL_ROWS)
+        if self.path is None:
+            column = np.zeros(rows, dtype)
+        else:
+            # Another store's file, whose rows this one would overwrite
+            if os.path.exists(self._filename(name)):
+                raise ValueError(f"{self._filename(name)} already exists")
+            column = self._map(name, dtype, rows)
+        self.columns[name] = column
+        return column
+
+    def grow(self, name: str, size: int) -> np.ndarray:
+        """
+        The column with room for at least size rows. Growing replaces the
+        array, so callers must use the returned one from then on.
+        """
+        column = self.columns[name]
+        if size <= len(column):
+            return column
+        rows = len(column)
+        while rows < size:
+            rows *= 2
+
+        if self.path is None:
+            grown = np.zeros(rows, column.dtype)
+            grown[: len(column)] = column
+        else:
+            column.flush()
+            grown = self._map(name, column.dtype, rows)
+        self.columns[name] = grown
+        return grown
+
+    def _filename(self, name: str) -> str:
+        return os.path.join(self.path, f"{name}.bin")
+
+    def _map(self, name: str, dtype: np.dtype, rows: int) -> np.memmap:
+        filename = self._filename(name)
+        # Extending the file leaves a sparse, zero filled tail
+        with open(filename, "a+b") as file:
+            file.truncate(rows * dtype.itemsize)
+        return np.memmap(filename, dtype, mode="r+", shape=(rows,))
+
+    def chunks(self, length: int) -> Iterator[slice]:
+        for start in range(0, length, self.chunk_size):
+            yield slice(start, min(start + self.chunk_size, length))
+
+    def flush(self) -> None:
+        if self.path is None:
+            return
+        for column in self.columns.values():
+            column.flush()
+
+    def close(self, remove: bool = False) -> None:
+        """
+        Flush and forget the columns, with remove delete the directory too.
+        Arrays still referenced elsewhere stay mapped until they are released.
+        """
+        self.flush()
+        self.columns = {}
+        if remove and self.path is not None:
+            shutil.rmtree(self.path, ignore_errors=True)
+
+    def __deepcopy__(self, memo) -> "ColumnStore":
+        # A mapped copy gets files of its own next to this store's directory
+        if self.path is None:
+            copy = ColumnStore(None, self.chunk_size)
+        else:
+            self.flush()
+            parent, name = os.path.split(os.path.normpath(self.path))
+            copy = ColumnStore(
+                tempfile.mkdtemp(prefix=f"{name}-", dir=parent), self.chunk_size
+            )
+        for name, column in self.columns.items():
+            if self.path is None:
+                copy.columns[name] = column.copy()
+            else:
+                shutil.copyfile(self._filename(name), copy._filename(name))
+                copy.columns[name] = copy._map(name, column.dtype, len(column))
+            # Holders of a column, e.g. Bank.Ledger, get the copy's column
+            memo[id(column)] = copy.columns[name]
+        return copy
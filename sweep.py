@@ -0,0 +1,101 @@
+"""
+Parameter sweeps over many Simulation configurations.
+
+Runs are scheduled dynamically on a process pool, so a run that stops early
+frees its worker for the next one. With a tick budget, the ticks saved by
+early stops are spent on extra replications of the swept configurations.
+
+Usage:
+    configs = [RunConfig(settings, corp_seed, person_seed, seed=s) for s in range(8)]
+    results = run_sweep(configs, workers=4, tick_budget=8 * 500)
+"""
+
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field, replace
+import os
+import random
+
+from convergence import COMPLETED, ConvergenceCriteria, ConvergenceMonitor
+from scenario import Scenario
+from settings import CorporationSeed, PersonSeed, SimulationSettings
+from simulation import SimStats, Simulation
+
+
+@dataclass
+class RunConfig:
+    sim_settings: SimulationSettings
+    corporation_seed: CorporationSeed
+    person_seed: PersonSeed
+    seed: int = 0
+    criteria: ConvergenceCriteria | None = field(default_factory=ConvergenceCriteria)
+    scenario: Scenario | None = None
+
+
+@dataclass
+class RunResult:
+    config: RunConfig
+    ticks: int
+    stop_reason: str
+    stats: SimStats
+
+
+def run_config(config: RunConfig) -> RunResult:
+    """Initialize and run one simulation, stopping early if it converges."""
+    random.seed(config.seed)
+    sim = Simulation()
+    sim.sim_settings = config.sim_settings
+    sim.corporation_seed = config.corporation_seed
+    sim.person_seed = config.person_seed
+    if config.criteria is not None:
+        sim.monitor = ConvergenceMonitor(config.criteria)
+    if config.scenario is not None:
+        sim.scenario = Scenario(config.scenario.changes)
+    sim.initialize()
+    stop_reason = sim.run()
+    return RunResult(config, sim.tick, stop_reason, sim.stats)
+
+
+def run_sweep(
+    configs: list[RunConfig],
+    workers: int | None = None,
+    tick_budget: int | None = None,
+) -> list[RunResult]:
+    """
+    Run every config. If tick_budget is set, keep adding replications (with
+    new seeds) of the configs, round robin, until the budget is used up.
+    """
+    results: list[RunResult] = []
+    queue = list(configs)
+    next_seed = max((config.seed for config in configs), default=0) + 1
+    planned = sum(config.sim_settings.number_of_ticks for config in configs)
+    replicate = 0
+    workers = workers or os.cpu_count() or 1
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        running: set[Future] = set()
+
+        while queue or running:
+            while queue and len(running) < workers:
+                running.add(executor.submit(run_config, queue.pop(0)))
+
+            done, running = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                results.append(result)
+                # Unused ticks of an early stop go back to the budget
+                planned -= result.config.sim_settings.number_of_ticks - result.ticks
+
+            while tick_budget is not None and configs:
+                config = configs[replicate % len(configs)]
+                if planned + config.sim_settings.number_of_ticks > tick_budget:
+                    break
+                queue.append(replace(config, seed=next_seed))
+                planned += config.sim_settings.number_of_ticks
+                next_seed += 1
+                replicate += 1
+
+    return results
+
+
+def stopped_early(results: list[RunResult]) -> list[RunResult]:
+    return [result for result in results if result.stop_reason != COMPLETED]
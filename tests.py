@@ -1,8 +1,38 @@
 import pytest
-from simulation import Simulation, SimulationSettings
+from simulation import Simulation, SimulationSettings, SimStats
 import random
-from logging_config import get_logger
+from logging_config import RateLimitFilter, get_logger, setup_logging, stop_logging
+from event_log import EventLog, EventLogReader
+from reporting import ReportGenerator
+from ensemble import EnsembleStats
+from convergence import (
+    ConvergenceCriteria,
+    ConvergenceMonitor,
+    CORPORATIONS_DEAD,
+    PRICE_CONVERGED,
+)
+from settings import CorporationSeed, Distribution, PersonSeed
+from sweep import RunConfig, run_sweep
+from scenario import Scenario
+from agents.decisions import ACTIONS, finance_actions, finance_recommendations
+from agents.production import InputOutput
+from dashboard import Dashboard
+from invariants import InvariantChecker, InvariantError
+from storage import ColumnStore
+from shared_state import SharedStateReader, SharedStateWriter
+from tracing import Tracer
+from benchmarks import make_simulation
+from regions import InProcessBackend, LocalBackend, RegionConfig, RegionalSimulation
+import gc
+import json
+import logging
+import logging.handlers
 import math
+import os
+import sys
+import time
+import urllib.request
+import numpy as np
 
 logger = get_logger(__name__)
 
@@ -96,3 +126,805 @@ def test_ticks():
         folder="goods",
         filename="goods_price",
     )
+
+
+def test_event_log_replay(tmp_path):
+    sim = make_simulation()
+    path = str(tmp_path / "run.log")
+    event_log = EventLog(path, buffer_size=4096)
+    sim.attach_event_log(event_log, checkpoint_interval=4)
+
+    corp = sim.corporations[0]
+    person = next(iter(corp.employees))
+    expected = {}
+    for _ in range(10):
+        sim.one_tick()
+        expected[sim.tick] = (
+            corp.bank_interface.check_balance(),
+            corp.current_price,
+            person.bank_interface.check_balance(),
+        )
+    event_log.close()
+
+    reader = EventLogReader(path)
+    assert [tick for tick, _ in reader.checkpoints] == [0, 4, 8]
+    for tick in (3, 6, 10):
+        corp_state = reader.agent_state(corp.name, tick)
+        person_state = reader.agent_state(person.name, tick)
+        balance, price, person_balance = expected[tick]
+        assert math.isclose(corp_state["balance"], balance)
+        assert math.isclose(corp_state["price"], price)
+        assert math.isclose(person_state["balance"], person_balance)
+        assert person_state["employer"] == corp.name
+
+    # A second run at the same path replaces the first
+    sim = make_simulation()
+    event_log = EventLog(path, buffer_size=4096)
+    sim.attach_event_log(event_log, checkpoint_interval=4)
+    for _ in range(5):
+        sim.one_tick()
+    event_log.close()
+    reader = EventLogReader(path)
+    assert [tick for tick, _ in reader.checkpoints] == [0, 4]
+    assert max(tick for tick, *_ in reader.events()) == 5
+
+
+def test_agent_ids_belong_to_the_run():
+    ids = []
+    for _ in range(2):
+        random.seed(5)
+        sim = make_simulation()
+        sim.one_tick()
+        ids.append(
+            (
+                [person.id for person in sim.people],
+                [corp.name for corp in sim.corporations],
+            )
+        )
+    assert ids[0] == ids[1]
+    assert sorted(ids[0][0]) == list(range(len(ids[0][0])))
+
+
+def test_report_skips_unchanged_charts(tmp_path):
+    sim = make_simulation()
+    for _ in range(3):
+        sim.one_tick()
+
+    report = ReportGenerator(charts_dir=str(tmp_path), workers=2)
+    report.add(sim.stats, ["goods_sold", "goods_produced"], "goods", "goods")
+    report.add_corporations(sim.corporations, ["revenue"])
+    paths = report.render()
+    assert len(paths) == 1 + len(sim.corporations)
+    assert all(os.path.exists(path) for path in paths)
+
+    # Same data → nothing to render
+    report.add(sim.stats, ["goods_sold", "goods_produced"], "goods", "goods")
+    assert report.render() == []
+
+    sim.one_tick()
+    report.add(sim.stats, ["goods_sold", "goods_produced"], "goods", "goods")
+    assert report.render() == [str(tmp_path / "goods" / "goods.png")]
+
+
+def test_ensemble_stats(tmp_path):
+    rng = np.random.default_rng(1)
+    values = rng.normal(loc=100, scale=10, size=(500, 3))
+
+    ensemble = EnsembleStats(quantiles=(0.1, 0.5, 0.9), metrics=["goods_avg_price"])
+    for run in values:
+        stats = SimStats()
+        for tick, value in enumerate(run, start=1):
+            stats.record(tick, goods_avg_price=value, goods_sold=1)
+        ensemble.add_run(stats)
+
+    assert ensemble.runs == 500
+    assert list(ensemble.moments) == ["goods_avg_price"]
+    assert np.allclose(ensemble.mean("goods_avg_price"), values.mean(axis=0))
+    assert np.allclose(ensemble.std("goods_avg_price"), values.std(axis=0, ddof=1))
+    for q in (0.1, 0.5, 0.9):
+        exact = np.quantile(values, q, axis=0)
+        assert np.allclose(ensemble.quantile("goods_avg_price", q), exact, atol=1.5)
+
+    low, high = ensemble.confidence_band("goods_avg_price")
+    assert np.all(low < ensemble.mean("goods_avg_price"))
+    path = ensemble.plot_bands("goods_avg_price", "ensemble", "price", str(tmp_path))
+    assert os.path.exists(path)
+
+
+def test_convergence_monitor_stops_run():
+    sim = make_simulation()
+    sim.monitor = ConvergenceMonitor(ConvergenceCriteria(window=5, price_variance=1e9))
+    assert sim.run(50) == PRICE_CONVERGED
+    assert sim.tick == 10
+
+
+def sweep_config(seed: int) -> RunConfig:
+    return RunConfig(
+        sim_settings=SimulationSettings(
+            number_of_ticks=30,
+            number_of_corporations=2,
+            number_of_people=100,
+            number_of_banks=1,
+        ),
+        corporation_seed=CorporationSeed(
+            price=15, demand=50, ppe=8, salary=100, balance=50000
+        ),
+        person_seed=PersonSeed(mpc=0.5),
+        seed=seed,
+        criteria=ConvergenceCriteria(window=20, price_variance=1e9),
+    )
+
+
+def test_sweep_reallocates_saved_ticks():
+    results = run_sweep([sweep_config(1), sweep_config(2)], workers=2, tick_budget=70)
+    # Both runs stop at tick 20, the 20 saved ticks pay for a third run
+    assert len(results) == 3
+    assert all(result.ticks == 20 for result in results)
+    assert all(result.stop_reason == PRICE_CONVERGED for result in results)
+    assert sorted(result.config.seed for result in results) == [1, 2, 3]
+
+
+def test_bankrupt_corporations_are_compacted(tmp_path):
+    sim = make_simulation()
+    event_log = EventLog(str(tmp_path / "run.log"))
+    sim.attach_event_log(event_log)
+    corp = sim.corporations[0]
+    employees = set(corp.employees)
+    corp.bank_interface.withdraw(corp.bank_interface.check_balance())
+
+    sim.one_tick()
+    assert corp not in sim.corporations
+    assert sim.bankruptcies == 1
+    assert list(sim.dead_corporations) == [corp]
+    assert corp.bank_interface not in corp.bank_interface.bank.accounts
+    assert corp not in event_log._ids
+    assert employees <= set(sim.workforce.unemployed)
+    assert sim.stats.corporations_alive[sim.tick] == 3
+
+    for corp in sim.corporations:
+        corp.bank_interface.withdraw(corp.bank_interface.check_balance())
+    sim.monitor = ConvergenceMonitor()
+    assert sim.run(5) == CORPORATIONS_DEAD
+    assert sim.stats.persons_employed[sim.tick] == 0
+
+
+def test_scenario_timeline():
+    sim = make_simulation()
+    person_ids = [p.id for p in sim.people[:3]]
+    scenario = (
+        Scenario()
+        .at(3, "corporations", "salary", 0.9, mode="scale")
+        .at(2, "banks", "interest_rate", 0.03)
+        .at(2, "people", "mpc", 0.4, agents=person_ids)
+        .at(2, "sim_settings", "benefit_replacement_rate", 0.1, mode="add")
+    )
+    sim.scenario = Scenario.from_json(scenario.to_json())
+    assert sim.scenario.changes == scenario.changes
+    assert sorted(sim.scenario.compile()) == [2, 3]
+
+    sim.one_tick()
+    assert all(bank.interest_rate == 0.01 for bank in sim.banks)
+    sim.one_tick()
+    assert all(bank.interest_rate == 0.03 for bank in sim.banks)
+    assert [p.mpc for p in sim.people[:4]] == [0.4, 0.4, 0.4, 0.5]
+    assert math.isclose(sim.sim_settings.benefit_replacement_rate, 0.7)
+    sim.one_tick()
+    assert all(math.isclose(corp.salary, 90) for corp in sim.corporations)
+    assert all(corp.stats.salary[3] == corp.salary for corp in sim.corporations)
+
+
+def test_scenario_targets_the_same_agents_every_run(caplog):
+    scenario = Scenario().at(1, "people", "mpc", 0.1, agents=[0, 1, 2, 10**6])
+    changed = []
+    for _ in range(2):
+        random.seed(8)
+        sim = make_simulation()
+        sim.scenario = scenario
+        with caplog.at_level("WARNING", logger="scenario"):
+            sim.one_tick()
+        changed.append(sorted(p.id for p in sim.people if p.mpc == 0.1))
+    assert changed == [[0, 1, 2], [0, 1, 2]]
+    # The id that matches nothing is reported, in both runs
+    assert sum("1000000" in message for message in caplog.messages) == 2
+
+
+def test_fork():
+    sim = make_simulation()
+    for _ in range(5):
+        sim.one_tick()
+
+    # Observers hold locks and named shared memory, the branch gets none
+    dashboard = Dashboard()
+    writer = SharedStateWriter()
+    checker = InvariantChecker()
+    sim.observers += [dashboard, writer, checker]
+    branch = sim.fork()
+    assert branch.observers == [] and sim.observers == [dashboard, writer, checker]
+    branch.corporations[0].salary = 1
+    branch.one_tick()
+    assert sim.tick == 5 and branch.tick == 6
+    assert sim.corporations[0].salary == 100
+    assert branch.people[0].bank_interface.bank is branch.banks[
+        sim.banks.index(sim.people[0].bank_interface.bank)
+    ]
+
+    results = sim.fork_branches(
+        {
+            "baseline": Scenario(),
+            "salary_cut": Scenario().at(6, "corporations", "salary", 0.5, "scale"),
+        },
+        number_of_ticks=3,
+        seed=1,
+    )
+    assert sim.tick == 5
+    writer.close()
+    assert sorted(results["baseline"].person_avg_salary) == list(range(1, 9))
+    assert results["baseline"].person_avg_salary[8] > 90
+    assert results["salary_cut"].person_avg_salary[8] < 60
+
+
+def test_aggregate_people():
+    random.seed(3)
+    full = make_simulation(1000)
+    random.seed(3)
+    aggregated = make_simulation(1000, aggregate=True)
+    assert len(aggregated.people) < 20
+    assert sum(p.weight for p in aggregated.people) == 1000
+    assert aggregated.workforce.population is aggregated.people
+    aggregated.observers.append(InvariantChecker(strict=True))
+    government = aggregated.government
+
+    for _ in range(10):
+        full.one_tick()
+        aggregated.one_tick()
+        assert sum(p.weight for p in aggregated.people) == 1000
+        assert len(aggregated.people) <= 4 * 2 + 2
+        # Merged cohorts give back their accounts and benefit rows
+        open_accounts = [
+            account
+            for bank in aggregated.banks
+            for account in bank.accounts
+            if account is not None
+        ]
+        assert len(open_accounts) == len(aggregated.people) + 4
+        assert len(government.people) - len(government.free_rows) == len(
+            aggregated.people
+        )
+        for corp in aggregated.corporations:
+            assert corp.headcount == sum(p.weight for p in corp.employees)
+
+    # A split and merge cycle reuses the account and benefit row
+    cohort = max(aggregated.people, key=lambda person: person.weight)
+    rows = len(government.people)
+    part = cohort.split(1)
+    aggregated.workforce.register([part])
+    account_id = part.bank_interface.account_id
+    assert aggregated.aggregate_people() == 1
+    assert part.bank_interface.bank.accounts[account_id] is None
+    again = cohort.split(1)
+    aggregated.workforce.register([again])
+    assert again.bank_interface.account_id == account_id
+    assert len(government.people) == rows + 1
+    assert government.people[government.rows[again]] is again
+    aggregated.one_tick()
+
+    stats = full.stats
+    agg_stats = aggregated.stats
+    assert agg_stats.persons_employed[10] == stats.persons_employed[10]
+    assert math.isclose(
+        agg_stats.goods_sold[10], stats.goods_sold[10], rel_tol=0.1
+    )
+    assert math.isclose(
+        agg_stats.person_avg_money_in_banks[10],
+        stats.person_avg_money_in_banks[10],
+        rel_tol=0.1,
+    )
+
+
+def test_invariant_checker():
+    random.seed(5)
+    sim = make_simulation()
+    checker = InvariantChecker(interval=2)
+    sim.observers.append(checker)
+    for _ in range(12):
+        sim.one_tick()
+    assert checker.checks == 6
+    assert list(checker.violations) == []
+
+    # Loans add to the ledger without a deposit or a reserve
+    for corp in sim.corporations:
+        corp.bank_interface.borrow_funds(1000)
+    assert checker.check(sim) == []
+
+    # Money appearing in the ledger without a transaction breaks both the
+    # account and the reserve invariant
+    person = sim.people[0]
+    person.bank_interface.bank.Ledger[person.bank_interface.account_id] += 10
+    violations = checker.check(sim)
+    assert {v.check for v in violations} == {"ledger", "reserve"}
+    assert violations[0].tick == sim.tick
+    assert any(v.subject == person.name for v in violations)
+
+    # A sample only finds the broken account if it happens to draw it,
+    # the reserve check runs regardless
+    sampled = InvariantChecker(sample_size=5, seed=1)
+    assert "reserve" in {v.check for v in sampled.check(sim)}
+
+    with pytest.raises(InvariantError):
+        InvariantChecker(strict=True).check(sim)
+
+
+def test_dashboard_drops_frames():
+    dashboard = Dashboard(maxsize=2)
+    for tick in range(5):
+        dashboard.publish({"tick": tick})
+    assert dashboard.dropped == 3
+    assert [dashboard.frames.get_nowait()["tick"] for _ in range(2)] == [3, 4]
+
+
+def test_dashboard_streams_ticks():
+    sim = make_simulation()
+    with Dashboard(port=0, poll_interval=0.01) as dashboard:
+        url = f"http://127.0.0.1:{dashboard.port}"
+        events = urllib.request.urlopen(f"{url}/events", timeout=5)
+        sim.observers.append(dashboard)
+        for _ in range(3):
+            sim.one_tick()
+
+        frames = []
+        while len(frames) < 3:
+            line = events.readline().decode()
+            if line.startswith("data: "):
+                frames.append(json.loads(line[len("data: ") :]))
+        events.close()
+        assert [frame["tick"] for frame in frames] == [1, 2, 3]
+        assert frames[-1]["stats"]["persons_employed"] == sim.stats.persons_employed[3]
+        assert {"government", "corporations", "people", "stats"} <= set(
+            frames[-1]["timings"]
+        )
+
+        latest = json.load(urllib.request.urlopen(f"{url}/latest", timeout=5))
+        assert latest["tick"] == 3
+        assert b"EventSource" in urllib.request.urlopen(url, timeout=5).read()
+
+
+def test_init_people_bulk():
+    random.seed(2)
+    sim = make_simulation(1000)
+    assert len(sim.people) == 1000
+    assert sim.workforce.population is sim.people
+    for bank in sim.banks:
+        assert all(
+            bank.accounts[p.bank_interface.account_id] is p.bank_interface
+            for p in sim.people
+            if p.bank_interface.bank is bank
+        )
+    # Demand 50 at 8 goods per employee is 7 jobs per corporation, the rest
+    # stay in the pool at consistent positions
+    assert sum(corp.headcount for corp in sim.corporations) == 28
+    assert len(sim.workforce) == 972
+    assert all(
+        sim.workforce.unemployed[sim.workforce._position[p]] is p
+        for p in sim.workforce.unemployed
+    )
+
+    random.seed(2)
+    again = make_simulation(1000)
+    assert [p.bank_interface.bank.bank_id for p in again.people] == [
+        p.bank_interface.bank.bank_id for p in sim.people
+    ]
+
+
+def test_distribution_seeds():
+    random.seed(4)
+    sim = Simulation()
+    sim.sim_settings.number_of_banks = 2
+    sim.sim_settings.number_of_people = 2000
+    sim.sim_settings.number_of_corporations = 20
+    sim.corporation_seed = CorporationSeed(
+        price=Distribution.lognormal(math.log(15), 0.2),
+        demand=50,
+        salary=Distribution.normal(100, 10, low=80, high=120),
+        ppe=Distribution.empirical([6, 8, 10]),
+        balance=50000,
+    )
+    sim.person_seed = PersonSeed(mpc=Distribution.uniform(0.3, 0.7))
+    sim.initialize()
+
+    mpcs = np.array([p.mpc for p in sim.people])
+    assert 0.3 <= mpcs.min() and mpcs.max() <= 0.7
+    assert abs(mpcs.mean() - 0.5) < 0.02
+    assert len(set(mpcs.tolist())) == 2000
+
+    salaries = [corp.salary for corp in sim.corporations]
+    assert min(salaries) >= 80 and max(salaries) <= 120
+    assert len(set(salaries)) == 20
+    assert {corp.ppe for corp in sim.corporations} <= {6, 8, 10}
+    assert all(isinstance(corp.ppe, int) for corp in sim.corporations)
+    assert all(corp.latest_demand == 50 for corp in sim.corporations)
+    assert len({corp.current_price for corp in sim.corporations}) == 20
+    sim.validate_settings()
+    sim.one_tick()
+
+    with pytest.raises(ValueError):
+        Distribution("pareto")
+
+
+def test_distribution_seeds_aggregate():
+    random.seed(4)
+    sim = Simulation()
+    sim.sim_settings.number_of_banks = 2
+    sim.sim_settings.number_of_people = 1000
+    sim.sim_settings.aggregate_people = True
+    sim.person_seed = PersonSeed(mpc=Distribution.empirical([0.4, 0.6]))
+    sim.init_banks()
+    sim.init_people()
+    # One cohort per bank and mpc value
+    assert len(sim.people) == 4
+    assert sum(p.weight for p in sim.people) == 1000
+    assert {p.mpc for p in sim.people} == {0.4, 0.6}
+
+
+def test_bounded_search():
+    random.seed(6)
+    sim = make_simulation()
+    sim.sim_settings.search_breadth = 1
+    for i, corp in enumerate(sim.corporations):
+        corp.current_price = 12 + i
+    sim.one_tick()
+    # With one corporation considered, all goods a person buys come from the
+    # same corporation, so they carry the same price
+    prices = [
+        {good.price for good in person.bought_goods}
+        for person in sim.people
+        if person.bought_goods
+    ]
+    assert prices and all(len(p) == 1 for p in prices)
+    assert len(set().union(*prices)) > 1
+
+    # A network structure: everyone only knows the first corporation
+    sim.search_pool = lambda person: sim.corporations[:1]
+    sim.sim_settings.search_breadth = 0
+    sim.one_tick()
+    assert sim.corporations[0].latest_demand > 0
+    assert all(corp.latest_demand == 0 for corp in sim.corporations[1:])
+
+
+def test_batched_finance_decisions_match():
+    random.seed(8)
+    sim = Simulation()
+    sim.sim_settings.number_of_banks = 2
+    sim.sim_settings.number_of_people = 600
+    sim.sim_settings.number_of_corporations = 15
+    sim.corporation_seed = CorporationSeed(
+        price=Distribution.uniform(8, 25),
+        demand=Distribution.uniform(20, 80),
+        salary=Distribution.normal(100, 20, low=50),
+        ppe=Distribution.empirical([4, 8, 12]),
+        balance=Distribution.lognormal(math.log(5000), 1),
+    )
+    sim.person_seed = PersonSeed(mpc=Distribution.uniform(0.3, 0.9))
+    sim.initialize()
+
+    compared = set()
+    for tick in range(1, 21):
+        sim.tick = tick
+        for corp in sim.corporations:
+            corp.one_tick(tick, finance=False)
+        deciding = [corp for corp in sim.corporations if corp.reviews_finance()]
+        for allow_borrow in (True, False):
+            expected = []
+            for corp in deciding:
+                corp.snapshot = None
+                expected.append(corp.finance_recommendation(allow_borrow))
+                expected_snapshot = corp.snapshot
+                corp.snapshot = None
+                actions, amounts = finance_recommendations([corp], allow_borrow)
+                assert corp.snapshot == expected_snapshot
+            for corp in deciding:
+                corp.snapshot = None
+            actions, amounts = finance_recommendations(deciding, allow_borrow)
+            batched = [
+                (ACTIONS[a], m) for a, m in zip(actions.tolist(), amounts.tolist())
+            ]
+            assert batched == expected
+            compared.update(action for action, _ in expected)
+        finance_actions(deciding)
+        sim.corporations = [corp for corp in sim.corporations if corp.alive]
+        sim.people_tick()
+        sim.clean_up()
+        sim.gen_stats()
+
+    # The run went through every branch of the rules
+    assert compared == set(ACTIONS)
+
+
+def test_input_output_production():
+    sim = make_simulation(
+        600,
+        seed=3,
+        banks=3,
+        corporations=12,
+        demand=200,
+        initialize=False,
+        number_of_sectors=3,
+    )
+    # Sector 0 supplies 1 and 2, sector 1 supplies 2
+    sim.input_output = InputOutput(
+        np.array([[0, 0.5, 0.2], [0, 0, 0.5], [0, 0, 0]])
+    )
+    sim.observers.append(InvariantChecker(strict=True))
+    sim.initialize()
+    sim.run(8)
+
+    assert {corp.sector for corp in sim.corporations} == {0, 1, 2}
+    downstream = [corp for corp in sim.corporations if corp.sector > 0]
+    assert sum(
+        corp.stats.production.get(tick, 0)
+        for corp in downstream
+        for tick in range(1, 9)
+    ) > 0
+    assert any(
+        corp.stats.costs[tick] > corp.salary * corp.headcount
+        for corp in downstream
+        for tick in corp.stats.costs
+    )
+
+
+def _region_config() -> RegionConfig:
+    return RegionConfig(
+        SimulationSettings(
+            number_of_banks=2, number_of_corporations=4, number_of_people=400
+        ),
+        CorporationSeed(price=15, demand=2000, salary=100, ppe=8, balance=200_000),
+        PersonSeed(mpc=0.5),
+        [InvariantChecker(strict=True)],
+    )
+
+
+def test_regions_without_trade_match_simulations():
+    economy = RegionalSimulation(
+        [_region_config(), _region_config()],
+        export_share=0,
+        seed=11,
+        backend=InProcessBackend(),
+    )
+    results = economy.run(6)
+
+    for i, result in enumerate(results):
+        random.seed(11 + i)
+        sim = Simulation()
+        config = _region_config()
+        sim.sim_settings = config.sim_settings
+        sim.corporation_seed = config.corporation_seed
+        sim.person_seed = config.person_seed
+        sim.initialize()
+        sim.run(6)
+        assert result.stats == sim.stats
+    assert not economy.trade.any()
+
+
+def test_regional_trade_is_reproducible():
+    runs = []
+    for backend in (InProcessBackend(), LocalBackend()):
+        random.seed(99)
+        caller_state = random.getstate()
+        economy = RegionalSimulation(
+            [_region_config() for _ in range(3)],
+            export_share=0.3,
+            seed=4,
+            backend=backend,
+        )
+        runs.append((economy.run(6), economy.trade))
+        # Regions draw from their own seeds, never from the caller's state
+        assert random.getstate() == caller_state
+
+    (local, local_trade), (remote, remote_trade) = runs
+    assert [result.stats for result in local] == [result.stats for result in remote]
+    assert np.array_equal(local_trade, remote_trade)
+    # Every region sold to every other region
+    assert (local_trade + np.eye(3)).all()
+
+
+def _read_shared_state(name, last_tick, sender):
+    reader = SharedStateReader(name)
+    torn = 0
+    ticks = {0}
+    while max(ticks) < last_tick:
+        try:
+            snapshot = reader.snapshot(timeout=5)
+        except TimeoutError:
+            break
+        # Published in one write, so a consistent snapshot always agrees
+        torn += snapshot.ticks[-1] != snapshot.tick
+        ticks.add(snapshot.tick)
+    reader.close()
+    sender.send((torn, sorted(ticks)))
+
+
+def test_shared_state_export():
+    import multiprocessing
+
+    sim = make_simulation(300, seed=6, corporations=5, demand=200)
+
+    name = f"simecon-test-{os.getpid()}"
+    with SharedStateWriter(name=name, headroom=1.0) as writer:
+        # A block that was never published has no consistent state yet
+        writer.open()
+        with SharedStateReader(name) as reader:
+            with pytest.raises(TimeoutError):
+                reader.snapshot(timeout=0.01)
+
+        sim.observers.append(writer)
+        sim.run(1)
+
+        context = multiprocessing.get_context("fork")
+        receiver, sender = context.Pipe(duplex=False)
+        process = context.Process(
+            target=_read_shared_state, args=(name, sim.tick + 30, sender)
+        )
+        process.start()
+        sim.run(30)
+        torn, ticks = receiver.recv()
+        process.join()
+        assert torn == 0
+        assert ticks[-1] == sim.tick
+
+        with SharedStateReader(name) as reader:
+            snapshot = reader.snapshot()
+            assert snapshot.tick == sim.tick
+            assert np.array_equal(
+                snapshot.balances,
+                np.concatenate([bank.balances() for bank in sim.banks]),
+            )
+            assert snapshot.corporation_prices.tolist() == [
+                corp.current_price for corp in sim.corporations
+            ]
+            assert snapshot.stats["goods_sold"][-1] == sim.stats.goods_sold[sim.tick]
+            assert snapshot.ticks.tolist() == list(range(1, sim.tick + 1))
+
+            # Outgrowing the block moves it, the reader follows
+            sim.banks[0].register_accounts(10)
+            writer.publish(sim)
+            assert len(reader.snapshot().balances) == len(snapshot.balances) + 10
+
+
+def test_memory_mapped_storage(tmp_path):
+    runs = []
+    for path in (None, str(tmp_path)):
+        sim = make_simulation(
+            400, seed=12, demand=500, initialize=False, storage_path=path
+        )
+        sim.observers.append(InvariantChecker(strict=True))
+        sim.initialize()
+        sim.run(6)
+        runs.append(sim)
+
+    memory, mapped = runs
+    assert mapped.stats == memory.stats
+    assert all(bank.journal is not None and not bank.deposits for bank in mapped.banks)
+    # Each run maps its own directory under storage_path
+    (run,) = os.listdir(tmp_path)
+    assert mapped.store.path == str(tmp_path / run)
+    assert "bank-0-ledger.bin" in os.listdir(mapped.store.path)
+    assert isinstance(mapped.banks[0].Ledger, np.memmap)
+    assert isinstance(mapped.banks[0].loans, np.memmap)
+    with pytest.raises(ValueError):
+        ColumnStore(mapped.store.path).column("bank-0-ledger", np.float64)
+    # run leaves nothing buffered
+    assert not any(bank.journal._pending for bank in mapped.banks)
+
+    # Branches write to copies of the run's files, never to the run's own
+    ledger = mapped.banks[0].Ledger.copy()
+    branch = mapped.fork()
+    branch.run(2)
+    assert branch.banks[0].store is branch.store
+    assert branch.store.path != mapped.store.path
+    assert branch.banks[0].Ledger.filename.startswith(branch.store.path)
+    mapped.fork_branches({"baseline": lambda sim: None}, 2, seed=1)
+    assert np.array_equal(mapped.banks[0].Ledger, ledger)
+    assert len(os.listdir(tmp_path)) == 2
+
+    # close removes the directories
+    branch.close()
+    mapped.close()
+    assert os.listdir(tmp_path) == []
+
+
+def test_queued_logging(tmp_path):
+    filename = str(tmp_path / "run.log")
+    listener = setup_logging(
+        "INFO",
+        queued=True,
+        filename=filename,
+        rate_limit=RateLimitFilter(rate=0.001, burst=3),
+    )
+    try:
+        assert listener is not None
+        agent_logger = get_logger("agents.Corp")
+        for i in range(10):
+            agent_logger.info("decision %d", i)
+        agent_logger.error("bankrupt")
+        # Arguments are logged as they were when the record was made
+        goods = [1, 2]
+        logger.warning("goods %s", goods)
+        goods.append(3)
+        try:
+            raise ValueError("no funds")
+        except ValueError:
+            logger.exception("transfer failed")
+        # Not an agent logger, never limited
+        for i in range(5):
+            logger.info("tick %d", i)
+        agent_logger.debug("below the level")
+    finally:
+        stop_logging()
+        # What stop_logging left on the root logger, before the test level
+        # is put back
+        handlers = logging.getLogger().handlers[:]
+        setup_logging("WARNING")
+
+    with open(filename) as file:
+        lines = file.read().splitlines()
+    assert sum("decision" in line for line in lines) == 3
+    assert any("bankrupt" in line for line in lines)
+    assert any(line.endswith("goods [1, 2]") for line in lines)
+    assert "ValueError: no funds" in lines
+    assert sum("tick" in line for line in lines) == 5
+    assert not any("below the level" in line for line in lines)
+    assert not any(
+        isinstance(handler, logging.handlers.QueueHandler) for handler in handlers
+    )
+    assert any(
+        isinstance(handler, logging.StreamHandler) and handler.stream is sys.stdout
+        for handler in handlers
+    )
+
+    # The first record through after a drop counts the dropped ones
+    rate_limit = RateLimitFilter(rate=100, burst=1)
+    records = [
+        logging.LogRecord("agents.Person", logging.INFO, "", 0, "buy %d", (i,), None)
+        for i in range(3)
+    ]
+    assert rate_limit.filter(records[0])
+    assert not rate_limit.filter(records[1])
+    time.sleep(0.05)
+    assert rate_limit.filter(records[2])
+    assert records[2].getMessage() == "buy 2 (1 similar records dropped)"
+
+
+def test_trace_export(tmp_path):
+    runs = []
+    for traced in (False, True):
+        sim = make_simulation(300, seed=21, banks=1, demand=500)
+        if traced:
+            tracer = Tracer(str(tmp_path / "run.json"), buffer_size=50)
+            sim.attach_tracer(tracer)
+            sim.run(3)
+            gc.collect()
+            sim.detach_tracer()
+            tracer.close()
+        else:
+            sim.run(3)
+        runs.append(sim)
+
+    # Tracing does not change the run
+    assert runs[0].stats == runs[1].stats
+    with open(tmp_path / "run.json") as file:
+        events = json.load(file)
+    assert len(events) == tracer.written
+    names = [event["name"] for event in events]
+    corporations = [event for event in events if event.get("cat") == "corporation"]
+    assert len(corporations) >= 3 * len(runs[1].corporations)
+    for phase in ("government", "corporations", "people", "stats", "gen_stats"):
+        assert names.count(phase) == 3
+    assert "gc" in names and "transfer" in names
+    ticks = [event for event in events if event.get("cat") == "tick"]
+    phases = [event for event in events if event.get("cat") == "phase"]
+    # Phases nest inside their tick
+    for phase in phases:
+        assert any(
+            tick["ts"] <= phase["ts"]
+            and phase["ts"] + phase["dur"] <= tick["ts"] + tick["dur"] + 1e-3
+            for tick in ticks
+        )
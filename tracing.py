@@ -0,0 +1,150 @@
+"""
+Trace of a run in the Trace Event Format, for Perfetto or chrome://tracing.
+
+Tracer records complete ("X") events: every phase of one_tick, gen_stats, the
+one_tick of each corporation and bank transfers, deposits, withdraws and
+transaction lookups, plus a span for every garbage collection, so a slow tick
+shows which phase it lost its time in and whether a collection ran there.
+
+The events of the hot paths are sampled, one in every transfer_every bank
+operations and one in every corporation_every corporations, by counting, so
+tracing never draws from the simulation's random state. Events are kept in a
+buffer and written out as a JSON array every buffer_size events. The closing
+bracket is written by close, viewers open a trace without it as well.
+
+Usage:
+    with Tracer("run.trace.json", transfer_every=100) as tracer:
+        sim.attach_tracer(tracer)
+        sim.run()
+    # open run.trace.json in https://ui.perfetto.dev
+"""
+
+import gc
+import json
+import os
+import threading
+import time
+
+
+class Tracer:
+
+    def __init__(
+        self,
+        path: str,
+        transfer_every: int = 100,
+        corporation_every: int = 1,
+        buffer_size: int = 10_000,
+        gc_events: bool = True,
+    ) -> None:
+        self.path = path
+        # Sampling periods by event name, 0 turns the events off
+        self.every: dict[str, int] = {
+            "one_tick": corporation_every,
+            "transfer": transfer_every,
+            "deposit": transfer_every,
+            "withdraw": transfer_every,
+            "find_transaction": transfer_every,
+        }
+        self._counts: dict[str, int] = dict.fromkeys(self.every, 0)
+        self.buffer_size = buffer_size
+        self.events: list[dict] = []
+        self.written: int = 0
+        # Timestamps are microseconds since the tracer was created
+        self.origin = time.perf_counter()
+        self.pid = os.getpid()
+        self.tid = threading.get_ident()
+        self._gc_start: float | None = None
+        self.file = open(path, "w")
+        self.file.write("[\n")
+        self._first = True
+        self.events.append(
+            {
+                "name": "process_name",
+                "ph": "M",
+                "pid": self.pid,
+                "args": {"name": "SimEcon"},
+            }
+        )
+        self.gc_events = gc_events
+        if gc_events:
+            gc.callbacks.append(self._on_gc)
+
+    def sample(self, name: str) -> float | None:
+        """Start of a sampled event, None when this one is skipped."""
+        every = self.every[name]
+        if not every:
+            return None
+        count = self._counts[name]
+        self._counts[name] = count + 1
+        if count % every:
+            return None
+        return time.perf_counter()
+
+    def complete(
+        self, name: str, category: str, start: float, args: dict | None = None
+    ) -> None:
+        """An event from start, a time.perf_counter() value, until now."""
+        self.span(name, category, start, time.perf_counter(), args)
+
+    def span(
+        self,
+        name: str,
+        category: str,
+        start: float,
+        end: float,
+        args: dict | None = None,
+    ) -> None:
+        self._append(name, category, start, end, args)
+        if len(self.events) >= self.buffer_size:
+            self.flush()
+
+    def _append(
+        self, name: str, category: str, start: float, end: float, args: dict | None
+    ) -> None:
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": (start - self.origin) * 1e6,
+            "dur": (end - start) * 1e6,
+            "pid": self.pid,
+            "tid": self.tid,
+        }
+        if args:
+            event["args"] = args
+        self.events.append(event)
+
+    def _on_gc(self, phase: str, info: dict) -> None:
+        if phase == "start":
+            self._gc_start = time.perf_counter()
+        elif self._gc_start is not None:
+            # Only collections on the simulation thread nest in its spans.
+            # No flush here, a collection can run in the middle of one.
+            if threading.get_ident() == self.tid:
+                self._append("gc", "gc", self._gc_start, time.perf_counter(), info)
+            self._gc_start = None
+
+    def flush(self) -> None:
+        if not self.events or self.file is None:
+            return
+        events, self.events = self.events, []
+        chunk = ",\n".join(json.dumps(event) for event in events)
+        self.file.write(chunk if self._first else ",\n" + chunk)
+        self._first = False
+        self.written += len(events)
+
+    def close(self) -> None:
+        if self.file is None:
+            return
+        if self.gc_events:
+            gc.callbacks.remove(self._on_gc)
+        self.flush()
+        self.file.write("\n]\n")
+        self.file.close()
+        self.file = None
+
+    def __enter__(self) -> "Tracer":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()